@@ -0,0 +1,162 @@
+import asyncio
+import hashlib
+import math
+import time
+import weakref
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+from fastapi import HTTPException
+
+from metrics import metrics
+
+# Every live limiter, for the stats endpoint and queue-depth gauges; per-tenant limiters drop out when released
+_limiters: "weakref.WeakSet[AdmissionLimiter]" = weakref.WeakSet()
+
+
+def tenant_key(secret: str) -> str:
+    """Tenant id for an API key or token, so raw credentials are never used as keys"""
+    return hashlib.sha256(secret.encode()).hexdigest()[:16]
+
+
+class SaturatedError(HTTPException):
+    """
+    Raised instead of waiting when a limiter's queue is full or the wait times out
+
+    An HTTPException, so endpoints pass it through unchanged: 429 when one tenant
+    is over its own limit, 503 when the whole service is, with Retry-After set.
+    """
+
+    def __init__(self, limiter: str, retry_after: int, status_code: int):
+        super().__init__(
+            status_code=status_code,
+            detail=f"Too many concurrent {limiter.replace('_', ' ')} requests, retry in {retry_after}s",
+            headers={"Retry-After": str(retry_after)}
+        )
+        self.limiter = limiter
+        self.retry_after = retry_after
+
+
+class AdmissionLimiter:
+    """
+    Concurrency limit with a bounded wait queue
+
+    Up to max_concurrent holders run at once and up to max_queued more wait, each
+    for at most queue_timeout_seconds; anything beyond that is rejected at once
+    with SaturatedError, so callers fail fast instead of piling up behind a
+    saturated upstream. Retry-After is estimated from the recent hold time and
+    the queue ahead.
+    """
+
+    def __init__(self, name: str, max_concurrent: int, max_queued: int, queue_timeout_seconds: float,
+                 status_code: int = 503):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self.status_code = status_code
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        # Moving average of how long a slot is held, in seconds
+        self._avg_hold_seconds = 1.0
+        self.in_flight = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        _limiters.add(self)
+
+    def retry_after(self) -> int:
+        return max(1, math.ceil(self._avg_hold_seconds * (self.queued + 1) / self.max_concurrent))
+
+    def _reject(self, reason: str) -> SaturatedError:
+        metrics.inc("admission_rejected_total", limiter=self.name, reason=reason)
+        return SaturatedError(self.name, self.retry_after(), self.status_code)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        if self._semaphore.locked():
+            if self.queued >= self.max_queued:
+                self.rejected += 1
+                raise self._reject("queue_full")
+            self.queued += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout_seconds)
+            except asyncio.TimeoutError:
+                self.timed_out += 1
+                raise self._reject("queue_timeout")
+            finally:
+                self.queued -= 1
+        else:
+            await self._semaphore.acquire()
+
+        self.in_flight += 1
+        self.admitted += 1
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+            self._avg_hold_seconds = 0.8 * self._avg_hold_seconds + 0.2 * (time.monotonic() - start)
+
+    @property
+    def idle(self) -> bool:
+        return self.in_flight == 0 and self.queued == 0
+
+
+class TenantAdmission:
+    """
+    Per-tenant AdmissionLimiters in front of one global limiter
+
+    A call takes its tenant's slot first (429 when that tenant is saturated),
+    then a global one (503), so one busy tenant cannot fill the global queue.
+    Tenant limiters are created on demand and dropped once idle.
+    """
+
+    def __init__(self, name: str, global_limiter: AdmissionLimiter, max_concurrent_per_tenant: int,
+                 max_queued_per_tenant: int, queue_timeout_seconds: float):
+        self.name = name
+        self.global_limiter = global_limiter
+        self.max_concurrent_per_tenant = max_concurrent_per_tenant
+        self.max_queued_per_tenant = max_queued_per_tenant
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self._tenants: Dict[str, AdmissionLimiter] = {}
+
+    @asynccontextmanager
+    async def slot(self, tenant: Optional[str] = None) -> AsyncIterator[None]:
+        limiter = self._tenants.get(tenant or "")
+        if limiter is None:
+            limiter = self._tenants[tenant or ""] = AdmissionLimiter(
+                self.name, self.max_concurrent_per_tenant, self.max_queued_per_tenant,
+                self.queue_timeout_seconds, status_code=429
+            )
+        try:
+            async with limiter.slot():
+                async with self.global_limiter.slot():
+                    yield
+        finally:
+            if limiter.idle and self._tenants.get(tenant or "") is limiter:
+                del self._tenants[tenant or ""]
+
+
+def admission_metrics() -> Dict[str, dict]:
+    """Totals per limiter name (per-tenant limiters of the same kind are summed)"""
+    summary: Dict[str, dict] = defaultdict(lambda: {
+        "limiters": 0, "in_flight": 0, "queued": 0, "admitted": 0, "rejected": 0, "timed_out": 0
+    })
+    for limiter in list(_limiters):
+        entry = summary[limiter.name]
+        entry["limiters"] += 1
+        entry["max_concurrent"] = limiter.max_concurrent
+        entry["max_queued"] = limiter.max_queued
+        for field in ("in_flight", "queued", "admitted", "rejected", "timed_out"):
+            entry[field] += getattr(limiter, field)
+    return dict(summary)
+
+
+metrics.gauge("admission_in_flight", lambda: [({"limiter": name}, m["in_flight"]) for name, m in admission_metrics().items()])
+metrics.gauge("admission_queued", lambda: [({"limiter": name}, m["queued"]) for name, m in admission_metrics().items()])
+metrics.describe("admission_in_flight", "Outbound calls holding a slot, by limiter")
+metrics.describe("admission_queued", "Outbound calls waiting for a slot, by limiter")
+metrics.describe("admission_rejected_total", "Calls rejected with 429/503 instead of queued, by limiter and reason")
@@ -0,0 +1,107 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Generic, TypeVar
+
+import dotenv
+
+from llm_limits import LLMCallLimiter
+
+dotenv.load_dotenv()
+AGENT_SYSTEMS_MAX = int(os.getenv("AGENT_SYSTEMS_MAX", "100"))
+AGENT_SYSTEMS_IDLE_TTL_SECONDS = int(os.getenv("AGENT_SYSTEMS_IDLE_TTL_SECONDS", str(60 * 60)))
+
+T = TypeVar("T")
+
+
+def hash_api_key(api_key: str) -> str:
+    """Pool key for an API key, so raw keys are never used as dict keys or logged"""
+    return hashlib.sha256(api_key.encode()).hexdigest()
+
+
+class AgentSystemPool(Generic[T]):
+    """
+    Bounded map of API key hash -> agent system with idle TTL and LRU eviction
+
+    Each key gets its own LLMCallLimiter, so one tenant's concurrency and
+    rate limits are tracked apart from everyone else's. Limiters are kept
+    apart from the entries and outlive them while calls are still running or
+    backing off, so a key whose agent system is evicted and recreated keeps
+    its cap instead of briefly getting a second one.
+    """
+
+    def __init__(self, factory: Callable[[str, LLMCallLimiter], T],
+                 max_entries: int = AGENT_SYSTEMS_MAX, idle_ttl_seconds: int = AGENT_SYSTEMS_IDLE_TTL_SECONDS):
+        self.factory = factory
+        self.max_entries = max_entries
+        self.idle_ttl_seconds = idle_ttl_seconds
+        # key hash -> {"system": T, "last_access": float}, least recently used first
+        self._entries: OrderedDict = OrderedDict()
+        # key hash -> limiter, for every pooled key and every evicted one whose limiter is not idle yet
+        self._limiters: Dict[str, LLMCallLimiter] = {}
+        self._lock = threading.Lock()
+        self.created = 0
+        self.evicted = 0
+        self.expired = 0
+
+    def get(self, api_key: str) -> T:
+        key = hash_api_key(api_key)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._is_expired(entry, now):
+                del self._entries[key]
+                self.expired += 1
+                entry = None
+            if entry is None:
+                limiter = self._limiters.get(key)
+                if limiter is None:
+                    limiter = self._limiters[key] = LLMCallLimiter()
+                entry = {"system": self.factory(api_key, limiter)}
+                self._entries[key] = entry
+                self.created += 1
+            entry["last_access"] = now
+            self._entries.move_to_end(key)
+            self._evict(now)
+            return entry["system"]
+
+    def _is_expired(self, entry: dict, now: float) -> bool:
+        return bool(self.idle_ttl_seconds) and now - entry["last_access"] > self.idle_ttl_seconds
+
+    def _evict(self, now: float):
+        # Entries are ordered by last access, so idle ones are at the front
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if self._is_expired(entry, now):
+                self.expired += 1
+            elif self.max_entries and len(self._entries) > self.max_entries:
+                self.evicted += 1
+            else:
+                break
+            del self._entries[key]
+
+        for key in [k for k, limiter in self._limiters.items() if k not in self._entries and limiter.idle]:
+            del self._limiters[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            limiters = [limiter.metrics() for limiter in self._limiters.values()]
+            return {
+                "agent_systems": len(self._entries),
+                "max_agent_systems": self.max_entries,
+                "idle_ttl_seconds": self.idle_ttl_seconds,
+                "created": self.created,
+                "evicted": self.evicted,
+                "expired": self.expired,
+                "llm_limiters": len(self._limiters),
+                "llm_calls_in_flight": sum(m["in_flight"] for m in limiters),
+                "llm_calls_queued": sum(m["queued"] for m in limiters),
+                "llm_calls": sum(m["calls"] for m in limiters),
+                "rate_limited": sum(m["rate_limited"] for m in limiters),
+                "retries": sum(m["retries"] for m in limiters),
+            }
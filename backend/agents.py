@@ -1,68 +1,151 @@
-from typing import TypedDict, Optional
+import asyncio
+import inspect
+from typing import Annotated, AsyncIterator, TypedDict, Optional, Tuple
 from langgraph.graph import StateGraph, END
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.checkpoint.memory import MemorySaver
 from langchain_openai import ChatOpenAI
-from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
-import json
-import re
-from prompts import PROFILE_ANALYSIS_PROMPT, JOB_MATCH_PROMPT, CONTENT_GENERATION_PROMPT, CAREER_COUNSELOR_PROMPT
+from langchain_core.messages import HumanMessage, AIMessage, AIMessageChunk
+from pydantic import ValidationError
+from prompts import (PROFILE_ANALYSIS_PROMPT, JOB_MATCH_PROMPT, CONTENT_GENERATION_PROMPT, CAREER_COUNSELOR_PROMPT,
+                     HISTORY_SUMMARY_PROMPT, RESPONSE_PROMPT)
+from profile_projection import ProjectionStats, render_compact, render_profile_for_agent
+from llm_cache import LLMCache, make_cache_key
+from history import HistoryPolicy
+from clients import client_registry
+from llm_limits import LLMCallLimiter
+from intent_router import IntentRouter
+from schemas import (AGENT_SCHEMAS, STRUCTURED_OUTPUT_MAX_REPAIRS, StructuredOutputStats,
+                     describe_validation_error, response_format_for)
+from renderers import render_report, render_structured
+from prompt_builder import PromptCacheStats, build_prompt, prompt_cache_key
+from metrics import record_llm_usage, timed
 
+# Process-wide raw vs projected profile token counts, per agent
+projection_stats = ProjectionStats()
+# Process-wide schema validation and repair counts, per agent
+structured_output_stats = StructuredOutputStats()
+# Process-wide cached vs uncached prompt tokens reported by the API, per agent
+prompt_cache_stats = PromptCacheStats()
+# Centroids are built once and shared by every agent system
+default_intent_router = IntentRouter()
 
-def extract_json_from_response(text: str) -> Optional[dict]:
-    """Extract JSON from LLM response, handling markdown code blocks"""
-    # Try to find JSON in markdown code blocks
-    json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', text, re.DOTALL)
-    if json_match:
-        try:
-            return json.loads(json_match.group(1))
-        except json.JSONDecodeError:
-            pass
-    
-    # Try to find JSON object directly
-    json_match = re.search(r'\{.*\}', text, re.DOTALL)
-    if json_match:
-        try:
-            return json.loads(json_match.group(0))
-        except json.JSONDecodeError:
-            pass
-    
-    # Try parsing the entire response
-    try:
-        return json.loads(text.strip())
-    except json.JSONDecodeError:
-        return None
+
+SPECIALIST_AGENTS = ("profile_analyzer", "content_generator", "job_matcher", "career_counselor")
+# Role a specialist works towards when the session has none; the same value goes into its prompt and result key
+DEFAULT_TARGET_ROLES = {
+    "content_generator": "General professional profile",
+    "job_matcher": "Software Engineer",
+}
+# Parallel branches of a full report; the counselor runs after the matcher so it can use the report's skill gaps
+REPORT_BRANCHES = ("profile_analyzer", "content_generator", "match_and_counsel")
+
+
+# Report section -> specialist that produces it
+REPORT_SECTIONS = {
+    "profile_analysis": "profile_analyzer",
+    "job_match": "job_matcher",
+    "content_enhancement": "content_generator",
+    "career_guidance": "career_counselor",
+}
+
+
+def _take_latest(current, update):
+    return update
+
+
+def _merge_dicts(current: Optional[dict], update: Optional[dict]) -> dict:
+    return {**(current or {}), **(update or {})}
 
 
 class AgentState(TypedDict):
     messages: list
     profile_data: dict
-    analysis_result: dict
+    # Several specialists may write this in the same step of a full report
+    analysis_result: Annotated[dict, _take_latest]
     target_role: str
     job_match_score: float
     content_suggestions: dict
     skill_gaps: list
     next_action: str
+    # Specialist the caller asked for this turn, bypassing the intent classifier ("" for free-form chat)
+    intent: str
+    history_summary: str
+    # Hash of profile_data, part of the key stored results are validated against
+    profile_hash: str
+    # Latest result of each specialist, keyed by agent name
+    agent_results: Annotated[dict, _merge_dicts]
+    # Agent name -> key of the inputs its stored result was computed from, None if it is not reusable
+    result_keys: Annotated[dict, _merge_dicts]
+    report_mode: bool
+    report: dict
+    # "conversational" or "structured" (see renderers.RESPONSE_MODES)
+    response_mode: str
 
 
 class LinkedInAgentSystem:
-    def __init__(self, openai_api_key: str):
+    def __init__(self, openai_api_key: str, deterministic: bool = False,
+                 response_cache: Optional[LLMCache] = None,
+                 checkpointer: Optional[BaseCheckpointSaver] = None,
+                 history_policy: Optional[HistoryPolicy] = None,
+                 intent_router: Optional[IntentRouter] = None,
+                 call_limiter: Optional[LLMCallLimiter] = None):
+        """
+        Args:
+            openai_api_key: OpenAI API key used for every agent call
+            deterministic: Use temperature 0 so repeated inputs give repeatable outputs
+            response_cache: Optional cache of specialist responses keyed on prompt, model and inputs
+            checkpointer: Conversation state store, shareable between agent systems; defaults to a private MemorySaver
+            history_policy: How many turns to keep verbatim and whether to summarize older ones
+            intent_router: Classifier that picks the specialist for a message
+            call_limiter: Concurrency cap and rate-limit backoff for this API key's LLM calls
+        """
+        self.model = "gpt-4o-mini"
+        self.temperature = 0 if deterministic else 0.7
         self.llm = ChatOpenAI(
-            model="gpt-4o-mini",
+            model=self.model,
             api_key=openai_api_key,
-            temperature=0.7
+            temperature=self.temperature,
+            # Retries and backoff are handled by call_limiter
+            max_retries=0,
+            # Usage (including cached prompt tokens) is also reported for streamed calls
+            stream_usage=True,
+            # Pooled connections shared with every other agent system in the process
+            http_client=client_registry.openai_http_client(),
+            http_async_client=client_registry.openai_http_async_client()
         )
-        self.memory = MemorySaver()
+        self.response_cache = response_cache
+        self.history_policy = history_policy or HistoryPolicy()
+        self.intent_router = intent_router or default_intent_router
+        self.call_limiter = call_limiter or LLMCallLimiter()
+        self.memory = checkpointer or MemorySaver()
         self.graph = self._build_graph()
     
+    @staticmethod
+    def _timed_node(name: str, node):
+        """Wrap a graph node so each run is recorded in graph_node_duration_seconds"""
+        if inspect.iscoroutinefunction(node):
+            async def run(state):
+                with timed("graph_node", node=name):
+                    return await node(state)
+        else:
+            def run(state):
+                with timed("graph_node", node=name):
+                    return node(state)
+        return run
+    
     def _build_graph(self):
         workflow = StateGraph(AgentState)
         
-        workflow.add_node("router", self._router_agent)
-        workflow.add_node("profile_analyzer", self._profile_analyzer_agent)
-        workflow.add_node("content_generator", self._content_generator_agent)
-        workflow.add_node("job_matcher", self._job_matcher_agent)
-        workflow.add_node("career_counselor", self._career_counselor_agent)
-        workflow.add_node("respond", self._respond_agent)
+        workflow.add_node("router", self._timed_node("router", self._router_agent))
+        workflow.add_node("profile_analyzer", self._timed_node("profile_analyzer", self._profile_analyzer_agent))
+        workflow.add_node("content_generator", self._timed_node("content_generator", self._content_generator_agent))
+        workflow.add_node("job_matcher", self._timed_node("job_matcher", self._job_matcher_agent))
+        workflow.add_node("career_counselor", self._timed_node("career_counselor", self._career_counselor_agent))
+        # Times the matcher and counselor as their own nodes
+        workflow.add_node("match_and_counsel", self._match_and_counsel_agent)
+        workflow.add_node("merge_report", self._timed_node("merge_report", self._merge_report_agent))
+        workflow.add_node("respond", self._timed_node("respond", self._respond_agent))
         
         workflow.set_entry_point("router")
         
@@ -74,14 +157,19 @@ class LinkedInAgentSystem:
                 "content_generator": "content_generator",
                 "job_matcher": "job_matcher",
                 "career_counselor": "career_counselor",
+                "match_and_counsel": "match_and_counsel",
                 "respond": "respond"
             }
         )
         
-        workflow.add_edge("profile_analyzer", "respond")
-        workflow.add_edge("content_generator", "respond")
-        workflow.add_edge("job_matcher", "respond")
-        workflow.add_edge("career_counselor", "respond")
+        for agent in SPECIALIST_AGENTS:
+            workflow.add_conditional_edges(
+                agent,
+                self._after_specialist,
+                {"merge_report": "merge_report", "respond": "respond"}
+            )
+        workflow.add_edge("match_and_counsel", "merge_report")
+        workflow.add_edge("merge_report", "respond")
         
         workflow.add_conditional_edges(
             "respond",
@@ -94,144 +182,295 @@ class LinkedInAgentSystem:
         
         return workflow.compile(checkpointer=self.memory)
     
-    def _router_agent(self, state: AgentState) -> AgentState:
-        last_message = state["messages"][-1].content.lower() if state["messages"] else ""
-        
-        if ("analyze" in last_message or "profile" in last_message) and not state.get("analysis_result"):
-            state["next_action"] = "profile_analyzer"
-        elif any(word in last_message for word in ["improve", "enhance", "rewrite"]):
-            state["next_action"] = "content_generator"
-        elif any(word in last_message for word in ["job", "match", "role", "apply"]):
-            state["next_action"] = "job_matcher"
-        elif any(word in last_message for word in ["skill", "learn", "career", "path"]):
-            state["next_action"] = "career_counselor"
-        else:
-            state["next_action"] = "respond"
-        
-        return state
+    def _render_profile(self, agent: str, profile_data: dict, profile_hash: Optional[str] = None) -> str:
+        """Compact projection of the profile limited to the sections the agent uses"""
+        rendered = render_profile_for_agent(agent, profile_data)
+        projection_stats.record(agent, profile_data, rendered, profile_hash)
+        return rendered
     
-    def _profile_analyzer_agent(self, state: AgentState) -> AgentState:
-        profile_data = state.get("profile_data", {})
+    def _render_profile_context(self, agent: str, profile_data: dict, profile_hash: Optional[str] = None) -> str:
+        return f"LinkedIn Profile Data:\n{self._render_profile(agent, profile_data, profile_hash)}"
+    
+    async def _call_llm(self, llm, messages: list, agent: str):
+        with timed("llm_call", agent=agent) as span:
+            response = await self.call_limiter.call(lambda: llm.ainvoke(messages))
+            record_llm_usage(span, agent, response)
+        prompt_cache_stats.record(agent, response)
+        return response
+    
+    async def _invoke_specialist(self, agent: str, messages: list, profile_hash: Optional[str] = None) -> Tuple[Optional[dict], str]:
+        """
+        Call the LLM for a specialist agent with its response constrained to the agent's schema
+        
+        A response that still fails validation is sent back with the errors for up to
+        STRUCTURED_OUTPUT_MAX_REPAIRS corrections. Validated results are cached.
+        
+        Returns:
+            (validated result, or None if it never validated; raw text of the last response)
+        """
+        schema = AGENT_SCHEMAS[agent]
+        key = None
+        if self.response_cache is not None:
+            key = make_cache_key(self.model, self.temperature, schema.__name__,
+                                 [(type(m).__name__, m.content) for m in messages])
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                try:
+                    return schema.model_validate_json(cached).model_dump(), cached
+                except ValidationError:
+                    pass  # Cached under an older version of the schema
+        
+        bind_kwargs = {"response_format": response_format_for(schema)}
+        cache_key = prompt_cache_key(agent, profile_hash)
+        if cache_key:
+            bind_kwargs["prompt_cache_key"] = cache_key
+        llm = self.llm.bind(**bind_kwargs)
+        # Repairs extend the original messages, so the whole first attempt is a cached prefix
+        attempt = list(messages)
+        for repairs in range(STRUCTURED_OUTPUT_MAX_REPAIRS + 1):
+            response = await self._call_llm(llm, attempt, agent)
+            try:
+                with timed("structured_output_parse", agent=agent):
+                    result = schema.model_validate_json(response.content)
+            except ValidationError as e:
+                attempt += [
+                    AIMessage(content=response.content),
+                    HumanMessage(content=f"That response does not match the required JSON schema. Errors: {describe_validation_error(e)}\nReturn the corrected JSON only.")
+                ]
+                continue
+            
+            structured_output_stats.record(agent, repairs, valid=True)
+            if key is not None:
+                self.response_cache.set(key, result.model_dump_json())
+            return result.model_dump(), response.content
+        
+        structured_output_stats.record(agent, STRUCTURED_OUTPUT_MAX_REPAIRS, valid=False)
+        return None, response.content
+    
+    def _router_agent(self, state: AgentState) -> dict:
+        if state.get("report_mode"):
+            return {"next_action": "full_report"}
         
-        if not profile_data:
-            state["analysis_result"] = {"error": "No profile data available"}
-            return state
+        if state.get("intent") in SPECIALIST_AGENTS:
+            return {"next_action": state["intent"]}
         
-        messages = [
-            SystemMessage(content=PROFILE_ANALYSIS_PROMPT),
-            HumanMessage(content=f"LinkedIn Profile Data:\n{json.dumps(profile_data, indent=2)}")
-        ]
+        last_message = state["messages"][-1].content if state["messages"] else ""
         
-        response = self.llm.invoke(messages)
-        analysis_result = extract_json_from_response(response.content)
-        if not analysis_result:
-            analysis_result = {"analysis": response.content, "raw_analysis": True}
+        next_action, _ = self.intent_router.route(last_message)
         
-        state["analysis_result"] = analysis_result
-        return state
+        return {"next_action": next_action}
+    
+    def _result_key(self, state: AgentState, agent: str) -> str:
+        """Key of the inputs a specialist's result depends on"""
+        parts = [agent, state.get("profile_hash")]
+        if agent != "profile_analyzer":
+            parts.append(self._target_role(state, agent))
+        if agent == "career_counselor":
+            parts.append(self._matcher_gaps(state))
+        return make_cache_key(*parts)
+    
+    @staticmethod
+    def _target_role(state: AgentState, agent: str) -> str:
+        return state.get("target_role") or DEFAULT_TARGET_ROLES.get(agent, "")
     
-    def _content_generator_agent(self, state: AgentState) -> AgentState:
+    def _stored_result(self, state: AgentState, agent: str) -> Optional[dict]:
+        """The agent's earlier result in this session, if it was computed from the current profile and target role"""
+        if state.get("result_keys", {}).get(agent) != self._result_key(state, agent):
+            return None
+        return state.get("agent_results", {}).get(agent)
+    
+    def _store_result(self, state: AgentState, agent: str, result: dict, reusable: bool) -> dict:
+        return {
+            "agent_results": {agent: result},
+            "result_keys": {agent: self._result_key(state, agent) if reusable else None}
+        }
+    
+    def _current_results(self, state: AgentState) -> dict:
+        results = {}
+        for agent in SPECIALIST_AGENTS:
+            result = self._stored_result(state, agent)
+            if result is not None:
+                results[agent] = result
+        return results
+    
+    def _matcher_gaps(self, state: AgentState) -> list:
+        """Skill gaps from the job match for the current profile and target role, if one was run"""
+        job_match_result = self._stored_result(state, "job_matcher")
+        if not job_match_result:
+            return []
+        gaps = job_match_result["gaps"]
+        return gaps["missing_skills"] + gaps["missing_experience"]
+    
+    async def _profile_analyzer_agent(self, state: AgentState) -> dict:
         profile_data = state.get("profile_data", {})
-        target_role = state.get("target_role", "") or "General professional profile"
         
-        messages = [
-            SystemMessage(content=CONTENT_GENERATION_PROMPT),
-            HumanMessage(content=f"Profile Data: {json.dumps(profile_data, indent=2)}\nTarget Role: {target_role}")
-        ]
+        if not profile_data:
+            analysis_result = {"error": "No profile data available"}
+            return {"analysis_result": analysis_result, **self._store_result(state, "profile_analyzer", analysis_result, False)}
         
-        response = self.llm.invoke(messages)
+        analysis_result = self._stored_result(state, "profile_analyzer")
+        if analysis_result is not None:
+            return {"analysis_result": analysis_result}
         
-        content_suggestions = extract_json_from_response(response.content)
-        if not content_suggestions:
-            content_suggestions = {"suggestions": response.content, "raw_content": True}
+        messages = build_prompt(PROFILE_ANALYSIS_PROMPT, self._render_profile_context("profile_analyzer", profile_data, state.get("profile_hash")))
         
-        state["content_suggestions"] = content_suggestions
-        return state
+        analysis_result, content = await self._invoke_specialist("profile_analyzer", messages, state.get("profile_hash"))
+        reusable = analysis_result is not None
+        if not reusable:
+            analysis_result = {"analysis": content, "raw_analysis": True}
+        
+        return {"analysis_result": analysis_result, **self._store_result(state, "profile_analyzer", analysis_result, reusable)}
     
-    def _job_matcher_agent(self, state: AgentState) -> AgentState:
+    async def _content_generator_agent(self, state: AgentState) -> dict:
         profile_data = state.get("profile_data", {})
-        target_role = state.get("target_role", "Software Engineer")
+        target_role = self._target_role(state, "content_generator")
         
-        messages = [
-            SystemMessage(content=JOB_MATCH_PROMPT),
-            HumanMessage(content=f"Profile: {json.dumps(profile_data, indent=2)}\nTarget Role: {target_role}")
-        ]
+        content_suggestions = self._stored_result(state, "content_generator")
+        if content_suggestions is not None:
+            return {"content_suggestions": content_suggestions}
         
-        response = self.llm.invoke(messages)
+        messages = build_prompt(
+            CONTENT_GENERATION_PROMPT,
+            self._render_profile_context("content_generator", profile_data, state.get("profile_hash")),
+            f"Target Role: {target_role}"
+        )
         
-        job_match_result = extract_json_from_response(response.content)
-        if not job_match_result:
-            job_match_result = {"analysis": response.content, "raw_analysis": True}
-        else:
-            state["job_match_score"] = job_match_result.get("match_score", 0)
-            gaps = job_match_result.get("gaps", {})
-            if isinstance(gaps, dict):
-                state["skill_gaps"] = gaps.get("missing_skills", []) + gaps.get("missing_experience", [])
-            else:
-                state["skill_gaps"] = gaps if isinstance(gaps, list) else []
-        
-        state["analysis_result"] = job_match_result
-        return state
+        content_suggestions, content = await self._invoke_specialist("content_generator", messages, state.get("profile_hash"))
+        reusable = content_suggestions is not None
+        if not reusable:
+            content_suggestions = {"suggestions": content, "raw_content": True}
+        
+        return {"content_suggestions": content_suggestions, **self._store_result(state, "content_generator", content_suggestions, reusable)}
     
-    def _career_counselor_agent(self, state: AgentState) -> AgentState:
+    async def _job_matcher_agent(self, state: AgentState) -> dict:
         profile_data = state.get("profile_data", {})
-        skill_gaps = state.get("skill_gaps", [])
-        target_role = state.get("target_role", "")
-        
-        messages = [
-            SystemMessage(content=CAREER_COUNSELOR_PROMPT),
-            HumanMessage(content=f"Profile: {json.dumps(profile_data, indent=2)}\nSkill Gaps: {json.dumps(skill_gaps)}\nTarget Role: {target_role}")
-        ]
-        
-        response = self.llm.invoke(messages)
+        target_role = self._target_role(state, "job_matcher")
+        update = {}
+        
+        job_match_result = self._stored_result(state, "job_matcher")
+        if job_match_result is None:
+            messages = build_prompt(
+                JOB_MATCH_PROMPT,
+                self._render_profile_context("job_matcher", profile_data, state.get("profile_hash")),
+                f"Target Role: {target_role}"
+            )
+            
+            job_match_result, content = await self._invoke_specialist("job_matcher", messages, state.get("profile_hash"))
+            reusable = job_match_result is not None
+            if not reusable:
+                job_match_result = {"analysis": content, "raw_analysis": True}
+            update.update(self._store_result(state, "job_matcher", job_match_result, reusable))
+        
+        if "raw_analysis" not in job_match_result:
+            update["job_match_score"] = job_match_result["match_score"]
+            gaps = job_match_result["gaps"]
+            update["skill_gaps"] = gaps["missing_skills"] + gaps["missing_experience"]
+        
+        update["analysis_result"] = job_match_result
+        return update
+    
+    async def _career_counselor_agent(self, state: AgentState) -> dict:
+        profile_data = state.get("profile_data", {})
+        # Gaps from the job match for this profile and role; in a full report the matcher runs just before
+        skill_gaps = self._matcher_gaps(state)
+        target_role = self._target_role(state, "career_counselor")
+        
+        counseling_result = self._stored_result(state, "career_counselor")
+        if counseling_result is not None:
+            return {"analysis_result": counseling_result}
+        
+        messages = build_prompt(
+            CAREER_COUNSELOR_PROMPT,
+            self._render_profile_context("career_counselor", profile_data, state.get("profile_hash")),
+            f"Skill Gaps: {render_compact(skill_gaps)}\nTarget Role: {target_role}"
+        )
         
-        counseling_result = extract_json_from_response(response.content)
-        if not counseling_result:
-            counseling_result = {"guidance": response.content, "raw_guidance": True}
+        counseling_result, content = await self._invoke_specialist("career_counselor", messages, state.get("profile_hash"))
+        reusable = counseling_result is not None
+        if not reusable:
+            counseling_result = {"guidance": content, "raw_guidance": True}
         
-        state["analysis_result"] = counseling_result
-        return state
+        return {"analysis_result": counseling_result, **self._store_result(state, "career_counselor", counseling_result, reusable)}
+    
+    async def _match_and_counsel_agent(self, state: AgentState) -> dict:
+        """Job match then career counseling, the full report's one sequential branch"""
+        update = await self._timed_node("job_matcher", self._job_matcher_agent)(state)
+        matched = {
+            **state,
+            "agent_results": _merge_dicts(state.get("agent_results"), update.get("agent_results")),
+            "result_keys": _merge_dicts(state.get("result_keys"), update.get("result_keys")),
+        }
+        counsel = await self._timed_node("career_counselor", self._career_counselor_agent)(matched)
+        return {
+            **update,
+            **counsel,
+            "agent_results": _merge_dicts(update.get("agent_results"), counsel.get("agent_results")),
+            "result_keys": _merge_dicts(update.get("result_keys"), counsel.get("result_keys")),
+        }
+    
+    def _merge_report_agent(self, state: AgentState) -> dict:
+        """Combine the specialists' results from a full-report fan-out into one report"""
+        results = state.get("agent_results", {})
+        report = {section: results[agent] for section, agent in REPORT_SECTIONS.items() if agent in results}
+        return {"report": report, "analysis_result": report}
     
-    def _respond_agent(self, state: AgentState) -> AgentState:
-        analysis_result = state.get("analysis_result", {})
-        content_suggestions = state.get("content_suggestions", {})
+    def _render_structured(self, state: AgentState) -> Optional[str]:
+        """Template-rendered response for the specialist that just ran, if one applies"""
+        if state.get("report_mode"):
+            return render_report(state.get("report", {}), REPORT_SECTIONS)
+        agent = state.get("next_action")
+        return render_structured(agent, state.get("agent_results", {}).get(agent))
+    
+    async def _respond_agent(self, state: AgentState) -> dict:
+        if state.get("response_mode") == "structured":
+            rendered = self._render_structured(state)
+            if rendered is not None:
+                return {"messages": state["messages"] + [AIMessage(content=rendered)]}
         
-        system_prompt = """You are a friendly, professional LinkedIn career assistant.
-Convert the technical analysis into a warm, conversational response.
-Use natural language, be encouraging, and provide actionable next steps.
-Keep responses focused and digestible - break complex info into clear sections."""
+        next_action = state.get("next_action")
         
         context_parts = []
-        if analysis_result:
-            context_parts.append(f"Analysis Results: {json.dumps(analysis_result, indent=2)}")
-        if content_suggestions:
-            context_parts.append(f"Content Suggestions: {json.dumps(content_suggestions, indent=2)}")
+        if state.get("report_mode"):
+            context_parts.append(f"Analysis Results: {render_compact(state.get('report', {}))}")
+        elif next_action in SPECIALIST_AGENTS:
+            result = state.get("agent_results", {}).get(next_action)
+            if result:
+                context_parts.append(f"Analysis Results: {render_compact(result)}")
+        else:
+            # Follow-up questions are answered from results already computed for this profile and role
+            current = self._current_results(state)
+            for section, agent in REPORT_SECTIONS.items():
+                if agent in current:
+                    context_parts.append(f"Earlier {section.replace('_', ' ')}: {render_compact(current[agent])}")
         
         context = "\n\n".join(context_parts) if context_parts else "No analysis available yet."
         user_message = state["messages"][-1].content if state["messages"] else ""
+        history_summary = state.get("history_summary")
+        earlier = f"Earlier in this conversation: {history_summary}\n\n" if history_summary else ""
         
-        messages = [
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=f"User asked: {user_message}\n\nData to present:\n{context}")
-        ]
+        # Follow-up turns often present the same data, so it goes ahead of the summary and question
+        messages = build_prompt(RESPONSE_PROMPT, f"Data to present:\n{context}", f"{earlier}User asked: {user_message}")
         
-        response = self.llm.invoke(messages)
-        state["messages"].append(AIMessage(content=response.content))
+        response = await self._call_llm(self.llm, messages, "respond")
         
-        return state
+        return {"messages": state["messages"] + [AIMessage(content=response.content)]}
+    
+    def _route_decision(self, state: AgentState):
+        next_action = state.get("next_action", "respond")
+        # A list of nodes fans out to all of them in parallel
+        return list(REPORT_BRANCHES) if next_action == "full_report" else next_action
     
-    def _route_decision(self, state: AgentState) -> str:
-        return state.get("next_action", "respond")
+    def _after_specialist(self, state: AgentState) -> str:
+        return "merge_report" if state.get("report_mode") else "respond"
     
     def _should_continue(self, state: AgentState) -> str:
         return "end"
     
-    def chat(self, message: str, profile_data: Optional[dict] = None, 
-             session_id: str = "default", target_role: Optional[str] = None) -> str:
-        config = {"configurable": {"thread_id": session_id}}
-        
+    async def _prepare_state(self, config: dict, message: str, profile_data: Optional[dict],
+                             target_role: Optional[str], report_mode: bool = False,
+                             response_mode: str = "conversational", intent: Optional[str] = None) -> dict:
         try:
-            current_state = self.graph.get_state(config)
+            current_state = await self.graph.aget_state(config)
             state = current_state.values if current_state else {}
         except Exception:
             state = {}
@@ -240,18 +479,144 @@ Keep responses focused and digestible - break complex info into clear sections."
             state["messages"] = []
         
         state["messages"].append(HumanMessage(content=message))
+        await self._apply_history_policy(state)
         
         if profile_data:
             state["profile_data"] = profile_data
+            state["profile_hash"] = make_cache_key(profile_data)
         
         if target_role:
             state["target_role"] = target_role
         
-        result = self.graph.invoke(state, config)
+        if intent and intent not in SPECIALIST_AGENTS:
+            raise ValueError(f"Unknown intent {intent!r}, expected one of {', '.join(SPECIALIST_AGENTS)}")
+        
+        state["report_mode"] = report_mode
+        state["response_mode"] = response_mode
+        state["intent"] = intent or ""
+        return state
+    
+    async def _apply_history_policy(self, state: dict):
+        """Trim the stored messages to the policy window, folding trimmed turns into the rolling summary"""
+        older, recent = self.history_policy.split(state["messages"])
+        if not older:
+            return
+        
+        if self.history_policy.summarize:
+            transcript = "\n".join(
+                f"{'User' if isinstance(msg, HumanMessage) else 'Assistant'}: {msg.content}" for msg in older
+            )
+            response = await self._call_llm(self.llm, build_prompt(
+                HISTORY_SUMMARY_PROMPT,
+                request=f"Previous summary: {state.get('history_summary') or '(none)'}\n\nConversation:\n{transcript}"
+            ), "history_summary")
+            state["history_summary"] = response.content
+        
+        state["messages"] = recent
+    
+    async def achat(self, message: str, profile_data: Optional[dict] = None,
+                    session_id: str = "default", target_role: Optional[str] = None,
+                    response_mode: str = "conversational", intent: Optional[str] = None) -> str:
+        """
+        Run a chat turn and return the assistant's response
+        
+        Args:
+            intent: Specialist to run (one of SPECIALIST_AGENTS); None lets the intent router classify the message
+        """
+        config = {"configurable": {"thread_id": session_id}}
+        state = await self._prepare_state(config, message, profile_data, target_role,
+                                          response_mode=response_mode, intent=intent)
+        
+        result = await self.graph.ainvoke(state, config)
         
         assistant_messages = [msg.content for msg in result["messages"] if isinstance(msg, AIMessage)]
         return assistant_messages[-1] if assistant_messages else "I'm sorry, I couldn't process that request."
     
+    async def afull_report(self, message: str, profile_data: Optional[dict] = None,
+                           session_id: str = "default", target_role: Optional[str] = None,
+                           response_mode: str = "conversational") -> dict:
+        """
+        Run every specialist and merge their results
+        
+        The analyzer, the content generator and the job matcher run concurrently;
+        the career counselor follows the matcher so it can use the gaps it found.
+        
+        Returns:
+            {"report": {section: result}, "summary": overview of the report in the requested response mode}
+        """
+        config = {"configurable": {"thread_id": session_id}}
+        state = await self._prepare_state(config, message, profile_data, target_role, report_mode=True,
+                                          response_mode=response_mode)
+        
+        result = await self.graph.ainvoke(state, config)
+        
+        assistant_messages = [msg.content for msg in result["messages"] if isinstance(msg, AIMessage)]
+        return {"report": result.get("report", {}), "summary": assistant_messages[-1] if assistant_messages else ""}
+    
+    def chat(self, message: str, profile_data: Optional[dict] = None, 
+             session_id: str = "default", target_role: Optional[str] = None,
+             response_mode: str = "conversational", intent: Optional[str] = None) -> str:
+        """Blocking wrapper around achat for callers outside an event loop"""
+        return asyncio.run(self.achat(message, profile_data=profile_data, session_id=session_id,
+                                      target_role=target_role, response_mode=response_mode, intent=intent))
+    
+    async def chat_stream(self, message: str, profile_data: Optional[dict] = None,
+                          session_id: str = "default", target_role: Optional[str] = None,
+                          report_mode: bool = False, response_mode: str = "conversational",
+                          intent: Optional[str] = None) -> AsyncIterator[Tuple[str, dict]]:
+        """
+        Run a chat turn and yield (event, data) pairs as the graph progresses
+        
+        intent pins the specialist as in achat.
+        
+        Events:
+            route: the router picked an agent ({"agent": ...}), "full_report" in report mode
+            agent_started / agent_finished: a specialist or the responder began / completed
+            token: a chunk of the final response text ({"content": ...}); a structured response is one chunk
+            done: the complete response ({"response": ...})
+        """
+        config = {"configurable": {"thread_id": session_id}}
+        state = await self._prepare_state(config, message, profile_data, target_role, report_mode, response_mode, intent)
+        tokens = []
+        
+        async for mode, payload in self.graph.astream(state, config, stream_mode=["updates", "messages"]):
+            if mode == "messages":
+                chunk, metadata = payload
+                if metadata.get("langgraph_node") == "respond" and isinstance(chunk, AIMessageChunk) and chunk.content:
+                    tokens.append(chunk.content)
+                    yield "token", {"content": chunk.content}
+                continue
+            
+            for node, update in payload.items():
+                if node == "router":
+                    next_action = (update or {}).get("next_action", "respond")
+                    yield "route", {"agent": next_action}
+                    for agent in (SPECIALIST_AGENTS if next_action == "full_report" else (next_action,)):
+                        yield "agent_started", {"agent": agent}
+                elif node in SPECIALIST_AGENTS:
+                    yield "agent_finished", {"agent": node}
+                    if not state["report_mode"]:
+                        yield "agent_started", {"agent": "respond"}
+                elif node == "match_and_counsel":
+                    yield "agent_finished", {"agent": "job_matcher"}
+                    yield "agent_finished", {"agent": "career_counselor"}
+                elif node == "merge_report":
+                    yield "agent_started", {"agent": "respond"}
+                elif node == "respond":
+                    if not tokens and update and update.get("messages"):
+                        # Rendered from a template, so nothing was streamed token by token
+                        tokens.append(update["messages"][-1].content)
+                        yield "token", {"content": tokens[-1]}
+                    yield "agent_finished", {"agent": "respond"}
+        
+        response = "".join(tokens)
+        if not response:
+            # Read without blocking the event loop: a persistent checkpointer does I/O here
+            final_state = await self.graph.aget_state(config)
+            messages = final_state.values.get("messages") if final_state else None
+            response = messages[-1].content if messages and isinstance(messages[-1], AIMessage) else "I'm sorry, I couldn't process that request."
+        yield "done", {"response": response}
+    
     def get_conversation_history(self, session_id: str = "default") -> list:
         config = {"configurable": {"thread_id": session_id}}
         
@@ -271,5 +636,5 @@ Keep responses focused and digestible - break complex info into clear sections."
         return []
     
     def clear_session(self, session_id: str = "default"):
-        pass
+        self.memory.delete_thread(session_id)
 
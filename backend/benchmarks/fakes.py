@@ -0,0 +1,218 @@
+"""
+Deterministic local stand-ins for the OpenAI and Apify APIs
+
+The fake OpenAI API sits behind the pooled httpx clients in clients.py, so
+ChatOpenAI, the call limiter and structured-output validation all run as they
+do in production; only the network round trip is replaced by a configurable
+sleep. Structured requests are answered with a minimal instance of the
+requested JSON schema.
+"""
+import asyncio
+import copy
+import json
+import random
+import time
+from typing import List, Optional
+
+import httpx
+
+FAKE_REPLY = ("Thanks for sharing your profile! Here is what stands out, what to tighten up, "
+              "and three concrete next steps you can take this week.")
+
+
+def fake_instance(schema: dict, defs: Optional[dict] = None):
+    """Smallest value that satisfies a strict JSON schema (objects, arrays, scalars, $ref, anyOf)"""
+    defs = defs if defs is not None else schema.get("$defs", {})
+    if "$ref" in schema:
+        return fake_instance(defs[schema["$ref"].split("/")[-1]], defs)
+    if "anyOf" in schema:
+        options = [option for option in schema["anyOf"] if option.get("type") != "null"]
+        return fake_instance(options[0], defs) if options else None
+
+    kind = schema.get("type")
+    if kind == "object":
+        return {name: fake_instance(prop, defs) for name, prop in schema.get("properties", {}).items()}
+    if kind == "array":
+        return [fake_instance(schema.get("items", {"type": "string"}), defs)]
+    if kind == "integer":
+        return 7
+    if kind == "number":
+        return 7.5
+    if kind == "boolean":
+        return True
+    return "Example text"
+
+
+def _approx_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class FakeOpenAI:
+    """
+    Chat completions endpoint with fixed latency plus optional jitter
+
+    Replies queued in replies are returned first, verbatim; after that a
+    structured request gets the smallest instance of its schema and any
+    other request FAKE_REPLY. Every request body is kept in requests.
+    """
+
+    def __init__(self, latency_ms: float = 200, jitter_ms: float = 0, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self._random = random.Random(seed)
+        self.calls = 0
+        self.replies: List[str] = []
+        self.requests: List[dict] = []
+
+    def _delay(self) -> float:
+        return max(0.0, self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+
+    def _respond(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        body = json.loads(request.content)
+        self.requests.append(body)
+        response_format = body.get("response_format") or {}
+        if self.replies:
+            content = self.replies.pop(0)
+        elif response_format.get("type") == "json_schema":
+            content = json.dumps(fake_instance(response_format["json_schema"]["schema"]))
+        else:
+            content = FAKE_REPLY
+        usage = {
+            "prompt_tokens": _approx_tokens(json.dumps(body.get("messages", []))),
+            "completion_tokens": _approx_tokens(content),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        base = {"id": f"chatcmpl-fake-{self.calls}", "created": int(time.time()), "model": body.get("model", "fake")}
+
+        if not body.get("stream"):
+            return httpx.Response(200, json={
+                **base,
+                "object": "chat.completion",
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": usage,
+            })
+
+        def chunk(payload: dict) -> str:
+            return f"data: {json.dumps({**base, 'object': 'chat.completion.chunk', **payload})}\n\n"
+
+        words = content.split(" ")
+        events = [chunk({"choices": [{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}]})]
+        events += [
+            chunk({"choices": [{"index": 0, "delta": {"content": word if i == 0 else f" {word}"}, "finish_reason": None}]})
+            for i, word in enumerate(words)
+        ]
+        events.append(chunk({"choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}))
+        events.append(chunk({"choices": [], "usage": usage}))
+        events.append("data: [DONE]\n\n")
+        return httpx.Response(200, content="".join(events).encode(), headers={"content-type": "text/event-stream"})
+
+    async def handle_async(self, request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(self._delay())
+        return self._respond(request)
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        time.sleep(self._delay())
+        return self._respond(request)
+
+
+class _Page:
+    def __init__(self, items: list):
+        self.items = items
+
+
+class FakeApifyClientAsync:
+    """
+    The slice of ApifyClientAsync the scraper uses: actor().start, run().wait_for_finish/abort
+    and dataset().list_items. Each run pushes one fixture profile per input URL, spread
+    evenly over run_latency_ms, so incremental dataset reads see items arrive.
+    """
+
+    def __init__(self, profiles: List[dict], run_latency_ms: float = 1000):
+        self.profiles = profiles
+        self.run_latency_ms = run_latency_ms
+        self.runs = {}
+        self.started = 0
+
+    def actor(self, actor_id: str):
+        return _FakeActor(self)
+
+    def run(self, run_id: str):
+        return _FakeRun(self, run_id)
+
+    def dataset(self, dataset_id: str):
+        return _FakeDataset(self, dataset_id)
+
+    def _profile_for(self, url: str) -> dict:
+        slug = url.rstrip("/").rsplit("/", 1)[-1]
+        profile = copy.deepcopy(self.profiles[sum(map(ord, slug)) % len(self.profiles)])
+        profile["linkedinUrl"] = url
+        profile["publicIdentifier"] = slug
+        return profile
+
+    def _visible_items(self, run: dict) -> list:
+        if run["status"] == "SUCCEEDED":
+            return run["items"]
+        elapsed = time.monotonic() - run["started"]
+        count = int(len(run["items"]) * min(1.0, elapsed / run["duration"])) if run["duration"] else len(run["items"])
+        return run["items"][:count]
+
+    def _status(self, run: dict) -> dict:
+        if run["status"] == "RUNNING" and time.monotonic() - run["started"] >= run["duration"]:
+            run["status"] = run.get("final_status", "SUCCEEDED")
+        return {"id": run["id"], "status": run["status"], "defaultDatasetId": run["id"]}
+
+
+class _FakeActor:
+    def __init__(self, client: FakeApifyClientAsync):
+        self.client = client
+
+    async def start(self, run_input: dict, **kwargs) -> dict:
+        client = self.client
+        client.started += 1
+        run_id = f"fake-run-{client.started}"
+        client.runs[run_id] = {
+            "id": run_id,
+            "status": "RUNNING",
+            "started": time.monotonic(),
+            "duration": client.run_latency_ms / 1000,
+            "items": [client._profile_for(url) for url in run_input["urls"]],
+        }
+        return client._status(client.runs[run_id])
+
+
+class _FakeRun:
+    def __init__(self, client: FakeApifyClientAsync, run_id: str):
+        self.client = client
+        self.run = client.runs[run_id]
+
+    async def wait_for_finish(self, wait_secs: Optional[int] = None) -> dict:
+        remaining = self.run["duration"] - (time.monotonic() - self.run["started"])
+        if self.run["status"] == "RUNNING" and remaining > 0:
+            await asyncio.sleep(remaining if wait_secs is None else min(wait_secs, remaining))
+        return self.client._status(self.run)
+
+    async def abort(self, **kwargs) -> dict:
+        if self.run["status"] == "RUNNING":
+            self.run["status"] = "ABORTED"
+        return self.client._status(self.run)
+
+
+class _FakeDataset:
+    def __init__(self, client: FakeApifyClientAsync, dataset_id: str):
+        self.client = client
+        self.run = client.runs[dataset_id]
+
+    async def list_items(self, offset: int = 0, limit: Optional[int] = None) -> _Page:
+        self.client._status(self.run)
+        items = self.client._visible_items(self.run)[offset:]
+        return _Page(items[:limit] if limit else items)
+
+
+def install_fakes(fake_openai: FakeOpenAI, fake_apify: FakeApifyClientAsync):
+    """Point the process-wide client registry at the fakes; call before any agent system is created"""
+    from clients import client_registry
+
+    client_registry._openai_client = httpx.Client(transport=httpx.MockTransport(fake_openai.handle))
+    client_registry._openai_async_client = httpx.AsyncClient(transport=httpx.MockTransport(fake_openai.handle_async))
+    client_registry.apify_async = lambda token: fake_apify
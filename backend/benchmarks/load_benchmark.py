@@ -0,0 +1,203 @@
+"""
+End-to-end load test of the API against fake OpenAI and Apify backends
+
+Drives the FastAPI app in-process (httpx ASGI transport, no network) at
+increasing concurrency and reports p50/p95/p99 latency, requests/sec and
+resident memory growth per scenario. Requests shed with 429/503 by admission
+control are counted separately from errors. Latencies of the fakes are configurable,
+so changes to the agent graph, scraper or limits can be compared run to run.
+
+Usage (from backend/):
+    python benchmarks/load_benchmark.py [--scenarios chat,analyze-profile] [--concurrency 1,8,32]
+        [--requests 64] [--llm-latency-ms 200] [--apify-latency-ms 1000] [--json results.json]
+"""
+import argparse
+import asyncio
+import gc
+import importlib
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+
+# Process-local stores, no response cache, and a scratch profile cache: every request does the full work
+_scratch = tempfile.mkdtemp(prefix="linkedin-bench-")
+for name, value in {
+    "OPENAI_API_KEY": "sk-bench",
+    "APIFY_API_TOKEN": "apify-bench",
+    "CHECKPOINTER_BACKEND": "memory",
+    "JOB_STORE_BACKEND": "memory",
+    "LLM_CACHE_BACKEND": "none",
+    "PROFILE_CACHE_PATH": os.path.join(_scratch, "profile_cache.sqlite3"),
+    "APIFY_POLL_INTERVAL_SECONDS": "1",
+}.items():
+    os.environ.setdefault(name, value)
+
+# Admission limits well above any tested concurrency, so runs measure the app rather than its 429/503
+# backpressure (all requests share one Apify token); set these explicitly to benchmark the limits themselves
+for name in ("APIFY_MAX_CONCURRENT_RUNS", "APIFY_MAX_QUEUED_RUNS", "APIFY_MAX_CONCURRENT_RUNS_PER_TENANT",
+             "APIFY_MAX_QUEUED_RUNS_PER_TENANT", "OPENAI_MAX_CONCURRENT_CALLS", "OPENAI_MAX_QUEUED_CALLS",
+             "OPENAI_MAX_CONCURRENT_CALLS_PER_KEY", "OPENAI_MAX_QUEUED_CALLS_PER_KEY"):
+    os.environ.setdefault(name, "100000")
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+sys.path.insert(0, BENCHMARKS_DIR)
+
+import httpx  # noqa: E402
+
+from fakes import FakeApifyClientAsync, FakeOpenAI, install_fakes  # noqa: E402
+
+FIXTURES_PATH = os.path.join(BENCHMARKS_DIR, "fixture_profiles.json")
+
+CHAT_MESSAGES = [
+    "Can you analyze my profile?",
+    "How well do I match a data engineer role?",
+    "Rewrite my headline and about section",
+    "What skills should I learn next?",
+    "Thanks, that helps!",
+]
+
+# Scenario -> (path, request body for request i, given a unique profile URL / session id)
+SCENARIOS = {
+    "chat": ("/chat", lambda i, key: {"message": CHAT_MESSAGES[i % len(CHAT_MESSAGES)], "session_id": key}),
+    "analyze-profile": ("/analyze-profile", lambda i, key: {"profile_url": f"https://www.linkedin.com/in/{key}"}),
+    "job-fit-analysis": ("/job-fit-analysis", lambda i, key: {"profile_url": f"https://www.linkedin.com/in/{key}",
+                                                              "target_role": "Data Engineer"}),
+    "content-enhancement": ("/content-enhancement", lambda i, key: {"profile_url": f"https://www.linkedin.com/in/{key}",
+                                                                    "target_role": "Data Engineer"}),
+    "career-guidance": ("/career-guidance", lambda i, key: {"profile_url": f"https://www.linkedin.com/in/{key}",
+                                                            "target_role": "Data Engineer"}),
+    "full-report": ("/full-report", lambda i, key: {"profile_url": f"https://www.linkedin.com/in/{key}",
+                                                    "target_role": "Data Engineer"}),
+}
+
+
+def rss_mb() -> float:
+    """Current resident set size, falling back to the peak where /proc is unavailable"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2 ** 20 if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(sorted_values, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))]
+
+
+async def run_level(client: httpx.AsyncClient, scenario: str, concurrency: int, requests: int,
+                    api_keys: int, run_id: str, profiles: list, session_store) -> dict:
+    path, build_body = SCENARIOS[scenario]
+    latencies, errors, rejected = [], 0, 0
+    next_request = iter(range(requests))
+
+    async def worker():
+        nonlocal errors, rejected
+        for i in next_request:
+            # Unique URLs and sessions, so every request scrapes and starts a fresh conversation
+            key = f"bench-{run_id}-{scenario}-{concurrency}-{i}"
+            if scenario == "chat":
+                # /chat reads the profile from the session instead of scraping it
+                session_store.set(key, "profile", profiles[i % len(profiles)])
+            body = {**build_body(i, key), "api_key": f"sk-bench-{i % api_keys}"}
+            start = time.perf_counter()
+            response = await client.post(path, json=body)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code in (429, 503) and "Retry-After" in response.headers:
+                # Shed by admission control: reported, but not a failure of the app
+                rejected += 1
+            elif response.status_code != 200:
+                errors += 1
+
+    gc.collect()
+    rss_before = rss_mb()
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    gc.collect()
+
+    latencies.sort()
+    return {
+        "scenario": scenario,
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "rejected": rejected,
+        "rps": round(requests / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+        "rss_growth_mb": round(rss_mb() - rss_before, 1),
+    }
+
+
+async def run(args) -> list:
+    with open(FIXTURES_PATH) as f:
+        profiles = json.load(f)
+    fake_openai = FakeOpenAI(args.llm_latency_ms, args.llm_jitter_ms, seed=args.seed)
+    fake_apify = FakeApifyClientAsync(profiles, args.apify_latency_ms)
+    install_fakes(fake_openai, fake_apify)
+
+    # Imported only now, so the app's agent systems pick up the fake clients
+    api = importlib.import_module("main")
+
+    results = []
+    run_id = str(int(time.time()))
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for scenario in args.scenarios:
+            for concurrency in args.concurrency:
+                calls_before, runs_before = fake_openai.calls, fake_apify.started
+                result = await run_level(client, scenario, concurrency, args.requests, args.api_keys, run_id, profiles, api.session_store)
+                result["llm_calls"] = fake_openai.calls - calls_before
+                result["apify_runs"] = fake_apify.started - runs_before
+                results.append(result)
+                print(f"{scenario:<20} c={concurrency:<4} {result['rps']:>8.2f} req/s  "
+                      f"p50 {result['p50_ms']:>8.1f}ms  p95 {result['p95_ms']:>8.1f}ms  p99 {result['p99_ms']:>8.1f}ms  "
+                      f"errors {result['errors']:<3} rejected {result['rejected']:<3} llm calls {result['llm_calls']:<5} "
+                      f"rss {result['rss_growth_mb']:+.1f}MB", flush=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenarios", default="chat,analyze-profile,job-fit-analysis,full-report",
+                        help=f"Comma-separated, from: {', '.join(SCENARIOS)}")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=64, help="Requests per scenario and concurrency level")
+    parser.add_argument("--api-keys", type=int, default=1, help="Distinct OpenAI keys to spread requests over")
+    parser.add_argument("--llm-latency-ms", type=float, default=200)
+    parser.add_argument("--llm-jitter-ms", type=float, default=0)
+    parser.add_argument("--apify-latency-ms", type=float, default=1000, help="Duration of each fake actor run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--max-p95-ms", type=float, help="Exit non-zero if any level's p95 exceeds this (for CI)")
+    args = parser.parse_args()
+    args.scenarios = [s for s in args.scenarios.split(",") if s]
+    args.concurrency = [int(c) for c in args.concurrency.split(",") if c]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    print(f"fake LLM {args.llm_latency_ms:.0f}ms (+/-{args.llm_jitter_ms:.0f}), fake Apify run {args.apify_latency_ms:.0f}ms, "
+          f"{args.requests} requests per level, {args.api_keys} API key(s)")
+    results = asyncio.run(run(args))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    failed = [r for r in results if r["errors"] or (args.max_p95_ms and r["p95_ms"] > args.max_p95_ms)]
+    if failed:
+        for r in failed:
+            print(f"FAILED {r['scenario']} c={r['concurrency']}: {r['errors']} errors, p95 {r['p95_ms']}ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
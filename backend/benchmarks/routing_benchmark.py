@@ -0,0 +1,96 @@
+"""
+Routing accuracy and latency of the TF-IDF intent router vs the old keyword router
+
+Samples marked "endpoint" are the prompts the analysis endpoints send. The
+endpoints pin their specialist explicitly, but the same wording reaches /chat
+too, so the script exits non-zero if the TF-IDF router misroutes any of them.
+
+Usage (from backend/):
+    python benchmarks/routing_benchmark.py [--threshold 0.12] [--repeat 200]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from intent_router import IntentRouter, ROUTER_CONFIDENCE_THRESHOLD  # noqa: E402
+
+SAMPLES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "routing_samples.json")
+
+
+def keyword_route(message: str) -> str:
+    """The substring router this benchmark compares against (first turn, no prior analysis)"""
+    message = message.lower()
+    if "analyze" in message or "profile" in message:
+        return "profile_analyzer"
+    if any(word in message for word in ["improve", "enhance", "rewrite"]):
+        return "content_generator"
+    if any(word in message for word in ["job", "match", "role", "apply"]):
+        return "job_matcher"
+    if any(word in message for word in ["skill", "learn", "career", "path"]):
+        return "career_counselor"
+    return "respond"
+
+
+def evaluate(name, route, samples, repeat):
+    misroutes = Counter()
+    correct = 0
+    for sample in samples:
+        predicted = route(sample["message"])
+        if predicted == sample["intent"]:
+            correct += 1
+        else:
+            misroutes[(sample["intent"], predicted)] += 1
+
+    latencies = []
+    for _ in range(repeat):
+        for sample in samples:
+            start = time.perf_counter()
+            route(sample["message"])
+            latencies.append((time.perf_counter() - start) * 1e6)
+    latencies.sort()
+
+    print(f"\n{name}")
+    print(f"  accuracy: {correct}/{len(samples)} ({correct / len(samples):.1%})")
+    print(f"  latency per message: mean {statistics.mean(latencies):.1f}us, "
+          f"p50 {latencies[len(latencies) // 2]:.1f}us, p95 {latencies[int(len(latencies) * 0.95)]:.1f}us")
+    for (expected, predicted), count in misroutes.most_common():
+        print(f"  misrouted {expected} -> {predicted}: {count}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threshold", type=float, default=ROUTER_CONFIDENCE_THRESHOLD)
+    parser.add_argument("--repeat", type=int, default=200, help="Timing passes over the sample set")
+    args = parser.parse_args()
+
+    with open(SAMPLES_PATH) as f:
+        samples = json.load(f)
+    print(f"{len(samples)} labelled messages, {len(set(s['intent'] for s in samples))} intents")
+
+    evaluate("keyword router", keyword_route, samples, args.repeat)
+
+    start = time.perf_counter()
+    router = IntentRouter(threshold=args.threshold)
+    print(f"\nTF-IDF router built in {(time.perf_counter() - start) * 1e3:.1f}ms (threshold {args.threshold})")
+
+    uncached = IntentRouter(threshold=args.threshold, vector_cache_size=0)
+    evaluate("TF-IDF router (uncached)", lambda m: uncached.route(m)[0], samples, args.repeat)
+    evaluate("TF-IDF router (cached vectors)", lambda m: router.route(m)[0], samples, args.repeat)
+
+    endpoint_samples = [s for s in samples if s.get("endpoint")]
+    misrouted = [s for s in endpoint_samples if router.route(s["message"])[0] != s["intent"]]
+    print(f"\nendpoint prompts routed correctly: {len(endpoint_samples) - len(misrouted)}/{len(endpoint_samples)}")
+    for sample in misrouted:
+        print(f"  MISROUTED ({sample['intent']}): {sample['message']}")
+    if misrouted:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,461 @@
+import asyncio
+import base64
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import dotenv
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+
+from session_store import BoundedMemorySaver, SessionStore, SESSION_CHECKPOINTS_PER_THREAD, SESSION_IDLE_TTL_SECONDS
+
+dotenv.load_dotenv()
+# "sqlite", "redis" or "memory" (process-local, not shared between workers)
+CHECKPOINTER_BACKEND = os.getenv("CHECKPOINTER_BACKEND", "sqlite")
+CHECKPOINTER_SQLITE_PATH = os.getenv("CHECKPOINTER_SQLITE_PATH", os.path.join(os.path.dirname(__file__), "checkpoints.sqlite3"))
+CHECKPOINTER_REDIS_URL = os.getenv("CHECKPOINTER_REDIS_URL", "redis://localhost:6379/0")
+
+# (type, payload) pair produced by serde.dumps_typed
+Typed = Tuple[str, bytes]
+# checkpoint id -> (checkpoint, metadata, parent checkpoint id)
+CheckpointRecords = Dict[str, Tuple[Typed, Typed, Optional[str]]]
+# (task id, write index, channel, value, task path)
+WriteRow = Tuple[str, int, str, Typed, str]
+
+
+class PersistentCheckpointSaver(BaseCheckpointSaver, ABC):
+    """
+    Checkpointer over a shared external store, so any worker can resume any thread
+
+    Implements the LangGraph saver protocol on top of a handful of storage
+    primitives that subclasses provide. Only the latest checkpoints of each
+    thread are kept, and idle threads expire after idle_ttl_seconds. With a
+    session_store, writing a checkpoint touches the session and sessions it
+    evicts delete their thread, as with BoundedMemorySaver.
+    """
+
+    def __init__(self, checkpoints_per_thread: int = SESSION_CHECKPOINTS_PER_THREAD,
+                 idle_ttl_seconds: int = SESSION_IDLE_TTL_SECONDS,
+                 session_store: Optional[SessionStore] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.checkpoints_per_thread = checkpoints_per_thread
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.session_store = session_store
+        if session_store is not None:
+            session_store.add_eviction_listener(self.delete_thread)
+
+    # Storage primitives
+
+    @abstractmethod
+    def _load_checkpoints(self, thread_id: str, checkpoint_ns: str) -> CheckpointRecords:
+        """Checkpoints of one namespace of a thread, keyed by checkpoint id"""
+
+    @abstractmethod
+    def _save_checkpoint(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str,
+                         checkpoint: Typed, metadata: Typed, parent_id: Optional[str]):
+        """Store a checkpoint and mark its thread as active"""
+
+    @abstractmethod
+    def _delete_checkpoints(self, thread_id: str, checkpoint_ns: str, checkpoint_ids: List[str]):
+        """Delete the given checkpoints and their writes"""
+
+    @abstractmethod
+    def _list_checkpoint_ids(self, thread_id: str, checkpoint_ns: str) -> List[str]:
+        """Ids of every checkpoint stored in one namespace of a thread"""
+
+    @abstractmethod
+    def _load_writes(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> List[WriteRow]:
+        """Pending writes stored for a checkpoint"""
+
+    @abstractmethod
+    def _save_writes(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str, rows: List[WriteRow]):
+        """Store writes; rows with a non-negative index are kept if already present, special (negative) ones replaced"""
+
+    @abstractmethod
+    def _list_namespaces(self, thread_id: str) -> List[str]:
+        """Checkpoint namespaces the thread has checkpoints in"""
+
+    @abstractmethod
+    def _list_threads(self) -> List[str]:
+        """Ids of every stored thread"""
+
+    @abstractmethod
+    def delete_thread(self, thread_id: str) -> None:
+        """Delete every checkpoint and write of a thread"""
+
+    # Saver protocol
+
+    def _tuple(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str,
+               record: Tuple[Typed, Typed, Optional[str]]) -> CheckpointTuple:
+        checkpoint, metadata, parent_id = record
+        writes = self._load_writes(thread_id, checkpoint_ns, checkpoint_id)
+        return CheckpointTuple(
+            config={"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id}},
+            checkpoint=self.serde.loads_typed(checkpoint),
+            metadata=self.serde.loads_typed(metadata),
+            parent_config=(
+                {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": parent_id}}
+                if parent_id else None
+            ),
+            pending_writes=[(task_id, channel, self.serde.loads_typed(value)) for task_id, _, channel, value, _ in writes],
+        )
+
+    def get_tuple(self, config) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        records = self._load_checkpoints(thread_id, checkpoint_ns)
+        if not records:
+            return None
+
+        checkpoint_id = get_checkpoint_id(config) or max(records)
+        if checkpoint_id not in records:
+            return None
+        return self._tuple(thread_id, checkpoint_ns, checkpoint_id, records[checkpoint_id])
+
+    def list(self, config, *, filter: Optional[Dict[str, Any]] = None, before=None,
+             limit: Optional[int] = None) -> Iterator[CheckpointTuple]:
+        thread_ids = [config["configurable"]["thread_id"]] if config else self._list_threads()
+        config_checkpoint_ns = config["configurable"].get("checkpoint_ns") if config else None
+        config_checkpoint_id = get_checkpoint_id(config) if config else None
+        before_checkpoint_id = get_checkpoint_id(before) if before else None
+
+        for thread_id in thread_ids:
+            for checkpoint_ns in self._list_namespaces(thread_id):
+                if config_checkpoint_ns is not None and checkpoint_ns != config_checkpoint_ns:
+                    continue
+
+                records = self._load_checkpoints(thread_id, checkpoint_ns)
+                for checkpoint_id in sorted(records, reverse=True):
+                    if config_checkpoint_id and checkpoint_id != config_checkpoint_id:
+                        continue
+                    if before_checkpoint_id and checkpoint_id >= before_checkpoint_id:
+                        continue
+                    if filter:
+                        metadata = self.serde.loads_typed(records[checkpoint_id][1])
+                        if not all(metadata.get(k) == v for k, v in filter.items()):
+                            continue
+                    if limit is not None:
+                        if limit <= 0:
+                            return
+                        limit -= 1
+                    yield self._tuple(thread_id, checkpoint_ns, checkpoint_id, records[checkpoint_id])
+
+    def put(self, config, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+            new_versions: ChannelVersions):
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        if self.session_store is not None:
+            self.session_store.touch(thread_id)
+        self._save_checkpoint(
+            thread_id,
+            checkpoint_ns,
+            checkpoint["id"],
+            self.serde.dumps_typed(checkpoint),
+            self.serde.dumps_typed(get_checkpoint_metadata(config, metadata)),
+            config["configurable"].get("checkpoint_id"),
+        )
+
+        if self.checkpoints_per_thread:
+            checkpoint_ids = sorted(self._list_checkpoint_ids(thread_id, checkpoint_ns))
+            stale = checkpoint_ids[:-self.checkpoints_per_thread]
+            if stale:
+                self._delete_checkpoints(thread_id, checkpoint_ns, stale)
+
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"]}}
+
+    def put_writes(self, config, writes: Sequence[Tuple[str, Any]], task_id: str, task_path: str = "") -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        rows = [
+            (task_id, WRITES_IDX_MAP.get(channel, idx), channel, self.serde.dumps_typed(value), task_path)
+            for idx, (channel, value) in enumerate(writes)
+        ]
+        self._save_writes(thread_id, checkpoint_ns, checkpoint_id, rows)
+
+    def get_next_version(self, current, channel) -> str:
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+    async def aget_tuple(self, config) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None):
+        for item in await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit))):
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path: str = "") -> None:
+        return await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        return await asyncio.to_thread(self.delete_thread, thread_id)
+
+
+class SQLiteCheckpointSaver(PersistentCheckpointSaver):
+    """Checkpoints in a SQLite file shared by all workers on a host"""
+
+    def __init__(self, path: str = CHECKPOINTER_SQLITE_PATH, **kwargs):
+        super().__init__(**kwargs)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                thread_id TEXT NOT NULL,
+                checkpoint_ns TEXT NOT NULL,
+                checkpoint_id TEXT NOT NULL,
+                parent_id TEXT,
+                checkpoint_type TEXT NOT NULL,
+                checkpoint BLOB NOT NULL,
+                metadata_type TEXT NOT NULL,
+                metadata BLOB NOT NULL,
+                PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+            );
+            CREATE TABLE IF NOT EXISTS writes (
+                thread_id TEXT NOT NULL,
+                checkpoint_ns TEXT NOT NULL,
+                checkpoint_id TEXT NOT NULL,
+                task_id TEXT NOT NULL,
+                idx INTEGER NOT NULL,
+                channel TEXT NOT NULL,
+                value_type TEXT NOT NULL,
+                value BLOB NOT NULL,
+                task_path TEXT NOT NULL,
+                PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+            );
+            CREATE TABLE IF NOT EXISTS threads (
+                thread_id TEXT PRIMARY KEY,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS threads_last_access ON threads (last_access);
+            """
+        )
+        self._conn.commit()
+
+    def _execute(self, sql: str, params: Sequence = ()) -> List[tuple]:
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+            self._conn.commit()
+            return rows
+
+    def _load_checkpoints(self, thread_id, checkpoint_ns):
+        rows = self._execute(
+            "SELECT checkpoint_id, checkpoint_type, checkpoint, metadata_type, metadata, parent_id "
+            "FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?",
+            (thread_id, checkpoint_ns)
+        )
+        return {row[0]: ((row[1], row[2]), (row[3], row[4]), row[5]) for row in rows}
+
+    def _save_checkpoint(self, thread_id, checkpoint_ns, checkpoint_id, checkpoint, metadata, parent_id):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (thread_id, checkpoint_ns, checkpoint_id, parent_id, checkpoint[0], checkpoint[1], metadata[0], metadata[1])
+            )
+            self._conn.execute("INSERT OR REPLACE INTO threads VALUES (?, ?)", (thread_id, now))
+            self._conn.commit()
+        self._expire_idle(now)
+
+    def _delete_checkpoints(self, thread_id, checkpoint_ns, checkpoint_ids):
+        with self._lock:
+            for checkpoint_id in checkpoint_ids:
+                params = (thread_id, checkpoint_ns, checkpoint_id)
+                self._conn.execute("DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?", params)
+                self._conn.execute("DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?", params)
+            self._conn.commit()
+
+    def _load_writes(self, thread_id, checkpoint_ns, checkpoint_id):
+        rows = self._execute(
+            "SELECT task_id, idx, channel, value_type, value, task_path FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id)
+        )
+        return [(row[0], row[1], row[2], (row[3], row[4]), row[5]) for row in rows]
+
+    def _list_checkpoint_ids(self, thread_id, checkpoint_ns):
+        rows = self._execute(
+            "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?",
+            (thread_id, checkpoint_ns)
+        )
+        return [row[0] for row in rows]
+
+    def _save_writes(self, thread_id, checkpoint_ns, checkpoint_id, rows):
+        with self._lock:
+            for task_id, idx, channel, value, task_path in rows:
+                verb = "INSERT OR IGNORE" if idx >= 0 else "INSERT OR REPLACE"
+                self._conn.execute(
+                    f"{verb} INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, value[0], value[1], task_path)
+                )
+            self._conn.commit()
+
+    def _list_namespaces(self, thread_id):
+        return [row[0] for row in self._execute("SELECT DISTINCT checkpoint_ns FROM checkpoints WHERE thread_id = ?", (thread_id,))]
+
+    def _list_threads(self):
+        return [row[0] for row in self._execute("SELECT thread_id FROM threads")]
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            for table in ("checkpoints", "writes", "threads"):
+                self._conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+            self._conn.commit()
+
+    def _expire_idle(self, now: float):
+        if not self.idle_ttl_seconds:
+            return
+        for (thread_id,) in self._execute("SELECT thread_id FROM threads WHERE last_access < ?", (now - self.idle_ttl_seconds,)):
+            self.delete_thread(thread_id)
+
+    def metrics(self) -> dict:
+        threads, checkpoint_bytes = self._execute(
+            "SELECT COUNT(DISTINCT thread_id), COALESCE(SUM(LENGTH(checkpoint) + LENGTH(metadata)), 0) FROM checkpoints"
+        )[0]
+        write_bytes = self._execute("SELECT COALESCE(SUM(LENGTH(value)), 0) FROM writes")[0][0]
+        return {"threads": threads, "checkpoint_bytes": checkpoint_bytes + write_bytes}
+
+
+def _encode_typed(typed: Typed) -> str:
+    return json.dumps([typed[0], base64.b64encode(typed[1]).decode()])
+
+
+def _decode_typed(raw) -> Typed:
+    type_, data = json.loads(raw)
+    return type_, base64.b64decode(data)
+
+
+class RedisCheckpointSaver(PersistentCheckpointSaver):
+    """
+    Checkpoints in Redis, shared by workers across hosts
+
+    Works with any client exposing the redis-py hash/set/key commands used
+    below, so an in-process stand-in (e.g. fakeredis) can replace a server.
+    Every key of a thread gets the idle TTL refreshed on each write.
+    """
+
+    def __init__(self, client=None, url: str = CHECKPOINTER_REDIS_URL, prefix: str = "linkedin-ai:checkpoints", **kwargs):
+        super().__init__(**kwargs)
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    def _thread_key(self, thread_id: str) -> str:
+        return f"{self.prefix}:thread:{thread_id}"
+
+    def _checkpoints_key(self, thread_id: str, checkpoint_ns: str) -> str:
+        return f"{self.prefix}:cp:{thread_id}:{checkpoint_ns}"
+
+    def _writes_key(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> str:
+        return f"{self.prefix}:writes:{thread_id}:{checkpoint_ns}:{checkpoint_id}"
+
+    def _track(self, thread_id: str, *keys: str):
+        """Remember a thread's keys so delete_thread can find them, and refresh their TTL"""
+        thread_key = self._thread_key(thread_id)
+        if keys:
+            self.client.sadd(thread_key, *keys)
+        if self.idle_ttl_seconds:
+            for key in self._members(thread_key) + [thread_key]:
+                self.client.expire(key, self.idle_ttl_seconds)
+
+    def _members(self, key: str) -> List[str]:
+        return [m.decode() if isinstance(m, bytes) else m for m in self.client.smembers(key)]
+
+    def _load_checkpoints(self, thread_id, checkpoint_ns):
+        records = {}
+        for checkpoint_id, raw in self.client.hgetall(self._checkpoints_key(thread_id, checkpoint_ns)).items():
+            checkpoint_id = checkpoint_id.decode() if isinstance(checkpoint_id, bytes) else checkpoint_id
+            record = json.loads(raw)
+            records[checkpoint_id] = (_decode_typed(record["checkpoint"]), _decode_typed(record["metadata"]), record["parent_id"])
+        return records
+
+    def _save_checkpoint(self, thread_id, checkpoint_ns, checkpoint_id, checkpoint, metadata, parent_id):
+        key = self._checkpoints_key(thread_id, checkpoint_ns)
+        record = {"checkpoint": _encode_typed(checkpoint), "metadata": _encode_typed(metadata), "parent_id": parent_id}
+        self.client.hset(key, checkpoint_id, json.dumps(record))
+        self._track(thread_id, key)
+
+    def _delete_checkpoints(self, thread_id, checkpoint_ns, checkpoint_ids):
+        self.client.hdel(self._checkpoints_key(thread_id, checkpoint_ns), *checkpoint_ids)
+        for checkpoint_id in checkpoint_ids:
+            writes_key = self._writes_key(thread_id, checkpoint_ns, checkpoint_id)
+            self.client.delete(writes_key)
+            self.client.srem(self._thread_key(thread_id), writes_key)
+
+    def _load_writes(self, thread_id, checkpoint_ns, checkpoint_id):
+        rows = []
+        for raw in self.client.hgetall(self._writes_key(thread_id, checkpoint_ns, checkpoint_id)).values():
+            task_id, idx, channel, value, task_path = json.loads(raw)
+            rows.append((task_id, idx, channel, _decode_typed(value), task_path))
+        return sorted(rows, key=lambda row: (row[0], row[1]))
+
+    def _list_checkpoint_ids(self, thread_id, checkpoint_ns):
+        return [k.decode() if isinstance(k, bytes) else k for k in self.client.hkeys(self._checkpoints_key(thread_id, checkpoint_ns))]
+
+    def _save_writes(self, thread_id, checkpoint_ns, checkpoint_id, rows):
+        key = self._writes_key(thread_id, checkpoint_ns, checkpoint_id)
+        for task_id, idx, channel, value, task_path in rows:
+            field = f"{task_id}:{idx}"
+            raw = json.dumps([task_id, idx, channel, _encode_typed(value), task_path])
+            if idx >= 0:
+                self.client.hsetnx(key, field, raw)
+            else:
+                self.client.hset(key, field, raw)
+        self._track(thread_id, key)
+
+    def _list_namespaces(self, thread_id):
+        marker = f"{self.prefix}:cp:{thread_id}:"
+        return [key[len(marker):] for key in self._members(self._thread_key(thread_id)) if key.startswith(marker)]
+
+    def _list_threads(self):
+        marker = f"{self.prefix}:thread:"
+        keys = (k.decode() if isinstance(k, bytes) else k for k in self.client.scan_iter(match=f"{marker}*"))
+        return [key[len(marker):] for key in keys]
+
+    def delete_thread(self, thread_id: str) -> None:
+        thread_key = self._thread_key(thread_id)
+        keys = self._members(thread_key)
+        if keys:
+            self.client.delete(*keys)
+        self.client.delete(thread_key)
+
+    def metrics(self) -> dict:
+        return {"threads": len(self._list_threads())}
+
+
+def create_checkpointer(backend: str = CHECKPOINTER_BACKEND, session_store: Optional[SessionStore] = None) -> BaseCheckpointSaver:
+    """Build the configured conversation checkpointer"""
+    backend = (backend or "memory").lower()
+    # Every backend drops a thread when its session is evicted, so one bound covers profile and conversation
+    if backend == "sqlite":
+        return SQLiteCheckpointSaver(session_store=session_store)
+    if backend == "redis":
+        return RedisCheckpointSaver(session_store=session_store)
+    if backend == "memory":
+        return BoundedMemorySaver(session_store if session_store is not None else SessionStore())
+    raise ValueError(f"Unknown checkpointer backend: {backend}")
@@ -0,0 +1,121 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import dotenv
+import httpx
+from apify_client import ApifyClient, ApifyClientAsync
+
+dotenv.load_dotenv()
+# Connection pool shared by every OpenAI call in the process, whatever the API key
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+HTTP_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("HTTP_KEEPALIVE_EXPIRY_SECONDS", "30"))
+OPENAI_TIMEOUT_SECONDS = float(os.getenv("OPENAI_TIMEOUT_SECONDS", "60"))
+OPENAI_CONNECT_TIMEOUT_SECONDS = float(os.getenv("OPENAI_CONNECT_TIMEOUT_SECONDS", "10"))
+# Apify clients are kept per token; their HTTP client manages its own keep-alive pool
+APIFY_TIMEOUT_SECONDS = int(os.getenv("APIFY_TIMEOUT_SECONDS", "360"))
+APIFY_MAX_RETRIES = int(os.getenv("APIFY_MAX_RETRIES", "8"))
+APIFY_MAX_CLIENTS = int(os.getenv("APIFY_MAX_CLIENTS", "64"))
+# Job completion webhooks
+WEBHOOK_TIMEOUT_SECONDS = float(os.getenv("WEBHOOK_TIMEOUT_SECONDS", "10"))
+
+
+class ClientRegistry:
+    """
+    Process-wide HTTP clients, created on first use and reused across requests
+
+    OpenAI calls share one httpx pool (the API key travels per request), and
+    Apify clients are cached per token, least recently used evicted first.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._openai_client: Optional[httpx.Client] = None
+        self._openai_async_client: Optional[httpx.AsyncClient] = None
+        self._webhook_async_client: Optional[httpx.AsyncClient] = None
+        self._apify_clients: OrderedDict = OrderedDict()
+        self._apify_async_clients: OrderedDict = OrderedDict()
+
+    @staticmethod
+    def _httpx_options() -> dict:
+        return {
+            "limits": httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+            "timeout": httpx.Timeout(OPENAI_TIMEOUT_SECONDS, connect=OPENAI_CONNECT_TIMEOUT_SECONDS),
+        }
+
+    def openai_http_client(self) -> httpx.Client:
+        with self._lock:
+            if self._openai_client is None or self._openai_client.is_closed:
+                self._openai_client = httpx.Client(**self._httpx_options())
+            return self._openai_client
+
+    def openai_http_async_client(self) -> httpx.AsyncClient:
+        with self._lock:
+            if self._openai_async_client is None or self._openai_async_client.is_closed:
+                self._openai_async_client = httpx.AsyncClient(**self._httpx_options())
+            return self._openai_async_client
+
+    def webhook_http_async_client(self) -> httpx.AsyncClient:
+        with self._lock:
+            if self._webhook_async_client is None or self._webhook_async_client.is_closed:
+                self._webhook_async_client = httpx.AsyncClient(timeout=WEBHOOK_TIMEOUT_SECONDS)
+            return self._webhook_async_client
+
+    def _cached(self, clients: OrderedDict, token: str, factory):
+        with self._lock:
+            client = clients.get(token)
+            if client is None:
+                client = factory(token, max_retries=APIFY_MAX_RETRIES, timeout_secs=APIFY_TIMEOUT_SECONDS)
+                clients[token] = client
+            clients.move_to_end(token)
+            while APIFY_MAX_CLIENTS and len(clients) > APIFY_MAX_CLIENTS:
+                clients.popitem(last=False)
+            return client
+
+    def apify(self, token: str) -> ApifyClient:
+        return self._cached(self._apify_clients, token, ApifyClient)
+
+    def apify_async(self, token: str) -> ApifyClientAsync:
+        return self._cached(self._apify_async_clients, token, ApifyClientAsync)
+
+    async def aclose(self):
+        """Close the pooled connections, e.g. on application shutdown"""
+        with self._lock:
+            openai_client, self._openai_client = self._openai_client, None
+            openai_async_client, self._openai_async_client = self._openai_async_client, None
+            webhook_async_client, self._webhook_async_client = self._webhook_async_client, None
+            self._apify_clients.clear()
+            self._apify_async_clients.clear()
+        if openai_client is not None:
+            openai_client.close()
+        if openai_async_client is not None:
+            await openai_async_client.aclose()
+        if webhook_async_client is not None:
+            await webhook_async_client.aclose()
+
+    def metrics(self) -> dict:
+        return {
+            "openai": {
+                "max_connections": HTTP_MAX_CONNECTIONS,
+                "max_keepalive_connections": HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                "keepalive_expiry_seconds": HTTP_KEEPALIVE_EXPIRY_SECONDS,
+                "timeout_seconds": OPENAI_TIMEOUT_SECONDS,
+                "async_client_open": self._openai_async_client is not None and not self._openai_async_client.is_closed,
+            },
+            "apify": {
+                "clients": len(self._apify_clients),
+                "async_clients": len(self._apify_async_clients),
+                "max_clients": APIFY_MAX_CLIENTS,
+                "timeout_seconds": APIFY_TIMEOUT_SECONDS,
+                "max_retries": APIFY_MAX_RETRIES,
+            },
+        }
+
+
+client_registry = ClientRegistry()
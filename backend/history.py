@@ -0,0 +1,54 @@
+import os
+from typing import List, Tuple
+
+import dotenv
+from langchain_core.messages import AIMessage, BaseMessage
+
+from profile_projection import count_tokens
+
+dotenv.load_dotenv()
+# Recent user/assistant turns kept verbatim in the conversation state (0 = unlimited)
+HISTORY_MAX_TURNS = int(os.getenv("HISTORY_MAX_TURNS", "6"))
+# Token budget for the verbatim messages (0 = unlimited)
+HISTORY_MAX_TOKENS = int(os.getenv("HISTORY_MAX_TOKENS", "3000"))
+# Extra turns allowed past the window before older ones are folded into the summary, so the summary is
+# refreshed once per batch rather than on every turn
+HISTORY_SUMMARY_BATCH_TURNS = int(os.getenv("HISTORY_SUMMARY_BATCH_TURNS", "4"))
+HISTORY_SUMMARIZE = os.getenv("HISTORY_SUMMARIZE", "true").lower() == "true"
+
+
+class HistoryPolicy:
+    """How much conversation history a session keeps verbatim, and whether older turns are summarized"""
+
+    def __init__(self, max_turns: int = HISTORY_MAX_TURNS, max_tokens: int = HISTORY_MAX_TOKENS,
+                 summary_batch_turns: int = HISTORY_SUMMARY_BATCH_TURNS, summarize: bool = HISTORY_SUMMARIZE):
+        self.max_turns = max_turns
+        self.max_tokens = max_tokens
+        self.summary_batch_turns = summary_batch_turns
+        self.summarize = summarize
+
+    def split(self, messages: List[BaseMessage]) -> Tuple[List[BaseMessage], List[BaseMessage]]:
+        """
+        Split the history into (messages to fold into the summary, messages to keep)
+
+        Nothing is trimmed until the history exceeds the turn window by a full
+        summary batch or exceeds the token budget. When trimming for tokens,
+        the kept messages are brought down to half the budget for the same
+        reason. The newest message is always kept.
+        """
+        window = 2 * self.max_turns
+        tokens = [count_tokens(str(m.content)) for m in messages]
+        over_turns = bool(window) and len(messages) > window + 2 * self.summary_batch_turns
+        over_tokens = bool(self.max_tokens) and sum(tokens) > self.max_tokens
+        if not (over_turns or over_tokens):
+            return [], messages
+
+        start = max(0, len(messages) - window) if window else 0
+        if over_tokens:
+            while start < len(messages) - 1 and sum(tokens[start:]) > self.max_tokens // 2:
+                start += 1
+        # Keep the window starting on a user message
+        while start < len(messages) - 1 and isinstance(messages[start], AIMessage):
+            start += 1
+
+        return messages[:start], messages[start:]
@@ -0,0 +1,141 @@
+import math
+import os
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Sequence, Tuple
+
+import dotenv
+
+dotenv.load_dotenv()
+# Minimum cosine similarity to an intent centroid before a specialist is called
+ROUTER_CONFIDENCE_THRESHOLD = float(os.getenv("ROUTER_CONFIDENCE_THRESHOLD", "0.12"))
+
+# Example requests per route; each intent's centroid is the mean of their TF-IDF vectors
+INTENT_EXAMPLES: Dict[str, Sequence[str]] = {
+    "profile_analyzer": (
+        "Please analyze my LinkedIn profile",
+        "Review my profile and tell me its strengths and weaknesses",
+        "What gaps and inconsistencies are in my profile?",
+        "How complete is my profile? Give me a score",
+        "Audit my LinkedIn and point out what is missing",
+        "Evaluate my about, experience, skills and education sections",
+        "What's wrong with my profile?",
+        "Give me an overview of my profile's strengths and areas for improvement",
+    ),
+    "content_generator": (
+        "Rewrite my about section",
+        "Improve my headline",
+        "Enhance my experience descriptions with stronger action verbs",
+        "Make my summary more compelling",
+        "Generate better wording for my profile sections",
+        "Optimize my profile text for ATS keywords",
+        "Can you write a new headline for me?",
+        "Polish the description of my current job",
+        "Rewrite my profile sections so they are optimized for the role I am targeting",
+    ),
+    "job_matcher": (
+        "How well do I fit a data scientist position?",
+        "Analyze my job fit for the role of product manager",
+        "What is my match score for a senior software engineer job?",
+        "Compare my profile to a job description",
+        "Am I qualified to apply for this job?",
+        "Generate an industry standard job description and compare my profile",
+        "Would I be a good candidate for a DevOps engineer opening?",
+        "Which requirements of the job am I missing?",
+    ),
+    "career_counselor": (
+        "What skills should I learn next?",
+        "Suggest courses and certifications for my career",
+        "What career paths are open to me?",
+        "How do I transition into machine learning?",
+        "Give me a learning plan with a timeline",
+        "Recommend learning resources to close my skill gaps",
+        "How can I grow into a leadership position over the next few years?",
+        "What networking strategies and industry events would help my career?",
+    ),
+    "respond": (
+        "Hi there",
+        "Thanks, that's helpful!",
+        "Can you explain that again?",
+        "What did you mean by the last point?",
+        "Okay, what else?",
+        "Hello, who are you?",
+        "Tell me more about the second suggestion",
+        "Great, thank you",
+        "Remind me what you said earlier",
+        "What were those again?",
+    ),
+}
+
+_WORD = re.compile(r"[a-z0-9+#]+")
+_SUFFIXES = ("ations", "ation", "ings", "ing", "ies", "ed", "es", "s")
+
+
+def _stem(word: str) -> str:
+    """Crude suffix stripping so "rewrite"/"rewriting" and "skill"/"skills" share a feature"""
+    for suffix in _SUFFIXES:
+        if len(word) > len(suffix) + 2 and word.endswith(suffix):
+            return word[:-len(suffix)]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Stemmed unigrams plus bigrams"""
+    words = [_stem(w) for w in _WORD.findall(text.lower())]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def _normalize(vector: Dict[str, float]) -> Dict[str, float]:
+    norm = math.sqrt(sum(v * v for v in vector.values()))
+    return {k: v / norm for k, v in vector.items()} if norm else {}
+
+
+class IntentRouter:
+    """
+    TF-IDF nearest-centroid classifier over INTENT_EXAMPLES
+
+    Vectors are sparse dicts, so routing a message costs one tokenization and
+    a dot product per intent; repeated messages hit an LRU cache.
+    """
+
+    def __init__(self, examples: Dict[str, Sequence[str]] = INTENT_EXAMPLES,
+                 threshold: float = ROUTER_CONFIDENCE_THRESHOLD, fallback: str = "respond",
+                 vector_cache_size: int = 4096):
+        self.threshold = threshold
+        self.fallback = fallback
+
+        documents = [tokenize(text) for texts in examples.values() for text in texts]
+        document_frequency = Counter(term for tokens in documents for term in set(tokens))
+        self.idf = {
+            term: math.log((1 + len(documents)) / (1 + df)) + 1
+            for term, df in document_frequency.items()
+        }
+
+        self.centroids: Dict[str, Dict[str, float]] = {}
+        for intent, texts in examples.items():
+            centroid: Counter = Counter()
+            for text in texts:
+                centroid.update(self._vectorize(text))
+            self.centroids[intent] = _normalize(centroid)
+
+        self._vectorize = lru_cache(maxsize=vector_cache_size)(self._vectorize)
+
+    def _vectorize(self, text: str) -> Dict[str, float]:
+        counts = Counter(tokenize(text))
+        # Terms never seen in the examples carry no intent signal
+        return _normalize({term: count * self.idf[term] for term, count in counts.items() if term in self.idf})
+
+    def rank(self, message: str) -> List[Tuple[str, float]]:
+        """Every intent with its cosine similarity to the message, best first"""
+        vector = self._vectorize(message.strip().lower())
+        scores = [
+            (intent, sum(weight * centroid.get(term, 0.0) for term, weight in vector.items()))
+            for intent, centroid in self.centroids.items()
+        ]
+        return sorted(scores, key=lambda item: item[1], reverse=True)
+
+    def route(self, message: str) -> Tuple[str, float]:
+        """Best intent and its score, or the fallback when nothing clears the threshold"""
+        intent, score = self.rank(message)[0]
+        return (intent, score) if score >= self.threshold else (self.fallback, score)
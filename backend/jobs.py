@@ -0,0 +1,305 @@
+import asyncio
+import ipaddress
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Awaitable, Callable, List, Optional
+from urllib.parse import urlsplit
+
+import dotenv
+
+from clients import client_registry
+
+dotenv.load_dotenv()
+# "sqlite" (job status visible to every worker sharing the file) or "memory"
+JOB_STORE_BACKEND = os.getenv("JOB_STORE_BACKEND", "sqlite")
+JOB_STORE_PATH = os.getenv("JOB_STORE_PATH", os.path.join(os.path.dirname(__file__), "jobs.sqlite3"))
+# Finished jobs are kept this long for polling, as are unfinished ones (lost when their worker restarted)
+JOB_RESULT_TTL_SECONDS = int(os.getenv("JOB_RESULT_TTL_SECONDS", str(24 * 60 * 60)))
+# Concurrent jobs per worker process, and how many may wait behind them
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_MAX_QUEUED = int(os.getenv("JOB_MAX_QUEUED", "100"))
+JOB_WEBHOOK_ATTEMPTS = int(os.getenv("JOB_WEBHOOK_ATTEMPTS", "3"))
+# Comma-separated hosts webhooks may target; empty allows any host that resolves only to public addresses
+JOB_WEBHOOK_ALLOWED_HOSTS = {host.strip().lower() for host in os.getenv("JOB_WEBHOOK_ALLOWED_HOSTS", "").split(",") if host.strip()}
+
+logger = logging.getLogger(__name__)
+
+JOB_FIELDS = ("id", "kind", "status", "stage", "params", "result", "error", "webhook_url", "webhook_status",
+              "created_at", "started_at", "finished_at")
+
+
+class JobStore(ABC):
+    """Base class for job records; subclasses implement _put, get and purge"""
+
+    def create(self, kind: str, params: dict, webhook_url: Optional[str] = None) -> dict:
+        self.purge(time.time() - JOB_RESULT_TTL_SECONDS)
+        job = dict.fromkeys(JOB_FIELDS)
+        job.update({
+            "id": uuid.uuid4().hex,
+            "kind": kind,
+            "status": "queued",
+            "stage": "queued",
+            "params": params,
+            "webhook_url": webhook_url,
+            "created_at": time.time(),
+        })
+        self._put(job)
+        return job
+
+    def update(self, job_id: str, **fields) -> Optional[dict]:
+        job = self.get(job_id)
+        if job is None:
+            return None
+        job.update(fields)
+        self._put(job)
+        return job
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[dict]:
+        """A copy of the job record, or None if it does not exist (or was purged)"""
+
+    @abstractmethod
+    def purge(self, before: float):
+        """Delete jobs finished before the given time, and unfinished ones created before it"""
+
+    @abstractmethod
+    def _put(self, job: dict):
+        """Insert or replace a job record"""
+
+
+class InMemoryJobStore(JobStore):
+    """Process-local job records"""
+
+    def __init__(self):
+        self._jobs: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def purge(self, before: float):
+        with self._lock:
+            for job_id in [j["id"] for j in self._jobs.values() if (j["finished_at"] or j["created_at"]) < before]:
+                del self._jobs[job_id]
+
+    def _put(self, job: dict):
+        with self._lock:
+            self._jobs[job["id"]] = dict(job)
+
+
+class SQLiteJobStore(JobStore):
+    """Job records in SQLite, so any worker pointing at the same file can answer a poll"""
+
+    def __init__(self, path: str = JOB_STORE_PATH):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                job TEXT NOT NULL,
+                finished_at REAL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_finished_at ON jobs (finished_at)")
+        self._conn.commit()
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT job FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def purge(self, before: float):
+        with self._lock:
+            self._conn.execute("DELETE FROM jobs WHERE finished_at < ?", (before,))
+            # A job whose worker restarted mid-run never finishes; NULL never compares less than anything
+            self._conn.execute(
+                "DELETE FROM jobs WHERE finished_at IS NULL AND json_extract(job, '$.created_at') < ?", (before,)
+            )
+            self._conn.commit()
+
+    def _put(self, job: dict):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs (id, job, finished_at) VALUES (?, ?, ?)",
+                (job["id"], json.dumps(job, default=str), job["finished_at"])
+            )
+            self._conn.commit()
+
+
+def create_job_store(backend: str = JOB_STORE_BACKEND) -> JobStore:
+    backend = (backend or "memory").lower()
+    if backend == "memory":
+        return InMemoryJobStore()
+    if backend == "sqlite":
+        return SQLiteJobStore()
+    raise ValueError(f"Unknown job store backend: {backend}")
+
+
+class QueueFullError(Exception):
+    """Raised by JobQueue.submit when JOB_MAX_QUEUED jobs are already waiting"""
+
+
+class InvalidWebhookError(ValueError):
+    """Raised by validate_webhook_url for URLs the server must not POST to"""
+
+
+def validate_webhook_url(url: str, allowed_hosts: Optional[set] = None) -> str:
+    """
+    Check that a client-supplied webhook URL is safe for the server to call
+
+    Only http(s) URLs are accepted. With allowed_hosts (JOB_WEBHOOK_ALLOWED_HOSTS
+    by default) the host must be listed; otherwise every address it resolves to
+    must be public, so webhooks cannot reach loopback, private, link-local
+    (cloud metadata) or other internal addresses. Resolves DNS, so it blocks.
+
+    Returns:
+        The URL unchanged
+
+    Raises:
+        InvalidWebhookError: The URL is malformed, not allowed or resolves to an internal address
+    """
+    allowed_hosts = JOB_WEBHOOK_ALLOWED_HOSTS if allowed_hosts is None else allowed_hosts
+    try:
+        parsed = urlsplit(url)
+        port = parsed.port
+    except ValueError as e:
+        raise InvalidWebhookError(f"Invalid webhook URL: {e}")
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        raise InvalidWebhookError("webhook_url must be an absolute http or https URL")
+
+    host = parsed.hostname.lower()
+    if allowed_hosts:
+        if host not in allowed_hosts:
+            raise InvalidWebhookError(f"webhook_url host {host} is not allowed")
+        return url
+
+    try:
+        addresses = {info[4][0] for info in socket.getaddrinfo(host, port or 443, type=socket.SOCK_STREAM)}
+    except (socket.gaierror, UnicodeError):
+        raise InvalidWebhookError(f"webhook_url host {host} does not resolve")
+    for address in addresses:
+        # Drop an IPv6 zone id ("fe80::1%eth0") before parsing
+        if not ipaddress.ip_address(address.split("%", 1)[0]).is_global:
+            raise InvalidWebhookError(f"webhook_url host {host} resolves to a non-public address")
+    return url
+
+
+# (job, secrets, set_stage) -> result
+JobHandler = Callable[[dict, dict, Callable[[str], None]], Awaitable[dict]]
+
+
+class JobQueue:
+    """
+    In-process worker pool running submitted jobs in the background
+
+    Job records (status, stage, result) go to the JobStore; credentials passed
+    as secrets stay in this process's memory and are never stored.
+    """
+
+    def __init__(self, store: JobStore, handler: JobHandler, workers: int = JOB_WORKERS,
+                 max_queued: int = JOB_MAX_QUEUED):
+        self.store = store
+        self.handler = handler
+        self.workers = workers
+        self.max_queued = max_queued
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self.running = 0
+        self.succeeded = 0
+        self.failed = 0
+
+    async def start(self):
+        self.store.purge(time.time() - JOB_RESULT_TTL_SECONDS)
+        self._queue = asyncio.Queue(maxsize=self.max_queued)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, kind: str, params: dict, secrets: Optional[dict] = None,
+               webhook_url: Optional[str] = None) -> dict:
+        if self._queue is None:
+            raise RuntimeError("JobQueue.start() has not been called")
+        if self._queue.full():
+            raise QueueFullError(f"{self.max_queued} jobs are already queued")
+        job = self.store.create(kind, params, webhook_url)
+        self._queue.put_nowait((job["id"], secrets or {}))
+        return job
+
+    async def _worker(self):
+        while True:
+            job_id, secrets = await self._queue.get()
+            try:
+                await self._run(job_id, secrets)
+            except Exception:
+                logger.exception("Job %s crashed", job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str, secrets: dict):
+        job = self.store.update(job_id, status="running", started_at=time.time())
+        if job is None:
+            return
+
+        self.running += 1
+        try:
+            result = await self.handler(job, secrets, lambda stage: self.store.update(job_id, stage=stage))
+            job = self.store.update(job_id, status="succeeded", stage="done", result=result, finished_at=time.time())
+            self.succeeded += 1
+        except Exception as e:
+            detail = getattr(e, "detail", None) or str(e)
+            job = self.store.update(job_id, status="failed", stage="failed", error=detail, finished_at=time.time())
+            self.failed += 1
+        finally:
+            self.running -= 1
+
+        if job and job.get("webhook_url"):
+            self.store.update(job_id, webhook_status=await self._notify(job))
+
+    async def _notify(self, job: dict) -> str:
+        """POST the finished job to its webhook, retrying with backoff; returns the delivery status"""
+        client = client_registry.webhook_http_async_client()
+        try:
+            # Checked again at delivery, in case the host's DNS changed since the job was submitted
+            await asyncio.to_thread(validate_webhook_url, job["webhook_url"])
+        except InvalidWebhookError as e:
+            logger.warning("Webhook for job %s not sent: %s", job["id"], e)
+            return "blocked"
+        for attempt in range(JOB_WEBHOOK_ATTEMPTS):
+            if attempt:
+                await asyncio.sleep(2 ** (attempt - 1))
+            try:
+                response = await client.post(job["webhook_url"], json=job)
+            except Exception as e:
+                logger.warning("Webhook for job %s failed: %s", job["id"], e)
+                continue
+            if response.status_code < 400:
+                return f"delivered ({response.status_code})"
+            if response.status_code < 500:
+                # The receiver rejected it; retrying will not help
+                return f"rejected ({response.status_code})"
+        return "failed"
+
+    def metrics(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "max_queued": self.max_queued,
+            "running": self.running,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+        }
@@ -0,0 +1,131 @@
+import asyncio
+import os
+import random
+import time
+from typing import Awaitable, Callable, Optional, TypeVar
+
+import dotenv
+import openai
+
+from admission import AdmissionLimiter
+
+dotenv.load_dotenv()
+# LLM calls one API key may have in flight at once (per worker), and how many more may wait (429 beyond that)
+OPENAI_MAX_CONCURRENT_CALLS_PER_KEY = int(os.getenv("OPENAI_MAX_CONCURRENT_CALLS_PER_KEY", "8"))
+OPENAI_MAX_QUEUED_CALLS_PER_KEY = int(os.getenv("OPENAI_MAX_QUEUED_CALLS_PER_KEY", "32"))
+# LLM calls in flight across all keys (per worker), and how many more may wait (503 beyond that)
+OPENAI_MAX_CONCURRENT_CALLS = int(os.getenv("OPENAI_MAX_CONCURRENT_CALLS", "64"))
+OPENAI_MAX_QUEUED_CALLS = int(os.getenv("OPENAI_MAX_QUEUED_CALLS", "256"))
+# Longest a call waits for a slot before it is rejected instead
+OPENAI_QUEUE_TIMEOUT_SECONDS = float(os.getenv("OPENAI_QUEUE_TIMEOUT_SECONDS", "30"))
+# Retries of rate-limited (429) or transiently failing calls, with exponential backoff and jitter
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "4"))
+OPENAI_BACKOFF_BASE_SECONDS = float(os.getenv("OPENAI_BACKOFF_BASE_SECONDS", "1"))
+OPENAI_BACKOFF_MAX_SECONDS = float(os.getenv("OPENAI_BACKOFF_MAX_SECONDS", "30"))
+
+T = TypeVar("T")
+
+_RETRYABLE = (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+
+# Shared by every key's limiter in the process
+global_llm_admission = AdmissionLimiter(
+    "openai", OPENAI_MAX_CONCURRENT_CALLS, OPENAI_MAX_QUEUED_CALLS, OPENAI_QUEUE_TIMEOUT_SECONDS
+)
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Delay the server asked for, from Retry-After / retry-after-ms headers"""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    for header, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = response.headers.get(header)
+        if value:
+            try:
+                return float(value) * scale
+            except ValueError:
+                pass
+    return None
+
+
+class LLMCallLimiter:
+    """
+    Concurrency cap and 429-aware backoff for the LLM calls made with one API key
+
+    A rate limit on any call pauses every call for the key until the backoff
+    has elapsed, so a tenant over its quota backs off as a whole instead of
+    each in-flight request hammering the API on its own schedule.
+
+    Calls beyond the key's wait queue (429) or the process-wide one (503) are
+    rejected with admission.SaturatedError instead of waiting indefinitely.
+    """
+
+    def __init__(self, max_concurrent: int = OPENAI_MAX_CONCURRENT_CALLS_PER_KEY,
+                 max_retries: int = OPENAI_MAX_RETRIES,
+                 backoff_base_seconds: float = OPENAI_BACKOFF_BASE_SECONDS,
+                 backoff_max_seconds: float = OPENAI_BACKOFF_MAX_SECONDS,
+                 max_queued: int = OPENAI_MAX_QUEUED_CALLS_PER_KEY,
+                 global_admission: AdmissionLimiter = global_llm_admission):
+        self.max_concurrent = max_concurrent
+        self.max_retries = max_retries
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self._admission = AdmissionLimiter(
+            "openai_per_key", max_concurrent, max_queued, OPENAI_QUEUE_TIMEOUT_SECONDS, status_code=429
+        )
+        self.global_admission = global_admission
+        self._paused_until = 0.0
+        self.calls = 0
+        self.rate_limited = 0
+        self.retries = 0
+
+    @property
+    def in_flight(self) -> int:
+        return self._admission.in_flight
+
+    @property
+    def idle(self) -> bool:
+        """No call holds or waits for a slot and no rate-limit backoff is pending"""
+        return self._admission.idle and time.monotonic() >= self._paused_until
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        delay = _retry_after(error)
+        if delay is None:
+            delay = min(self.backoff_max_seconds, self.backoff_base_seconds * 2 ** attempt)
+            delay *= random.uniform(0.5, 1.0)
+        return delay
+
+    async def call(self, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run fn under the key's and the process's concurrency limits, retrying rate limits and transient errors"""
+        async with self._admission.slot():
+            for attempt in range(self.max_retries + 1):
+                pause = self._paused_until - time.monotonic()
+                if pause > 0:
+                    await asyncio.sleep(pause)
+                self.calls += 1
+                try:
+                    # Taken per attempt, so a key waiting out a backoff does not hold a global slot
+                    async with self.global_admission.slot():
+                        return await fn()
+                except _RETRYABLE as e:
+                    if isinstance(e, openai.RateLimitError):
+                        self.rate_limited += 1
+                    if attempt == self.max_retries:
+                        raise
+                    delay = self._backoff(attempt, e)
+                    self.retries += 1
+                    if isinstance(e, openai.RateLimitError):
+                        # Waited out at the top of the loop, together with every other call for the key
+                        self._paused_until = max(self._paused_until, time.monotonic() + delay)
+                    else:
+                        await asyncio.sleep(delay)
+
+    def metrics(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "queued": self._admission.queued,
+            "max_concurrent": self.max_concurrent,
+            "calls": self.calls,
+            "rate_limited": self.rate_limited,
+            "retries": self.retries,
+        }
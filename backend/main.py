@@ -1,15 +1,42 @@
-from fastapi import FastAPI, HTTPException, Body
+from fastapi import FastAPI, HTTPException, Body, Request
 from fastapi.middleware.cors import CORSMiddleware
-from typing import Optional
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, List, Literal, Optional, Tuple
+import asyncio
 import os
+import json
 import hashlib
+import time
 import dotenv
-from scraper import scrape_linkedin_profile
-from agents import LinkedInAgentSystem
+from scraper import DEFAULT_APIFY_API_TOKEN, apify_executor, scrape_linkedin_profile_async, scrape_linkedin_profiles
+from profile_cache import ProfileCache, normalize_linkedin_url
+from singleflight import SingleFlight
+from llm_cache import create_llm_cache
+from session_store import SessionStore
+from checkpointers import create_checkpointer
+from agents import LinkedInAgentSystem, projection_stats, prompt_cache_stats, structured_output_stats
+from renderers import ResponseMode
+from clients import client_registry
+from agent_pool import AgentSystemPool
+from jobs import InvalidWebhookError, JobQueue, QueueFullError, create_job_store, validate_webhook_url
+from metrics import current_trace, metrics, start_trace
+from admission import admission_metrics, tenant_key
 
 dotenv.load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-app = FastAPI(title="LinkedIn AI Assistant API")
+# Temperature 0 for specialist and respond calls, so cached analyses match fresh ones
+LLM_DETERMINISTIC = os.getenv("LLM_DETERMINISTIC", "false").lower() == "true"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await job_queue.start()
+    yield
+    await job_queue.stop()
+    await client_registry.aclose()
+
+app = FastAPI(title="LinkedIn AI Assistant API", lifespan=lifespan)
 
 # CORS middleware
 app.add_middleware(
@@ -18,11 +45,54 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Retry-After"],
 )
 
-# Cache agent systems by API key to avoid recreating them
-agent_systems_cache = {}
-profile_storage = {}
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Time every request by route; with ?timings=true also collect its spans for a timings block"""
+    start = time.perf_counter()
+    if request.query_params.get("timings", "").lower() == "true":
+        start_trace()
+    
+    response = await call_next(request)
+    
+    route = request.scope.get("route")
+    metrics.observe(
+        "http_request_duration_seconds",
+        time.perf_counter() - start,
+        method=request.method,
+        route=getattr(route, "path", "unmatched"),
+        status=response.status_code
+    )
+    return response
+
+def with_timings(payload: dict) -> dict:
+    """Add the request's timings block when it was asked for with ?timings=true"""
+    trace = current_trace()
+    if trace is not None:
+        payload["timings"] = trace.summary()
+    return payload
+
+# Per-session profiles, evicted when idle or over the session limit
+session_store = SessionStore()
+# Conversation checkpoints; the sqlite/redis backends are shared by every worker,
+# so a follow-up /chat can land on any of them
+conversation_memory = create_checkpointer(session_store=session_store)
+profile_cache = ProfileCache()
+# Concurrent requests for the same profile share one Apify run
+scrape_flights = SingleFlight()
+# Specialist responses shared by all agent systems, keyed on prompt, model and inputs
+llm_response_cache = create_llm_cache()
+# Agent systems by API key hash, bounded and evicted when idle; each key gets its own LLM concurrency limit
+agent_systems = AgentSystemPool(lambda key, limiter: LinkedInAgentSystem(
+    openai_api_key=key,
+    deterministic=LLM_DETERMINISTIC,
+    response_cache=llm_response_cache,
+    checkpointer=conversation_memory,
+    call_limiter=limiter
+))
 
 def get_agent_system(api_key: Optional[str] = None) -> LinkedInAgentSystem:
     """Get or create an agent system for the given API key"""
@@ -35,11 +105,174 @@ def get_agent_system(api_key: Optional[str] = None) -> LinkedInAgentSystem:
             detail="API key is required. Please provide an OpenAI API key."
         )
     
-    # Cache agent systems by API key
-    if key not in agent_systems_cache:
-        agent_systems_cache[key] = LinkedInAgentSystem(openai_api_key=key)
+    return agent_systems.get(key)
+
+def get_session_id(profile_url: str) -> str:
+    """Session id derived from the normalized profile URL"""
+    return hashlib.md5(normalize_linkedin_url(profile_url).encode()).hexdigest()
+
+async def fetch_profile(profile_url: str, apify_api_key: Optional[str] = None) -> dict:
+    """Return the profile from the cache, scraping it with Apify on a miss"""
+    profile = profile_cache.get(profile_url)
+    if profile:
+        return profile
+    
+    async def scrape() -> dict:
+        profile_data = await scrape_linkedin_profile_async(profile_url, apify_api_token=apify_api_key)
+        if not profile_data or len(profile_data) == 0:
+            raise HTTPException(status_code=404, detail="Could not scrape profile. Please check the URL and try again.")
+        
+        profile = profile_data[0] if isinstance(profile_data, list) else profile_data
+        profile_cache.set(profile_url, profile)
+        return profile
+    
+    # Coalesced per Apify token as well, so no caller shares another token's run, errors or admission slot
+    token = apify_api_key or DEFAULT_APIFY_API_TOKEN or ""
+    return await scrape_flights.do(f"{tenant_key(token)}:{normalize_linkedin_url(profile_url)}", scrape)
+
+async def fetch_profiles(profile_urls: List[str], apify_api_key: Optional[str] = None) -> AsyncIterator[Tuple[str, dict]]:
+    """Yield (url, profile) for cached profiles first, then batch-scrape the rest"""
+    to_scrape = []
+    for profile_url in profile_urls:
+        profile = profile_cache.get(profile_url)
+        if profile:
+            yield profile_url, profile
+        else:
+            to_scrape.append(profile_url)
+    
+    if to_scrape:
+        async for profile_url, profile in scrape_linkedin_profiles(to_scrape, apify_api_token=apify_api_key):
+            profile_cache.set(profile_url, profile)
+            yield profile_url, profile
+
+async def load_session_profile(profile_url: str, apify_api_key: Optional[str] = None,
+                               reuse_stored: bool = False) -> Tuple[str, dict]:
+    """Resolve the session id for a profile URL and make sure its profile is stored"""
+    session_id = get_session_id(profile_url)
+    profile = session_store.get(session_id, "profile") if reuse_stored else None
+    
+    if not profile:
+        profile = await fetch_profile(profile_url, apify_api_key)
+        session_store.set(session_id, "profile", profile)
+    
+    return session_id, profile
+
+ANALYZE_PROFILE_MESSAGE = "Please analyze my LinkedIn profile and provide an overview of its strengths and areas for improvement, Also identifying gaps and inconsistencies in the profile."
+
+FULL_REPORT_MESSAGE = "Give me a full report on my LinkedIn profile: an analysis, my job fit, enhanced content and career guidance."
+
+def job_fit_message(target_role: str) -> str:
+    return f"Analyze my job fit for the role: {target_role}. Generate an industry standard job description, compare my profile, calculate match score, and identify gaps."
+
+def content_enhancement_message(target_role: Optional[str] = None) -> str:
+    message = "Generate enhanced, rewritten versions of my profile sections that align with industry best practices"
+    if target_role:
+        message += f" and are optimized for the role: {target_role}"
+    return message
+
+def career_guidance_message(target_role: Optional[str] = None) -> str:
+    message = "Provide career counseling: identify missing skills needed for my target roles, suggest learning resources, recommend career paths, and provide skill acquisition timelines."
+    if target_role:
+        message += f" Focus on the role: {target_role}"
+    return message
+
+# Job kind -> (message builder, reuse the session's stored profile, result field, specialist), mirroring the synchronous endpoints
+JOB_KINDS = {
+    "analyze-profile": (lambda target_role: ANALYZE_PROFILE_MESSAGE, False, "analysis", "profile_analyzer"),
+    "job-fit-analysis": (job_fit_message, False, "analysis", "job_matcher"),
+    "content-enhancement": (content_enhancement_message, True, "enhanced_content", "content_generator"),
+    "career-guidance": (career_guidance_message, True, "guidance", "career_counselor"),
+    "full-report": (lambda target_role: FULL_REPORT_MESSAGE, True, None, None),
+}
+JobKind = Literal["analyze-profile", "job-fit-analysis", "content-enhancement", "career-guidance", "full-report"]
+
+async def run_analysis_job(job: dict, secrets: dict, set_stage: Callable[[str], None]) -> dict:
+    """Scrape then analyze for a queued job; returns the body the synchronous endpoint would have"""
+    params = job["params"]
+    build_message, reuse_stored, result_field, intent = JOB_KINDS[job["kind"]]
+    agent_system = get_agent_system(secrets.get("api_key"))
+    
+    set_stage("scraping")
+    session_id, profile = await load_session_profile(params["profile_url"], secrets.get("apify_api_key"), reuse_stored=reuse_stored)
     
-    return agent_systems_cache[key]
+    set_stage("analyzing")
+    if job["kind"] == "full-report":
+        result = await agent_system.afull_report(
+            message=build_message(params["target_role"]),
+            profile_data=profile,
+            session_id=session_id,
+            target_role=params["target_role"],
+            response_mode=params["response_mode"]
+        )
+        return {"success": True, "session_id": session_id, "target_role": params["target_role"], **result}
+    
+    response = await agent_system.achat(
+        message=build_message(params["target_role"]),
+        profile_data=profile,
+        session_id=session_id,
+        target_role=params["target_role"],
+        response_mode=params["response_mode"],
+        intent=intent
+    )
+    return {"success": True, "session_id": session_id, "target_role": params["target_role"], result_field: response}
+
+# Long analyses run here instead of inside the HTTP request; workers start with the app
+job_store = create_job_store()
+job_queue = JobQueue(job_store, run_analysis_job)
+
+def sse_event(event: str, data: dict) -> str:
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def stream_chat_events(
+    agent_system: LinkedInAgentSystem,
+    message: str,
+    session_id: str,
+    target_role: Optional[str] = None,
+    profile_data: Optional[dict] = None,
+    load_profile: Optional[Callable[[], Awaitable[Tuple[str, dict]]]] = None,
+    include_profile: bool = False,
+    report_mode: bool = False,
+    response_mode: ResponseMode = "conversational",
+    intent: Optional[str] = None
+) -> AsyncIterator[str]:
+    """Stream a chat turn as server-sent events, loading the profile first if needed.
+    Errors after the stream has started are reported as an `error` event."""
+    try:
+        if load_profile:
+            session_id, profile_data = await load_profile()
+            data = {"session_id": session_id}
+            if include_profile:
+                data["profile_data"] = profile_data
+            yield sse_event("profile", data)
+        
+        async for event, data in agent_system.chat_stream(
+            message=message,
+            profile_data=profile_data,
+            session_id=session_id,
+            target_role=target_role,
+            report_mode=report_mode,
+            response_mode=response_mode,
+            intent=intent
+        ):
+            if event == "done":
+                data = with_timings({**data, "session_id": session_id})
+            yield sse_event(event, data)
+    except HTTPException as e:
+        data = {"status_code": e.status_code, "detail": e.detail}
+        # Saturated limiters (see admission.py) say when to retry; headers are already sent
+        if e.headers and "Retry-After" in e.headers:
+            data["retry_after"] = int(e.headers["Retry-After"])
+        yield sse_event("error", data)
+    except Exception as e:
+        yield sse_event("error", {"status_code": 500, "detail": str(e)})
+
+def sse_response(events: AsyncIterator[str]) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @app.get("/")
 def root():
@@ -55,19 +288,121 @@ def health_check():
     """Health check endpoint"""
     return {"status": "healthy"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """Latency histograms and token counters in the Prometheus text format"""
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+@app.get("/stats/profile-projection")
+def profile_projection_stats():
+    """Raw vs projected profile prompt tokens per agent since startup"""
+    return {"agents": projection_stats.summary()}
+
+
+@app.get("/stats/prompt-cache")
+def prompt_cache_usage_stats():
+    """Prompt tokens served from OpenAI's prompt cache vs processed in full, per agent since startup"""
+    return {"agents": prompt_cache_stats.summary()}
+
+@app.get("/stats/structured-output")
+def structured_output_stats_view():
+    """Schema-validated specialist responses, repair retries and unrecoverable responses per agent"""
+    return {"agents": structured_output_stats.summary()}
+
+@app.get("/stats/llm-cache")
+def llm_cache_stats():
+    """Hit/miss counters of the specialist response cache"""
+    return llm_response_cache.stats() if llm_response_cache is not None else {"backend": None}
+
+@app.get("/stats/sessions")
+def session_stats():
+    """Session count, evictions and approximate memory held by profiles and checkpoints"""
+    return {**session_store.metrics(), **conversation_memory.metrics()}
+
+@app.get("/stats/agent-systems")
+def agent_system_stats():
+    """Cached agent systems and their LLM concurrency, rate-limit and retry counters"""
+    return agent_systems.metrics()
+
+@app.get("/stats/http-clients")
+def http_client_stats():
+    """Pool limits and timeouts of the shared OpenAI and Apify clients"""
+    return client_registry.metrics()
+
+@app.get("/stats/admission")
+def admission_stats():
+    """Slots in use, queue depth and rejections of the outbound Apify and OpenAI limiters"""
+    return {"limiters": admission_metrics()}
+
+@app.get("/stats/scraper")
+def scraper_stats():
+    """Attempts, retries, hedge runs and circuit breaker state of the Apify scrape executor"""
+    return apify_executor.metrics()
+
+@app.get("/stats/jobs")
+def job_stats():
+    """Job workers, queue depth and outcome counters of this worker process"""
+    return job_queue.metrics()
+
+@app.delete("/sessions/{session_id}")
+def delete_session(session_id: str):
+    """Drop a session's stored profile and conversation history"""
+    session_store.delete(session_id)
+    conversation_memory.delete_thread(session_id)
+    return {"success": True, "session_id": session_id}
+
 @app.post("/scrape-linkedin")
-def scrape_linkedin(
+async def scrape_linkedin(
     profile_url: str = Body(..., embed=True),
     apify_api_key: Optional[str] = Body(None)
 ):
     try:
-        profile_data = scrape_linkedin_profile(profile_url, apify_api_token=apify_api_key)
+        profile = await fetch_profile(profile_url, apify_api_key)
         
-        if not profile_data or len(profile_data) == 0:
-            raise HTTPException(status_code=404, detail="Could not scrape profile. Please check the URL and try again.")
+        return with_timings({"success": True, "message": "Profile scraped successfully", "profile_data": profile})
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/scrape-linkedin/batch")
+async def scrape_linkedin_batch(
+    profile_urls: List[str] = Body(...),
+    apify_api_key: Optional[str] = Body(None),
+    stream: bool = Body(False)
+):
+    """Scrape many profiles, using one Apify actor run per chunk of uncached URLs.
+    With stream=true, profiles are sent as newline-delimited JSON as they arrive.
+    A chunk rejected by admission control fails the request with 429/503 and
+    Retry-After (in stream mode, a final {"error": ...} line)."""
+    if not profile_urls:
+        raise HTTPException(status_code=400, detail="At least one profile URL is required.")
+    
+    if stream:
+        async def ndjson():
+            try:
+                async for profile_url, profile in fetch_profiles(profile_urls, apify_api_key):
+                    yield json.dumps({"profile_url": profile_url, "profile_data": profile}) + "\n"
+            except HTTPException as e:
+                # The status line is already sent, so a rejection is reported as the last line
+                error = {"status_code": e.status_code, "detail": e.detail}
+                if e.headers and "Retry-After" in e.headers:
+                    error["retry_after"] = int(e.headers["Retry-After"])
+                yield json.dumps({"error": error}) + "\n"
+        
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+    
+    try:
+        profiles = {}
+        async for profile_url, profile in fetch_profiles(profile_urls, apify_api_key):
+            profiles[profile_url] = profile
         
-        return {"success": True, "message": "Profile scraped successfully", 
-        "profile_data": profile_data[0] if len(profile_data) > 0 else profile_data}
+        found = {normalize_linkedin_url(url) for url in profiles}
+        missing = [url for url in profile_urls if normalize_linkedin_url(url) not in found]
+        return with_timings({"success": True, "profiles": profiles, "missing": missing})
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -77,23 +412,25 @@ async def chat(
     message: str = Body(...),
     session_id: str = Body("default"),
     target_role: Optional[str] = Body(None),
-    api_key: Optional[str] = Body(None)
+    api_key: Optional[str] = Body(None),
+    response_mode: ResponseMode = Body("conversational")
 ):
     try:
         agent_system = get_agent_system(api_key)
-        profile_data = profile_storage.get(session_id)
+        profile_data = session_store.get(session_id, "profile")
         
-        response = agent_system.chat(
+        response = await agent_system.achat(
             message=message,
             profile_data=profile_data,
             session_id=session_id,
-            target_role=target_role
+            target_role=target_role,
+            response_mode=response_mode
         )
         
-        return {
+        return with_timings({
             "response": response,
             "session_id": session_id
-        }
+        })
     
     except HTTPException:
         raise
@@ -101,31 +438,153 @@ async def chat(
         raise HTTPException(status_code=500, detail=f"Error processing chat: {str(e)}")
 
 
-@app.post("/analyze-profile")
-async def analyze_profile(
+@app.post("/chat/stream")
+async def chat_stream(
+    message: str = Body(...),
+    session_id: str = Body("default"),
+    target_role: Optional[str] = Body(None),
+    api_key: Optional[str] = Body(None),
+    response_mode: ResponseMode = Body("conversational")
+):
+    """Streaming variant of /chat: routing, agent progress and response tokens as server-sent events"""
+    agent_system = get_agent_system(api_key)
+    
+    return sse_response(stream_chat_events(
+        agent_system,
+        message=message,
+        session_id=session_id,
+        target_role=target_role,
+        profile_data=session_store.get(session_id, "profile"),
+        response_mode=response_mode
+    ))
+
+
+@app.post("/full-report")
+async def full_report(
     profile_url: str = Body(..., embed=True),
+    target_role: Optional[str] = Body(None, embed=True),
     api_key: Optional[str] = Body(None),
-    apify_api_key: Optional[str] = Body(None)
+    apify_api_key: Optional[str] = Body(None),
+    response_mode: ResponseMode = Body("conversational")
 ):
+    """Run profile analysis, job fit, content enhancement and career guidance concurrently in one request"""
     try:
         agent_system = get_agent_system(api_key)
         
-        #Scrapes the Linkedin profile data
-        profile_data = scrape_linkedin_profile(profile_url, apify_api_token=apify_api_key)
+        session_id, profile = await load_session_profile(profile_url, apify_api_key, reuse_stored=True)
         
-        #If the profile data is not found, raise an error
-        if not profile_data or len(profile_data) == 0:
-            raise HTTPException(status_code=404, detail="Could not scrape profile")
+        result = await agent_system.afull_report(
+            message=FULL_REPORT_MESSAGE,
+            profile_data=profile,
+            session_id=session_id,
+            target_role=target_role,
+            response_mode=response_mode
+        )
         
-        profile = profile_data[0] if isinstance(profile_data, list) else profile_data
-        session_id = hashlib.md5(profile_url.encode()).hexdigest()
-        profile_storage[session_id] = profile
+        return with_timings({
+            "success": True,
+            "session_id": session_id,
+            "target_role": target_role,
+            "report": result["report"],
+            "summary": result["summary"]
+        })
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error generating full report: {str(e)}")
+
+
+@app.post("/full-report/stream")
+async def full_report_stream(
+    profile_url: str = Body(..., embed=True),
+    target_role: Optional[str] = Body(None, embed=True),
+    api_key: Optional[str] = Body(None),
+    apify_api_key: Optional[str] = Body(None),
+    response_mode: ResponseMode = Body("conversational")
+):
+    """Streaming variant of /full-report"""
+    agent_system = get_agent_system(api_key)
+    
+    return sse_response(stream_chat_events(
+        agent_system,
+        message=FULL_REPORT_MESSAGE,
+        session_id=get_session_id(profile_url),
+        target_role=target_role,
+        load_profile=lambda: load_session_profile(profile_url, apify_api_key, reuse_stored=True),
+        report_mode=True,
+        response_mode=response_mode
+    ))
+
+
+@app.post("/jobs", status_code=202)
+async def submit_job(
+    kind: JobKind = Body(...),
+    profile_url: str = Body(...),
+    target_role: Optional[str] = Body(None),
+    api_key: Optional[str] = Body(None),
+    apify_api_key: Optional[str] = Body(None),
+    response_mode: ResponseMode = Body("conversational"),
+    webhook_url: Optional[str] = Body(None)
+):
+    """Queue a scrape + analysis and return its job id immediately.
+    Poll GET /jobs/{job_id}, or pass webhook_url (a public http(s) URL, or a host in JOB_WEBHOOK_ALLOWED_HOSTS)
+    to receive the finished job as a POST."""
+    if kind == "job-fit-analysis" and not target_role:
+        raise HTTPException(status_code=400, detail="target_role is required for job-fit-analysis")
+    if webhook_url:
+        try:
+            # Resolves the host, so off the event loop
+            await asyncio.to_thread(validate_webhook_url, webhook_url)
+        except InvalidWebhookError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    # Fail fast on a missing OpenAI key rather than inside the job
+    get_agent_system(api_key)
+    
+    try:
+        job = job_queue.submit(
+            kind,
+            params={"profile_url": profile_url, "target_role": target_role, "response_mode": response_mode},
+            secrets={"api_key": api_key, "apify_api_key": apify_api_key},
+            webhook_url=webhook_url
+        )
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    return {"job_id": job["id"], "status": job["status"], "poll_url": f"/jobs/{job['id']}"}
+
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    """Status, current stage (queued, scraping, analyzing, done or failed) and, once finished, the result or error"""
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@app.post("/analyze-profile")
+async def analyze_profile(
+    profile_url: str = Body(..., embed=True),
+    api_key: Optional[str] = Body(None),
+    apify_api_key: Optional[str] = Body(None),
+    response_mode: ResponseMode = Body("conversational")
+):
+    try:
+        agent_system = get_agent_system(api_key)
         
-        initial_message = "Please analyze my LinkedIn profile and provide an overview of its strengths and areas for improvement, Also identifying gaps and inconsistencies in the profile."
+        #Fetches the Linkedin profile data, scraping it only on a cache miss
+        session_id, profile = await load_session_profile(profile_url, apify_api_key)
         
-        response = agent_system.chat(message=initial_message, profile_data=profile, session_id=session_id)
+        response = await agent_system.achat(
+            message=ANALYZE_PROFILE_MESSAGE,
+            profile_data=profile,
+            session_id=session_id,
+            response_mode=response_mode,
+            intent="profile_analyzer"
+        )
         
-        return {"success": True, "session_id": session_id, "profile_data": profile, "analysis": response}
+        return with_timings({"success": True, "session_id": session_id, "profile_data": profile, "analysis": response})
     
     except HTTPException:
         raise
@@ -133,42 +592,57 @@ async def analyze_profile(
         raise HTTPException(status_code=500, detail=f"Error analyzing profile: {str(e)}")
 
 
+@app.post("/analyze-profile/stream")
+async def analyze_profile_stream(
+    profile_url: str = Body(..., embed=True),
+    api_key: Optional[str] = Body(None),
+    apify_api_key: Optional[str] = Body(None),
+    response_mode: ResponseMode = Body("conversational")
+):
+    """Streaming variant of /analyze-profile"""
+    agent_system = get_agent_system(api_key)
+    
+    return sse_response(stream_chat_events(
+        agent_system,
+        message=ANALYZE_PROFILE_MESSAGE,
+        session_id=get_session_id(profile_url),
+        load_profile=lambda: load_session_profile(profile_url, apify_api_key),
+        include_profile=True,
+        response_mode=response_mode,
+        intent="profile_analyzer"
+    ))
+
+
 @app.post("/job-fit-analysis")
 async def job_fit_analysis(
     profile_url: str = Body(..., embed=True),
     target_role: str = Body(..., embed=True),
     api_key: Optional[str] = Body(None),
-    apify_api_key: Optional[str] = Body(None)
+    apify_api_key: Optional[str] = Body(None),
+    response_mode: ResponseMode = Body("conversational")
 ):
     """Analyze job fit by comparing profile with industry standard job description"""
     try:
         agent_system = get_agent_system(api_key)
         
-        # Scrape profile if not already stored
-        profile_data = scrape_linkedin_profile(profile_url, apify_api_token=apify_api_key)
-        
-        if not profile_data or len(profile_data) == 0:
-            raise HTTPException(status_code=404, detail="Could not scrape profile")
-        
-        profile = profile_data[0] if isinstance(profile_data, list) else profile_data
-        session_id = hashlib.md5(profile_url.encode()).hexdigest()
-        profile_storage[session_id] = profile
+        # Scrape profile if not already cached
+        session_id, profile = await load_session_profile(profile_url, apify_api_key)
         
-        message = f"Analyze my job fit for the role: {target_role}. Generate an industry standard job description, compare my profile, calculate match score, and identify gaps."
-        
-        response = agent_system.chat(
-            message=message,
+        response = await agent_system.achat(
+            message=job_fit_message(target_role),
             profile_data=profile,
             session_id=session_id,
-            target_role=target_role
+            target_role=target_role,
+            response_mode=response_mode,
+            intent="job_matcher"
         )
         
-        return {
+        return with_timings({
             "success": True,
             "session_id": session_id,
             "target_role": target_role,
             "analysis": response
-        }
+        })
     
     except HTTPException:
         raise
@@ -176,44 +650,57 @@ async def job_fit_analysis(
         raise HTTPException(status_code=500, detail=f"Error analyzing job fit: {str(e)}")
 
 
+@app.post("/job-fit-analysis/stream")
+async def job_fit_analysis_stream(
+    profile_url: str = Body(..., embed=True),
+    target_role: str = Body(..., embed=True),
+    api_key: Optional[str] = Body(None),
+    apify_api_key: Optional[str] = Body(None),
+    response_mode: ResponseMode = Body("conversational")
+):
+    """Streaming variant of /job-fit-analysis"""
+    agent_system = get_agent_system(api_key)
+    
+    return sse_response(stream_chat_events(
+        agent_system,
+        message=job_fit_message(target_role),
+        session_id=get_session_id(profile_url),
+        target_role=target_role,
+        load_profile=lambda: load_session_profile(profile_url, apify_api_key),
+        response_mode=response_mode,
+        intent="job_matcher"
+    ))
+
+
 @app.post("/content-enhancement")
 async def content_enhancement(
     profile_url: str = Body(..., embed=True),
     target_role: Optional[str] = Body(None, embed=True),
     api_key: Optional[str] = Body(None),
-    apify_api_key: Optional[str] = Body(None)
+    apify_api_key: Optional[str] = Body(None),
+    response_mode: ResponseMode = Body("conversational")
 ):
     """Generate enhanced versions of profile sections"""
     try:
         agent_system = get_agent_system(api_key)
         
         # Check if profile is already stored
-        session_id = hashlib.md5(profile_url.encode()).hexdigest()
-        profile = profile_storage.get(session_id)
+        session_id, profile = await load_session_profile(profile_url, apify_api_key, reuse_stored=True)
         
-        if not profile:
-            profile_data = scrape_linkedin_profile(profile_url, apify_api_token=apify_api_key)
-            if not profile_data or len(profile_data) == 0:
-                raise HTTPException(status_code=404, detail="Could not scrape profile")
-            profile = profile_data[0] if isinstance(profile_data, list) else profile_data
-            profile_storage[session_id] = profile
-        
-        message = f"Generate enhanced, rewritten versions of my profile sections that align with industry best practices"
-        if target_role:
-            message += f" and are optimized for the role: {target_role}"
-        
-        response = agent_system.chat(
-            message=message,
+        response = await agent_system.achat(
+            message=content_enhancement_message(target_role),
             profile_data=profile,
             session_id=session_id,
-            target_role=target_role
+            target_role=target_role,
+            response_mode=response_mode,
+            intent="content_generator"
         )
         
-        return {
+        return with_timings({
             "success": True,
             "session_id": session_id,
             "enhanced_content": response
-        }
+        })
     
     except HTTPException:
         raise
@@ -221,46 +708,81 @@ async def content_enhancement(
         raise HTTPException(status_code=500, detail=f"Error generating content: {str(e)}")
 
 
+@app.post("/content-enhancement/stream")
+async def content_enhancement_stream(
+    profile_url: str = Body(..., embed=True),
+    target_role: Optional[str] = Body(None, embed=True),
+    api_key: Optional[str] = Body(None),
+    apify_api_key: Optional[str] = Body(None),
+    response_mode: ResponseMode = Body("conversational")
+):
+    """Streaming variant of /content-enhancement"""
+    agent_system = get_agent_system(api_key)
+    
+    return sse_response(stream_chat_events(
+        agent_system,
+        message=content_enhancement_message(target_role),
+        session_id=get_session_id(profile_url),
+        target_role=target_role,
+        load_profile=lambda: load_session_profile(profile_url, apify_api_key, reuse_stored=True),
+        response_mode=response_mode,
+        intent="content_generator"
+    ))
+
+
 @app.post("/career-guidance")
 async def career_guidance(
     profile_url: str = Body(..., embed=True),
     target_role: Optional[str] = Body(None, embed=True),
     api_key: Optional[str] = Body(None),
-    apify_api_key: Optional[str] = Body(None)
+    apify_api_key: Optional[str] = Body(None),
+    response_mode: ResponseMode = Body("conversational")
 ):
     """Provide career counseling and skill gap analysis"""
     try:
         agent_system = get_agent_system(api_key)
         
         # Check if profile is already stored
-        session_id = hashlib.md5(profile_url.encode()).hexdigest()
-        profile = profile_storage.get(session_id)
+        session_id, profile = await load_session_profile(profile_url, apify_api_key, reuse_stored=True)
         
-        if not profile:
-            profile_data = scrape_linkedin_profile(profile_url, apify_api_token=apify_api_key)
-            if not profile_data or len(profile_data) == 0:
-                raise HTTPException(status_code=404, detail="Could not scrape profile")
-            profile = profile_data[0] if isinstance(profile_data, list) else profile_data
-            profile_storage[session_id] = profile
-        
-        message = "Provide career counseling: identify missing skills needed for my target roles, suggest learning resources, recommend career paths, and provide skill acquisition timelines."
-        if target_role:
-            message += f" Focus on the role: {target_role}"
-        
-        response = agent_system.chat(
-            message=message,
+        response = await agent_system.achat(
+            message=career_guidance_message(target_role),
             profile_data=profile,
             session_id=session_id,
-            target_role=target_role
+            target_role=target_role,
+            response_mode=response_mode,
+            intent="career_counselor"
         )
         
-        return {
+        return with_timings({
             "success": True,
             "session_id": session_id,
             "guidance": response
-        }
+        })
     
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error providing career guidance: {str(e)}")
+
+
+@app.post("/career-guidance/stream")
+async def career_guidance_stream(
+    profile_url: str = Body(..., embed=True),
+    target_role: Optional[str] = Body(None, embed=True),
+    api_key: Optional[str] = Body(None),
+    apify_api_key: Optional[str] = Body(None),
+    response_mode: ResponseMode = Body("conversational")
+):
+    """Streaming variant of /career-guidance"""
+    agent_system = get_agent_system(api_key)
+    
+    return sse_response(stream_chat_events(
+        agent_system,
+        message=career_guidance_message(target_role),
+        session_id=get_session_id(profile_url),
+        target_role=target_role,
+        load_profile=lambda: load_session_profile(profile_url, apify_api_key, reuse_stored=True),
+        response_mode=response_mode,
+        intent="career_counselor"
+    ))
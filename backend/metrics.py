@@ -0,0 +1,173 @@
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Histogram bucket upper bounds in seconds, from a cached router call up to a slow Apify run
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: dict) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (v.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+class MetricsRegistry:
+    """Process-wide latency histograms and counters, rendered in the Prometheus text format"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        # name -> label key -> [cumulative bucket counts..., sum, count]
+        self._histograms: Dict[str, Dict[LabelKey, list]] = {}
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        # name -> callback returning [(labels, value)], read at render time
+        self._gauges: Dict[str, Callable[[], List[Tuple[dict, float]]]] = {}
+        self._help: Dict[str, str] = {}
+
+    def observe(self, name: str, seconds: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            values = series.get(key)
+            if values is None:
+                values = series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    values[i] += 1
+            values[-2] += seconds
+            values[-1] += 1
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def gauge(self, name: str, collect: Callable[[], List[Tuple[dict, float]]]):
+        """Register a gauge whose current values are read from collect() on every render"""
+        self._gauges[name] = collect
+
+    def describe(self, name: str, help_text: str):
+        self._help[name] = help_text
+
+    def render_prometheus(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            for name, series in sorted(self._histograms.items()):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, values in series.items():
+                    for bound, count in zip(self.buckets, values):
+                        lines.append(f"{name}_bucket{_format_labels(key, ('le', repr(float(bound))))} {count}")
+                    lines.append(f"{name}_bucket{_format_labels(key, ('le', '+Inf'))} {values[-1]}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {values[-2]}")
+                    lines.append(f"{name}_count{_format_labels(key)} {values[-1]}")
+            for name, series in sorted(self._counters.items()):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} counter")
+                for key, value in series.items():
+                    lines.append(f"{name}{_format_labels(key)} {value}")
+            gauges = sorted(self._gauges.items())
+        for name, collect in gauges:
+            if name in self._help:
+                lines.append(f"# HELP {name} {self._help[name]}")
+            lines.append(f"# TYPE {name} gauge")
+            for labels, value in collect():
+                lines.append(f"{name}{_format_labels(_label_key(labels))} {value}")
+        return "\n".join(lines) + "\n"
+
+
+class Trace:
+    """Spans recorded while serving one request, for the optional per-response timings block"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans: List[dict] = []
+
+    def summary(self) -> dict:
+        return {
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 1),
+            "spans": sorted(self.spans, key=lambda span: span["start_ms"]),
+        }
+
+
+metrics = MetricsRegistry()
+_current_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("trace", default=None)
+
+
+def start_trace() -> Trace:
+    """Collect spans for the current request; tasks spawned from here on share the trace"""
+    trace = Trace()
+    _current_trace.set(trace)
+    return trace
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+def record_duration(name: str, start: float, span: Optional[dict] = None, **labels):
+    """
+    Record the time since start (a perf_counter reading) into the
+    {name}_duration_seconds histogram and, if one is active, the current trace
+    """
+    elapsed = time.perf_counter() - start
+    metrics.observe(f"{name}_duration_seconds", elapsed, **labels)
+    trace = _current_trace.get()
+    if trace is not None:
+        span = span if span is not None else {"name": name, **{k: v for k, v in labels.items() if v is not None}}
+        span["start_ms"] = round((start - trace.started) * 1000, 1)
+        span["duration_ms"] = round(elapsed * 1000, 1)
+        trace.spans.append(span)
+
+
+@contextmanager
+def timed(name: str, **labels) -> Iterator[dict]:
+    """
+    Time a block with record_duration
+
+    Yields the span dict, so callers can attach details such as token counts.
+    """
+    span = {"name": name, **{k: v for k, v in labels.items() if v is not None}}
+    start = time.perf_counter()
+    try:
+        yield span
+    finally:
+        record_duration(name, start, span, **labels)
+
+
+def record_llm_usage(span: dict, agent: str, response):
+    """Add a response's token usage to the llm_tokens_total counter and its span"""
+    usage = getattr(response, "usage_metadata", None)
+    if not usage:
+        return
+    tokens = {
+        "prompt": usage.get("input_tokens", 0),
+        "completion": usage.get("output_tokens", 0),
+        "cached_prompt": (usage.get("input_token_details") or {}).get("cache_read") or 0,
+    }
+    for kind, count in tokens.items():
+        metrics.inc("llm_tokens_total", count, agent=agent, kind=kind)
+        span[f"{kind}_tokens"] = count
+
+
+metrics.describe("http_request_duration_seconds", "Time until the response starts, by route")
+metrics.describe("apify_run_duration_seconds", "Apify actor run from start to a terminal status")
+metrics.describe("apify_dataset_read_duration_seconds", "One read of an Apify run's dataset")
+metrics.describe("graph_node_duration_seconds", "LangGraph node execution, by node")
+metrics.describe("llm_call_duration_seconds", "OpenAI chat completion including limiter waits and retries, by agent")
+metrics.describe("structured_output_parse_duration_seconds", "Schema validation of a specialist response, by agent")
+metrics.describe("llm_tokens_total", "Tokens reported by the OpenAI API, by agent and kind")
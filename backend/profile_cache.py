@@ -0,0 +1,125 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Optional
+from urllib.parse import urlsplit
+
+import dotenv
+
+dotenv.load_dotenv()
+PROFILE_CACHE_PATH = os.getenv("PROFILE_CACHE_PATH", os.path.join(os.path.dirname(__file__), "profile_cache.sqlite3"))
+PROFILE_CACHE_TTL_SECONDS = int(os.getenv("PROFILE_CACHE_TTL_SECONDS", str(24 * 60 * 60)))
+PROFILE_CACHE_MAX_ENTRIES = int(os.getenv("PROFILE_CACHE_MAX_ENTRIES", "1000"))
+
+# Locale suffixes LinkedIn appends to public profile URLs, e.g. /pub/jane-doe/en or /pub/jane-doe/pt-br
+_LOCALE_SEGMENT = re.compile(r"^[a-z]{2}(?:[-_][a-z]{2})?$")
+
+
+def normalize_linkedin_url(profile_url: str) -> str:
+    """
+    Canonicalize a LinkedIn profile URL so equivalent URLs share one cache key
+
+    Normalizes the scheme and drops `www.`/country subdomains, query strings,
+    fragments, trailing slashes and locale or section subpaths (e.g. /en,
+    /details/experience), and lowercases the slug.
+
+    Args:
+        profile_url: LinkedIn profile URL as entered by the user
+
+    Returns:
+        Canonical URL of the form https://www.linkedin.com/in/<slug>
+    """
+    url = profile_url.strip()
+    if "://" not in url:
+        url = "https://" + url
+
+    parts = urlsplit(url)
+    host = parts.netloc.lower().split("@")[-1].split(":")[0]
+    segments = [segment for segment in parts.path.lower().split("/") if segment]
+
+    # Not "endswith" alone, which would also accept e.g. notlinkedin.com
+    if host != "linkedin.com" and not host.endswith(".linkedin.com"):
+        return url.rstrip("/")
+
+    # /in/<slug>/<anything> -> /in/<slug>
+    if len(segments) >= 2 and segments[0] == "in":
+        segments = segments[:2]
+    # legacy /pub/<slug>/<a>/<b>/<c>/<locale> -> drop the locale only
+    elif len(segments) >= 2 and segments[0] == "pub":
+        segments = segments[:2] + [s for s in segments[2:] if not _LOCALE_SEGMENT.match(s)]
+
+    return "https://www.linkedin.com/" + "/".join(segments)
+
+
+class ProfileCache:
+    """SQLite-backed cache of scraped profiles with TTL expiry and LRU eviction"""
+
+    def __init__(self, path: str = PROFILE_CACHE_PATH, ttl_seconds: int = PROFILE_CACHE_TTL_SECONDS,
+                 max_entries: int = PROFILE_CACHE_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS profiles (
+                url TEXT PRIMARY KEY,
+                profile TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS profiles_last_access ON profiles (last_access)")
+        self._conn.commit()
+
+    def get(self, profile_url: str) -> Optional[dict]:
+        """Return the cached profile for the URL, or None if missing or expired"""
+        key = normalize_linkedin_url(profile_url)
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute("SELECT profile, created_at FROM profiles WHERE url = ?", (key,)).fetchone()
+            if not row:
+                return None
+
+            profile, created_at = row
+            if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM profiles WHERE url = ?", (key,))
+                self._conn.commit()
+                return None
+
+            self._conn.execute("UPDATE profiles SET last_access = ? WHERE url = ?", (now, key))
+            self._conn.commit()
+
+        return json.loads(profile)
+
+    def set(self, profile_url: str, profile: dict):
+        """Store a scraped profile and evict the least recently used entries over the size limit"""
+        key = normalize_linkedin_url(profile_url)
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO profiles (url, profile, created_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(profile), now, now)
+            )
+            if self.max_entries:
+                self._conn.execute(
+                    """DELETE FROM profiles WHERE url IN (
+                        SELECT url FROM profiles ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                    )""",
+                    (self.max_entries,)
+                )
+            self._conn.commit()
+
+    def delete(self, profile_url: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM profiles WHERE url = ?", (normalize_linkedin_url(profile_url),))
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
@@ -0,0 +1,141 @@
+import json
+import re
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("o200k_base")
+except Exception:  # tiktoken missing or its encoding files unavailable offline
+    _ENCODING = None
+
+
+# Raw Apify field names that hold each logical profile section
+FIELD_ALIASES = {
+    "name": ("fullName", "name"),
+    "headline": ("headline", "occupation", "jobTitle"),
+    "location": ("addressWithCountry", "location", "geoLocationName"),
+    "about": ("about", "summary"),
+    "experience": ("experiences", "experience", "positions"),
+    "skills": ("skills",),
+    "education": ("educations", "education"),
+    "certifications": ("licenseAndCertificates", "certifications", "licenses"),
+}
+
+# Sections each agent actually reads
+AGENT_PROFILE_FIELDS = {
+    "profile_analyzer": ("headline", "about", "experience", "skills", "education", "certifications"),
+    "content_generator": ("name", "headline", "about", "experience", "skills"),
+    "job_matcher": ("headline", "location", "about", "experience", "skills", "education", "certifications"),
+    "career_counselor": ("headline", "experience", "skills", "education", "certifications"),
+}
+
+# Keys that carry links, identifiers, media or contact details rather than profile content
+_NOISE_KEY = re.compile(r"(url|urn|link|logo|image|picture|photo|email|phone|mobile|contact|^id$|Id$|_id$)", re.IGNORECASE)
+
+
+def _clean(value: Any) -> Any:
+    """Recursively drop noise keys and empty values"""
+    if isinstance(value, dict):
+        cleaned = {k: _clean(v) for k, v in value.items() if not _NOISE_KEY.search(k)}
+        cleaned = {k: v for k, v in cleaned.items() if v not in (None, "", [], {})}
+        # {"title": "Python"} -> "Python"
+        if len(cleaned) == 1:
+            only = next(iter(cleaned.values()))
+            if isinstance(only, str):
+                return only
+        return cleaned
+    if isinstance(value, list):
+        return [item for item in (_clean(v) for v in value) if item not in (None, "", [], {})]
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def project_profile(profile_data: Optional[dict], fields: Iterable[str] = tuple(FIELD_ALIASES)) -> dict:
+    """
+    Extract the requested profile sections from a raw Apify item
+
+    Args:
+        profile_data: Raw scraped profile
+        fields: Logical sections to keep (keys of FIELD_ALIASES)
+
+    Returns:
+        Dict of section name -> cleaned content, omitting sections the profile lacks
+    """
+    if not profile_data:
+        return {}
+
+    projection = {}
+    for field in fields:
+        for alias in FIELD_ALIASES.get(field, (field,)):
+            value = _clean(profile_data.get(alias))
+            if value not in (None, "", [], {}):
+                projection[field] = value
+                break
+
+    if "name" in fields and "name" not in projection:
+        name = " ".join(p for p in (profile_data.get("firstName"), profile_data.get("lastName")) if p)
+        if name:
+            projection["name"] = name
+
+    return projection
+
+
+def render_compact(data: Any) -> str:
+    """Serialize for a prompt without indentation or ASCII escaping"""
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+def render_profile_for_agent(agent: str, profile_data: Optional[dict]) -> str:
+    return render_compact(project_profile(profile_data, AGENT_PROFILE_FIELDS.get(agent, tuple(FIELD_ALIASES))))
+
+
+def count_tokens(text: str) -> int:
+    """Token count for gpt-4o family models, estimated at 4 chars/token without tiktoken"""
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return max(1, len(text) // 4) if text else 0
+
+
+class ProjectionStats:
+    """
+    Running totals of raw vs projected profile tokens per agent
+
+    Serializing and tokenizing the whole raw profile costs more than the
+    projection itself, so its token count is computed once per profile hash
+    (for the last max_profiles profiles) and reused by every agent call.
+    """
+
+    def __init__(self, max_profiles: int = 256):
+        self.by_agent: Dict[str, Dict[str, int]] = {}
+        self.max_profiles = max_profiles
+        # profile hash -> raw token count, least recently used first
+        self._raw_tokens: OrderedDict = OrderedDict()
+
+    def _raw_token_count(self, profile_data: Optional[dict], profile_hash: Optional[str]) -> int:
+        if profile_hash is None:
+            return count_tokens(json.dumps(profile_data or {}, indent=2))
+        tokens = self._raw_tokens.get(profile_hash)
+        if tokens is None:
+            tokens = self._raw_tokens[profile_hash] = count_tokens(json.dumps(profile_data or {}, indent=2))
+            while len(self._raw_tokens) > self.max_profiles:
+                self._raw_tokens.popitem(last=False)
+        else:
+            self._raw_tokens.move_to_end(profile_hash)
+        return tokens
+
+    def record(self, agent: str, profile_data: Optional[dict], rendered: str, profile_hash: Optional[str] = None):
+        entry = self.by_agent.setdefault(agent, {"calls": 0, "raw_tokens": 0, "projected_tokens": 0})
+        entry["calls"] += 1
+        entry["raw_tokens"] += self._raw_token_count(profile_data, profile_hash)
+        entry["projected_tokens"] += count_tokens(rendered)
+
+    def summary(self) -> Dict[str, dict]:
+        return {
+            agent: {
+                **entry,
+                "saved_ratio": round(1 - entry["projected_tokens"] / entry["raw_tokens"], 3) if entry["raw_tokens"] else 0.0,
+            }
+            for agent, entry in self.by_agent.items()
+        }
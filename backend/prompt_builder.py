@@ -0,0 +1,68 @@
+from typing import Dict, List, Optional
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+
+from llm_cache import make_cache_key
+
+
+def build_prompt(instructions: str, context: Optional[str] = None, request: Optional[str] = None) -> List[BaseMessage]:
+    """
+    Assemble an agent's messages from most to least stable content
+
+    OpenAI caches prompts by exact prefix, so everything that repeats between
+    calls has to come before anything that changes. The instructions are the
+    same for every user, the context (e.g. the profile projection) for every
+    turn of a session, and only the request (target role, user question)
+    varies per call.
+
+    Args:
+        instructions: Static system prompt for the agent
+        context: Per-session content that repeats across turns
+        request: Per-call content, always placed last
+
+    Returns:
+        Messages for the chat model
+    """
+    messages: List[BaseMessage] = [SystemMessage(content=instructions)]
+    if context:
+        messages.append(HumanMessage(content=context))
+    if request:
+        messages.append(HumanMessage(content=request))
+    return messages
+
+
+def prompt_cache_key(agent: str, profile_hash: Optional[str]) -> Optional[str]:
+    """
+    Routing hint sent as prompt_cache_key, so calls that share an agent's
+    session prefix are served by the same cache
+    """
+    if not profile_hash:
+        return None
+    return make_cache_key(agent, profile_hash)[:32]
+
+
+class PromptCacheStats:
+    """Running totals of cached vs uncached prompt tokens per agent, from the responses' usage metadata"""
+
+    def __init__(self):
+        self.by_agent: Dict[str, Dict[str, int]] = {}
+
+    def record(self, agent: str, response):
+        usage = getattr(response, "usage_metadata", None)
+        if not usage:
+            return
+        cached = (usage.get("input_token_details") or {}).get("cache_read") or 0
+        entry = self.by_agent.setdefault(agent, {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0})
+        entry["calls"] += 1
+        entry["prompt_tokens"] += usage.get("input_tokens", 0)
+        entry["cached_tokens"] += cached
+
+    def summary(self) -> Dict[str, dict]:
+        return {
+            agent: {
+                **entry,
+                "uncached_tokens": entry["prompt_tokens"] - entry["cached_tokens"],
+                "cached_ratio": round(entry["cached_tokens"] / entry["prompt_tokens"], 3) if entry["prompt_tokens"] else 0.0,
+            }
+            for agent, entry in self.by_agent.items()
+        }
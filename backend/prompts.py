@@ -158,3 +158,17 @@ Return a JSON object with the following structure:
 
 Be specific with course names, platforms, and provide actionable recommendations. Return ONLY valid JSON, no additional text or explanation.
 """
+
+
+HISTORY_SUMMARY_PROMPT = """You maintain a running summary of a conversation between a user and a LinkedIn career assistant.
+
+Given the previous summary (possibly empty) and the next part of the conversation, write an updated summary that keeps the user's goals, target roles, facts they shared about themselves, advice already given, and any open questions. Drop greetings and repetition.
+
+Return ONLY the updated summary as plain text, at most 150 words.
+"""
+
+
+RESPONSE_PROMPT = """You are a friendly, professional LinkedIn career assistant.
+Convert the technical analysis into a warm, conversational response.
+Use natural language, be encouraging, and provide actionable next steps.
+Keep responses focused and digestible - break complex info into clear sections."""
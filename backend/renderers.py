@@ -0,0 +1,213 @@
+from typing import Any, Callable, Dict, List, Literal, Optional, get_args
+
+# "conversational" restates specialist results with a second LLM call,
+# "structured" formats them with the templates below
+ResponseMode = Literal["conversational", "structured"]
+RESPONSE_MODES = get_args(ResponseMode)
+
+
+def _text(value: Any) -> str:
+    if isinstance(value, dict):
+        return ", ".join(f"{k}: {_text(v)}" for k, v in value.items() if v not in (None, "", [], {}))
+    if isinstance(value, list):
+        return ", ".join(_text(v) for v in value)
+    return str(value).strip()
+
+
+def _bullets(items: Any) -> List[str]:
+    if not items:
+        return []
+    if not isinstance(items, list):
+        items = [items]
+    return [f"- {_text(item)}" for item in items if item not in (None, "", [], {})]
+
+
+def _section(title: str, lines: List[str], level: int = 3) -> List[str]:
+    """Heading followed by its lines, or nothing when there is nothing to show"""
+    lines = [line for line in lines if line]
+    if not lines:
+        return []
+    return [f"{'#' * level} {title}", *lines, ""]
+
+
+def _labelled(label: str, items: Any) -> List[str]:
+    bullets = _bullets(items)
+    return [f"**{label}:**", *bullets] if bullets else []
+
+
+def render_profile_analysis(result: dict) -> str:
+    lines = ["## Profile Analysis", ""]
+    if result.get("overall_score") is not None:
+        lines += [f"**Overall score:** {result['overall_score']}/10", ""]
+    if result.get("summary"):
+        lines += [result["summary"], ""]
+
+    for name, section in (result.get("section_analysis") or {}).items():
+        if not isinstance(section, dict):
+            continue
+        body = []
+        if section.get("completeness") is not None:
+            body.append(f"Completeness: {section['completeness']}%")
+        body += _labelled("Strengths", section.get("strengths"))
+        body += _labelled("Gaps", section.get("gaps"))
+        body += _labelled("Inconsistencies", section.get("inconsistencies"))
+        lines += _section(name.replace("_", " ").title(), body)
+
+    lines += _section("Missing Information", _bullets(result.get("overall_gaps")))
+    lines += _section("Inconsistencies", _bullets(result.get("overall_inconsistencies")))
+    lines += _section("Recommendations", _bullets(result.get("recommendations")))
+    return "\n".join(lines).strip()
+
+
+def render_job_match(result: dict) -> str:
+    job = result.get("job_description") or {}
+    lines = [f"## Job Fit: {job['title']}" if job.get("title") else "## Job Fit", ""]
+    if result.get("match_score") is not None:
+        lines += [f"**Match score:** {result['match_score']}/100", ""]
+    if result.get("summary"):
+        lines += [result["summary"], ""]
+
+    breakdown = result.get("match_breakdown") or {}
+    lines += _section("Match Breakdown", [
+        f"- {name.replace('_', ' ').capitalize()}: {score}/100" for name, score in breakdown.items()
+    ])
+
+    matches = result.get("matching_elements") or {}
+    lines += _section("What Matches", _labelled("Strong", matches.get("strong_matches")) + _labelled("Partial", matches.get("partial_matches")))
+
+    gaps = result.get("gaps") or {}
+    if isinstance(gaps, dict):
+        lines += _section("Gaps", (
+            _labelled("Skills", gaps.get("missing_skills"))
+            + _labelled("Experience", gaps.get("missing_experience"))
+            + _labelled("Qualifications", gaps.get("missing_qualifications"))
+        ))
+    else:
+        lines += _section("Gaps", _bullets(gaps))
+
+    lines += _section("How to Improve Your Match", _bullets(result.get("improvement_suggestions")))
+
+    if job:
+        lines += _section("Industry-Standard Job Description", [
+            job.get("industry_standard_description", ""),
+            *_labelled("Required skills", job.get("required_skills")),
+            *_labelled("Required experience", job.get("required_experience")),
+            *_labelled("Preferred qualifications", job.get("preferred_qualifications")),
+        ])
+    return "\n".join(lines).strip()
+
+
+def _rewrite(title: str, item: Any) -> List[str]:
+    if not isinstance(item, dict):
+        return _section(title, [_text(item)] if item else [])
+    body = []
+    if item.get("enhanced"):
+        body.append(_text(item["enhanced"]))
+    body += _labelled("What changed", item.get("improvements"))
+    return _section(title, body)
+
+
+def render_content_suggestions(result: dict) -> str:
+    lines = ["## Enhanced Profile Content", ""]
+    lines += _rewrite("Headline", result.get("headline"))
+    lines += _rewrite("About", result.get("about"))
+    for item in result.get("experience_items") or []:
+        if not isinstance(item, dict):
+            continue
+        title = " at ".join(part for part in (item.get("title"), item.get("company")) if part) or "Experience"
+        lines += _rewrite(title, item)
+    lines += _rewrite("Skills", result.get("skills_summary"))
+    return "\n".join(lines).strip()
+
+
+def _resource(resource: Any) -> str:
+    if not isinstance(resource, dict):
+        return f"  - {_text(resource)}"
+    details = ", ".join(resource[key] for key in ("type", "platform", "duration", "cost") if resource.get(key))
+    line = f"  - {resource.get('name', 'Resource')}"
+    if details:
+        line += f" ({details})"
+    if resource.get("url"):
+        line += f" {resource['url']}"
+    return line
+
+
+def render_career_guidance(result: dict) -> str:
+    lines = ["## Career Guidance", ""]
+    if result.get("summary"):
+        lines += [result["summary"], ""]
+
+    gaps = result.get("skill_gap_analysis") or {}
+    lines += _section("Skill Gaps", (
+        _labelled("Critical", gaps.get("critical_gaps"))
+        + _labelled("Moderate", gaps.get("moderate_gaps"))
+        + _labelled("Nice to have", gaps.get("nice_to_have"))
+    ))
+
+    learning = []
+    for entry in result.get("learning_resources") or []:
+        if isinstance(entry, dict):
+            learning.append(f"- **{entry.get('skill', 'Skill')}**")
+            learning += [_resource(r) for r in entry.get("resources") or []]
+    lines += _section("Learning Resources", learning)
+
+    paths = []
+    for path in result.get("career_paths") or []:
+        if not isinstance(path, dict):
+            continue
+        heading = f"- **{path.get('path_name', 'Path')}**"
+        if path.get("timeline"):
+            heading += f" ({path['timeline']})"
+        paths.append(heading)
+        if path.get("description"):
+            paths.append(f"  {path['description']}")
+        paths += [f"  {i}. {_text(step)}" for i, step in enumerate(path.get("steps") or [], 1)]
+    lines += _section("Career Paths", paths)
+
+    timeline = result.get("skill_acquisition_timeline") or {}
+    lines += _section("Skill Acquisition Timeline", (
+        _labelled("0-3 months", timeline.get("short_term"))
+        + _labelled("3-6 months", timeline.get("medium_term"))
+        + _labelled("6-12 months", timeline.get("long_term"))
+    ))
+
+    lines += _section("Transferable Skills", _bullets(result.get("transferable_skills")))
+    lines += _section("Networking", _bullets(result.get("networking_strategies")))
+    lines += _section("Industry Events", _bullets(result.get("industry_events")))
+    return "\n".join(lines).strip()
+
+
+RENDERERS: Dict[str, Callable[[dict], str]] = {
+    "profile_analyzer": render_profile_analysis,
+    "job_matcher": render_job_match,
+    "content_generator": render_content_suggestions,
+    "career_counselor": render_career_guidance,
+}
+
+
+def render_structured(agent: str, result: Optional[dict]) -> Optional[str]:
+    """
+    Format a specialist's JSON result as Markdown without calling the LLM
+
+    Args:
+        agent: Specialist that produced the result (key of RENDERERS)
+        result: Parsed JSON result
+
+    Returns:
+        Markdown text, or None when the agent has no template or the result
+        is an error / unparsed text that still needs the conversational responder
+    """
+    renderer = RENDERERS.get(agent)
+    if renderer is None or not isinstance(result, dict) or not result:
+        return None
+    if "error" in result or any(key.startswith("raw_") for key in result):
+        return None
+    return renderer(result)
+
+
+def render_report(report: Dict[str, dict], sections: Dict[str, str]) -> Optional[str]:
+    """Render every section of a full report; sections maps report section -> specialist"""
+    rendered = [render_structured(sections[name], result) for name, result in report.items() if name in sections]
+    if not rendered or any(part is None for part in rendered):
+        return None
+    return "\n\n".join(rendered)
@@ -0,0 +1,198 @@
+import json
+import os
+from typing import Dict, List, Optional, Type
+
+import dotenv
+from pydantic import BaseModel, ConfigDict, ValidationError
+
+dotenv.load_dotenv()
+# Extra LLM calls allowed to fix a response that does not validate against its schema
+STRUCTURED_OUTPUT_MAX_REPAIRS = int(os.getenv("STRUCTURED_OUTPUT_MAX_REPAIRS", "1"))
+
+
+class StrictModel(BaseModel):
+    """Every field required and no extra keys, as OpenAI strict structured outputs require"""
+
+    model_config = ConfigDict(extra="forbid")
+
+
+# Mirrors PROFILE_ANALYSIS_PROMPT
+
+class SectionAnalysis(StrictModel):
+    completeness: int
+    strengths: List[str]
+    gaps: List[str]
+    inconsistencies: List[str]
+
+
+class ProfileSections(StrictModel):
+    about: SectionAnalysis
+    experience: SectionAnalysis
+    skills: SectionAnalysis
+    education: SectionAnalysis
+
+
+class ProfileAnalysis(StrictModel):
+    overall_score: int
+    section_analysis: ProfileSections
+    overall_gaps: List[str]
+    overall_inconsistencies: List[str]
+    recommendations: List[str]
+    summary: str
+
+
+# Mirrors CONTENT_GENERATION_PROMPT
+
+class RewrittenSection(StrictModel):
+    original: str
+    enhanced: str
+    improvements: List[str]
+
+
+class RewrittenExperience(RewrittenSection):
+    title: str
+    company: str
+
+
+class ContentSuggestions(StrictModel):
+    about: RewrittenSection
+    experience_items: List[RewrittenExperience]
+    skills_summary: RewrittenSection
+    headline: RewrittenSection
+
+
+# Mirrors JOB_MATCH_PROMPT
+
+class JobDescription(StrictModel):
+    title: str
+    industry_standard_description: str
+    required_skills: List[str]
+    required_experience: List[str]
+    preferred_qualifications: List[str]
+
+
+class MatchBreakdown(StrictModel):
+    skills_match: int
+    experience_match: int
+    education_match: int
+    overall_fit: int
+
+
+class MatchingElements(StrictModel):
+    strong_matches: List[str]
+    partial_matches: List[str]
+
+
+class MatchGaps(StrictModel):
+    missing_skills: List[str]
+    missing_experience: List[str]
+    missing_qualifications: List[str]
+
+
+class JobMatch(StrictModel):
+    job_description: JobDescription
+    match_score: int
+    match_breakdown: MatchBreakdown
+    matching_elements: MatchingElements
+    gaps: MatchGaps
+    improvement_suggestions: List[str]
+    summary: str
+
+
+# Mirrors CAREER_COUNSELOR_PROMPT
+
+class SkillGapAnalysis(StrictModel):
+    critical_gaps: List[str]
+    moderate_gaps: List[str]
+    nice_to_have: List[str]
+
+
+class LearningResource(StrictModel):
+    type: str
+    name: str
+    platform: str
+    duration: str
+    cost: str
+    url: Optional[str]
+
+
+class SkillResources(StrictModel):
+    skill: str
+    resources: List[LearningResource]
+
+
+class CareerPath(StrictModel):
+    path_name: str
+    description: str
+    steps: List[str]
+    timeline: str
+    required_skills: List[str]
+
+
+class SkillAcquisitionTimeline(StrictModel):
+    short_term: List[str]
+    medium_term: List[str]
+    long_term: List[str]
+
+
+class CareerGuidance(StrictModel):
+    skill_gap_analysis: SkillGapAnalysis
+    learning_resources: List[SkillResources]
+    career_paths: List[CareerPath]
+    transferable_skills: List[str]
+    skill_acquisition_timeline: SkillAcquisitionTimeline
+    networking_strategies: List[str]
+    industry_events: List[str]
+    summary: str
+
+
+AGENT_SCHEMAS: Dict[str, Type[StrictModel]] = {
+    "profile_analyzer": ProfileAnalysis,
+    "content_generator": ContentSuggestions,
+    "job_matcher": JobMatch,
+    "career_counselor": CareerGuidance,
+}
+
+
+def response_format_for(schema: Type[StrictModel]) -> dict:
+    """
+    OpenAI `response_format` constraining the completion to the schema
+
+    Passed as a plain dict rather than the model class so the call still goes
+    through the regular (streamable) completions endpoint.
+    """
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": schema.__name__, "schema": schema.model_json_schema(), "strict": True},
+    }
+
+
+def describe_validation_error(error: ValidationError, limit: int = 5) -> str:
+    """Compact list of what failed validation, without echoing the (possibly long) input"""
+    errors = error.errors(include_url=False, include_input=False, include_context=False)
+    return json.dumps(errors[:limit])
+
+
+class StructuredOutputStats:
+    """Per-agent counts of validated responses, repair retries and responses that never validated"""
+
+    def __init__(self):
+        self.by_agent: Dict[str, Dict[str, int]] = {}
+
+    def _entry(self, agent: str) -> Dict[str, int]:
+        return self.by_agent.setdefault(agent, {"calls": 0, "valid": 0, "repairs": 0, "failures": 0})
+
+    def record(self, agent: str, repairs: int, valid: bool):
+        entry = self._entry(agent)
+        entry["calls"] += 1
+        entry["repairs"] += repairs
+        entry["valid" if valid else "failures"] += 1
+
+    def summary(self) -> Dict[str, dict]:
+        return {
+            agent: {
+                **entry,
+                "repair_rate": round(entry["repairs"] / entry["calls"], 3) if entry["calls"] else 0.0,
+            }
+            for agent, entry in self.by_agent.items()
+        }
@@ -0,0 +1,346 @@
+import asyncio
+import logging
+import math
+import os
+import random
+import time
+from contextlib import contextmanager
+from typing import AsyncIterator, Callable, Dict, Iterator, Optional, TypeVar
+
+import dotenv
+from apify_client.errors import ApifyApiError
+from fastapi import HTTPException
+
+from metrics import metrics
+
+dotenv.load_dotenv()
+# Further actor runs after a failed or timed-out one, with exponential backoff and jitter between them
+APIFY_RUN_MAX_RETRIES = int(os.getenv("APIFY_RUN_MAX_RETRIES", "2"))
+APIFY_RUN_BACKOFF_BASE_SECONDS = float(os.getenv("APIFY_RUN_BACKOFF_BASE_SECONDS", "2"))
+APIFY_RUN_BACKOFF_MAX_SECONDS = float(os.getenv("APIFY_RUN_BACKOFF_MAX_SECONDS", "30"))
+# A run that succeeds with no items (private or removed profiles) is final unless this allows one more run
+APIFY_RETRY_EMPTY_RUNS = os.getenv("APIFY_RETRY_EMPTY_RUNS", "false").lower() == "true"
+# A run that has not produced its first item by then is aborted and retried
+APIFY_FIRST_ITEM_TIMEOUT_SECONDS = float(os.getenv("APIFY_FIRST_ITEM_TIMEOUT_SECONDS", "180"))
+# Start a second, competing run if the first has not produced an item by then (0 disables hedging)
+APIFY_HEDGE_AFTER_SECONDS = float(os.getenv("APIFY_HEDGE_AFTER_SECONDS", "0"))
+# Consecutive failed runs of one tenant that open its circuit, and how long it stays open before a trial run is let through
+APIFY_BREAKER_FAILURE_THRESHOLD = int(os.getenv("APIFY_BREAKER_FAILURE_THRESHOLD", "5"))
+APIFY_BREAKER_RESET_SECONDS = float(os.getenv("APIFY_BREAKER_RESET_SECONDS", "60"))
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(HTTPException):
+    """Raised instead of starting a run while the circuit is open: 503 with Retry-After"""
+
+    def __init__(self, name: str, retry_after: int):
+        super().__init__(
+            status_code=503,
+            detail=f"{name.capitalize()} is failing, retry in {retry_after}s",
+            headers={"Retry-After": str(retry_after)}
+        )
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Stops calling an upstream that keeps failing
+
+    After failure_threshold consecutive failures the circuit opens and calls
+    fail at once with CircuitOpenError. Once reset_timeout_seconds have passed
+    one trial call is let through (half-open) and everyone else is held off for
+    another window; its success closes the circuit, its failure reopens it.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = APIFY_BREAKER_FAILURE_THRESHOLD,
+                 reset_timeout_seconds: float = APIFY_BREAKER_RESET_SECONDS):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self.opened = 0
+        self.rejected = 0
+
+    @property
+    def consecutive_failures(self) -> int:
+        return self._failures
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at < self.reset_timeout_seconds:
+            return "open"
+        return "half_open"
+
+    def before_call(self):
+        """Raise CircuitOpenError unless the call may go ahead"""
+        if self._opened_at is None:
+            return
+        remaining = self._opened_at + self.reset_timeout_seconds - time.monotonic()
+        if remaining > 0:
+            self.rejected += 1
+            metrics.inc("circuit_rejected_total", breaker=self.name)
+            raise CircuitOpenError(self.name, max(1, math.ceil(remaining)))
+        # This call is the trial; the next one waits for its outcome or another window
+        self._opened_at = time.monotonic()
+
+    def record_success(self):
+        self._failures = 0
+        self._opened_at = None
+
+    def record_failure(self):
+        self._failures += 1
+        if self._failures >= self.failure_threshold:
+            if self._opened_at is None:
+                self.opened += 1
+                logger.warning("Circuit %s opened after %d consecutive failures", self.name, self._failures)
+            self._opened_at = time.monotonic()
+
+    def metrics(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
+
+
+class TenantCircuitBreakers:
+    """
+    One CircuitBreaker per tenant
+
+    A tenant whose scrapes keep failing (bad token, exhausted Apify credit)
+    only fails its own calls fast, never everyone else's. Breakers are created
+    on demand and dropped once no call uses them and they are closed with no
+    failures counted.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = APIFY_BREAKER_FAILURE_THRESHOLD,
+                 reset_timeout_seconds: float = APIFY_BREAKER_RESET_SECONDS):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._users: Dict[str, int] = {}
+        # Totals of breakers already dropped
+        self._opened = 0
+        self._rejected = 0
+
+    @contextmanager
+    def breaker(self, tenant: Optional[str] = None) -> Iterator[CircuitBreaker]:
+        key = tenant or ""
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            breaker = self._breakers[key] = CircuitBreaker(self.name, self.failure_threshold,
+                                                           self.reset_timeout_seconds)
+        self._users[key] = self._users.get(key, 0) + 1
+        try:
+            yield breaker
+        finally:
+            self._users[key] -= 1
+            if not self._users[key]:
+                del self._users[key]
+                if breaker.state == "closed" and not breaker.consecutive_failures:
+                    del self._breakers[key]
+                    self._opened += breaker.opened
+                    self._rejected += breaker.rejected
+
+    @property
+    def open_count(self) -> int:
+        """Tenants whose circuit is open or half-open"""
+        return sum(breaker.state != "closed" for breaker in list(self._breakers.values()))
+
+    def metrics(self) -> dict:
+        breakers = list(self._breakers.values())
+        return {
+            "tracked": len(breakers),
+            "open": self.open_count,
+            "opened": self._opened + sum(breaker.opened for breaker in breakers),
+            "rejected": self._rejected + sum(breaker.rejected for breaker in breakers),
+        }
+
+
+def is_transient(error: Exception) -> bool:
+    """Whether a failed run is worth retrying and counts against the circuit (not bad input or our own limits)"""
+    if isinstance(error, HTTPException):
+        return False
+    if isinstance(error, ApifyApiError) and 400 <= error.status_code < 500 and error.status_code != 429:
+        return False
+    return True
+
+
+class ScrapeExecutor:
+    """
+    Retries, timeouts, hedging and per-tenant circuit breaking around actor runs
+
+    start_run is called once per attempt and returns a fresh run's item
+    stream, or None once nothing is left to scrape, so a retry only covers
+    what earlier attempts did not deliver. An attempt is retried, after
+    jittered exponential backoff, when it fails or produces nothing within
+    first_item_timeout_seconds; only those count against the tenant's
+    circuit. A run that succeeds without producing anything is a result (the
+    profiles are private or gone), tried once more only with retry_empty_runs.
+    With hedge_after_seconds set, a second run is started for an attempt that
+    is still silent by then, the first to produce an item is kept and the
+    other aborted.
+    """
+
+    def __init__(self, breakers: TenantCircuitBreakers,
+                 max_retries: int = APIFY_RUN_MAX_RETRIES,
+                 backoff_base_seconds: float = APIFY_RUN_BACKOFF_BASE_SECONDS,
+                 backoff_max_seconds: float = APIFY_RUN_BACKOFF_MAX_SECONDS,
+                 first_item_timeout_seconds: float = APIFY_FIRST_ITEM_TIMEOUT_SECONDS,
+                 hedge_after_seconds: float = APIFY_HEDGE_AFTER_SECONDS,
+                 retry_empty_runs: bool = APIFY_RETRY_EMPTY_RUNS):
+        self.breakers = breakers
+        self.max_retries = max_retries
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.first_item_timeout_seconds = first_item_timeout_seconds
+        self.hedge_after_seconds = hedge_after_seconds
+        self.retry_empty_runs = retry_empty_runs
+        self.attempts = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(self.backoff_max_seconds, self.backoff_base_seconds * 2 ** attempt)
+        return delay * random.uniform(0.5, 1.0)
+
+    async def stream(self, start_run: Callable[[], Optional[AsyncIterator[T]]],
+                     tenant: Optional[str] = None) -> AsyncIterator[T]:
+        """
+        Yield the items of the first attempt that produces any, retrying the rest
+
+        Args:
+            start_run: Starts a run and returns its item stream, or None when there is nothing left to scrape
+            tenant: Whose circuit breaker the attempts are checked against and counted on
+
+        Yields:
+            Items of every attempt, in the order they arrive
+
+        Raises:
+            CircuitOpenError: The tenant's circuit is open; nothing was started
+            Exception: The last attempt's error, once retries are exhausted
+        """
+        with self.breakers.breaker(tenant) as breaker:
+            retried_empty = False
+            for attempt in range(self.max_retries + 1):
+                breaker.before_call()
+                run = start_run()
+                if run is None:
+                    return
+                self.attempts += 1
+                produced = 0
+                try:
+                    async for item in self._hedged(start_run, run):
+                        produced += 1
+                        yield item
+                except Exception as e:
+                    if not is_transient(e):
+                        raise
+                    breaker.record_failure()
+                    metrics.inc("apify_attempts_total", outcome="timeout" if isinstance(e, TimeoutError) else "error")
+                    if attempt == self.max_retries:
+                        raise
+                    logger.warning("Apify run attempt %d failed after %d items, retrying: %s", attempt + 1, produced, e)
+                else:
+                    # An empty run still shows the actor works, so it also closes a half-open circuit
+                    breaker.record_success()
+                    if produced:
+                        metrics.inc("apify_attempts_total", outcome="success")
+                        return
+                    metrics.inc("apify_attempts_total", outcome="empty")
+                    if not self.retry_empty_runs or retried_empty or attempt == self.max_retries:
+                        return
+                    retried_empty = True
+                    logger.warning("Apify run attempt %d returned no items, retrying once", attempt + 1)
+                self.retries += 1
+                await asyncio.sleep(self._backoff(attempt))
+
+    async def _hedged(self, start_run: Callable[[], Optional[AsyncIterator[T]]],
+                      primary: AsyncIterator[T]) -> AsyncIterator[T]:
+        """Wait for the first item of primary (and of a hedge run, if it is slow), then stream the winner"""
+        started = time.monotonic()
+        hedge_at = started + self.hedge_after_seconds if self.hedge_after_seconds > 0 else math.inf
+        deadline = started + self.first_item_timeout_seconds
+        waiting: Dict[asyncio.Future, AsyncIterator[T]] = {asyncio.ensure_future(primary.__anext__()): primary}
+        runs = [primary]
+        winner, first, error = None, None, None
+
+        try:
+            while waiting and winner is None:
+                now = time.monotonic()
+                if now >= deadline:
+                    raise TimeoutError(f"Apify run produced no items within {self.first_item_timeout_seconds:g}s")
+                if now >= hedge_at:
+                    hedge_at = math.inf
+                    hedge = start_run()
+                    if hedge is not None:
+                        self.hedges += 1
+                        metrics.inc("apify_hedges_total")
+                        runs.append(hedge)
+                        waiting[asyncio.ensure_future(hedge.__anext__())] = hedge
+                        continue
+
+                done, _ = await asyncio.wait(waiting, timeout=min(deadline, hedge_at) - now,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    run = waiting.pop(future)
+                    try:
+                        first = future.result()
+                    except StopAsyncIteration:
+                        continue
+                    except Exception as e:
+                        if run is not primary and not is_transient(e):
+                            # e.g. no admission slot for the hedge; the primary decides the outcome
+                            logger.warning("Could not start hedge run: %s", e)
+                            continue
+                        # The other run may still come through
+                        error = error or e
+                        continue
+                    winner = run
+                    if run is not primary:
+                        self.hedge_wins += 1
+                    break
+
+            if winner is None:
+                if error:
+                    raise error
+                return
+
+            # Abort the losing run before streaming the rest of the winner
+            for future in waiting:
+                future.cancel()
+            await asyncio.gather(*waiting, return_exceptions=True)
+            waiting.clear()
+
+            yield first
+            async for item in winner:
+                yield item
+        finally:
+            for future in waiting:
+                future.cancel()
+            await asyncio.gather(*waiting, return_exceptions=True)
+            for run in runs:
+                await run.aclose()
+
+    def metrics(self) -> dict:
+        return {
+            "attempts": self.attempts,
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "circuits": self.breakers.metrics(),
+        }
+
+
+metrics.describe("apify_attempts_total", "Actor run attempts by outcome (success, empty, error, timeout)")
+metrics.describe("apify_hedges_total", "Second actor runs started because the first was slow to produce items")
+metrics.describe("circuit_rejected_total", "Calls rejected because the upstream's circuit was open, by breaker")
@@ -1,32 +1,57 @@
-from apify_client import ApifyClient
+from apify_client import ApifyClientAsync
+from fastapi import HTTPException
+import asyncio
+import logging
 import os
+import time
 import dotenv
-from typing import Optional
+from typing import AsyncIterator, List, Optional, Tuple
+from profile_cache import normalize_linkedin_url
+from clients import client_registry
+from metrics import metrics, record_duration, timed
+from admission import AdmissionLimiter, TenantAdmission, tenant_key
+from scrape_executor import ScrapeExecutor, TenantCircuitBreakers
 
 dotenv.load_dotenv()
 # Fallback to env variable if not provided (for backward compatibility)
 DEFAULT_APIFY_API_TOKEN = os.getenv("APIFY_API_TOKEN")
+LINKEDIN_PROFILE_ACTOR_ID = "PEgClm7RgRD7YO94b"
+# Upper bound on Apify actor runs in flight from a single worker process, and on runs waiting for a slot (503 beyond that)
+APIFY_MAX_CONCURRENT_RUNS = int(os.getenv("APIFY_MAX_CONCURRENT_RUNS", "20"))
+APIFY_MAX_QUEUED_RUNS = int(os.getenv("APIFY_MAX_QUEUED_RUNS", "50"))
+# The same per Apify token (429 beyond that)
+APIFY_MAX_CONCURRENT_RUNS_PER_TENANT = int(os.getenv("APIFY_MAX_CONCURRENT_RUNS_PER_TENANT", "5"))
+APIFY_MAX_QUEUED_RUNS_PER_TENANT = int(os.getenv("APIFY_MAX_QUEUED_RUNS_PER_TENANT", "10"))
+# Longest a run waits for a slot before it is rejected instead
+APIFY_QUEUE_TIMEOUT_SECONDS = float(os.getenv("APIFY_QUEUE_TIMEOUT_SECONDS", "30"))
+# Profiles per actor run when scraping in batches
+APIFY_BATCH_CHUNK_SIZE = int(os.getenv("APIFY_BATCH_CHUNK_SIZE", "25"))
+# Dataset item fields the actor may use to echo the scraped profile URL
+PROFILE_URL_FIELDS = ("linkedinUrl", "linkedInUrl", "profileUrl", "url", "inputUrl", "publicProfileUrl")
+# While a run is in progress its dataset is read every poll interval; runs past the timeout are aborted
+APIFY_POLL_INTERVAL_SECONDS = int(os.getenv("APIFY_POLL_INTERVAL_SECONDS", "3"))
+APIFY_RUN_TIMEOUT_SECONDS = int(os.getenv("APIFY_RUN_TIMEOUT_SECONDS", "600"))
+APIFY_DATASET_PAGE_SIZE = int(os.getenv("APIFY_DATASET_PAGE_SIZE", "100"))
+# Run statuses after which nothing more is pushed to the dataset
+APIFY_TERMINAL_STATUSES = ("SUCCEEDED", "FAILED", "ABORTED", "TIMED-OUT")
 
+logger = logging.getLogger(__name__)
+apify_admission = TenantAdmission(
+    "apify_per_tenant",
+    AdmissionLimiter("apify", APIFY_MAX_CONCURRENT_RUNS, APIFY_MAX_QUEUED_RUNS, APIFY_QUEUE_TIMEOUT_SECONDS),
+    APIFY_MAX_CONCURRENT_RUNS_PER_TENANT,
+    APIFY_MAX_QUEUED_RUNS_PER_TENANT,
+    APIFY_QUEUE_TIMEOUT_SECONDS
+)
+apify_breakers = TenantCircuitBreakers("apify")
+apify_executor = ScrapeExecutor(apify_breakers)
+metrics.gauge("circuit_open", lambda: [({"breaker": apify_breakers.name}, apify_breakers.open_count)])
+metrics.describe("circuit_open", "Tenants whose circuit is open or half-open, by breaker")
 
-def scrape_linkedin_profile(profile_url: str, apify_api_token: Optional[str] = None):
-    """
-    Scrape LinkedIn profile using Apify
-    
-    Args:
-        profile_url: LinkedIn profile URL to scrape
-        apify_api_token: Apify API token. If not provided, falls back to environment variable.
-    
-    Returns:
-        List of scraped profile data
-    """
-    # Use provided token or fall back to environment variable
-    token = apify_api_token or DEFAULT_APIFY_API_TOKEN
-    
-    if not token:
-        raise ValueError("Apify API token is required. Please provide apify_api_token parameter or set APIFY_API_TOKEN environment variable.")
-    
-    client = ApifyClient(token)
-    run_input = {
+
+def _build_run_input(urls: List[str]) -> dict:
+    """Build the Apify actor input for the given LinkedIn profile URLs"""
+    return {
   "cookie": [
     {
       "domain": ".linkedin.com",
@@ -307,16 +332,269 @@ def scrape_linkedin_profile(profile_url: str, apify_api_token: Optional[str] = N
     "apifyProxyCountry": "US"
   },
   "scrapeCompany": False,
-  "urls": [
-    profile_url
-  ],
+  "urls": list(urls),
   "userAgent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/141.0.0.0 Safari/537.36"
 }
+
+
+def _resolve_token(apify_api_token: Optional[str]) -> str:
+    """Use provided token or fall back to environment variable"""
+    token = apify_api_token or DEFAULT_APIFY_API_TOKEN
     
-    run = client.actor("PEgClm7RgRD7YO94b").call(run_input=run_input)
+    if not token:
+        raise ValueError("Apify API token is required. Please provide apify_api_token parameter or set APIFY_API_TOKEN environment variable.")
+    
+    return token
+
+
+def scrape_linkedin_profile(profile_url: str, apify_api_token: Optional[str] = None):
+    """
+    Scrape LinkedIn profile using Apify
+    
+    Args:
+        profile_url: LinkedIn profile URL to scrape
+        apify_api_token: Apify API token. If not provided, falls back to environment variable.
+    
+    Returns:
+        List of scraped profile data
+    """
+    token = _resolve_token(apify_api_token)
+    client = client_registry.apify(token)
+    run_input = _build_run_input([profile_url])
+    
+    with timed("apify_run"):
+        run = client.actor(LINKEDIN_PROFILE_ACTOR_ID).call(run_input=run_input)
     output = []
 
-    for item in client.dataset(run["defaultDatasetId"]).iterate_items():
-        output.append(item)
+    with timed("apify_dataset_read"):
+        for item in client.dataset(run["defaultDatasetId"]).iterate_items():
+            output.append(item)
 
     return output
+
+
+async def stream_actor_items(
+    client: ApifyClientAsync,
+    urls: List[str],
+    tenant: Optional[str] = None,
+    poll_interval: int = APIFY_POLL_INTERVAL_SECONDS,
+    timeout: int = APIFY_RUN_TIMEOUT_SECONDS
+) -> AsyncIterator[dict]:
+    """
+    Start one actor run for the given URLs and yield dataset items as they land
+    
+    The run is started without waiting for it; its status is long-polled for
+    up to poll_interval seconds at a time and the dataset is read from the last
+    seen offset after each poll, so the first profiles are yielded while the
+    actor is still scraping the rest. If the run outlives the timeout, or the
+    caller stops iterating (cancellation, aclose), the run is aborted. A run
+    that ends in any status but SUCCEEDED raises RuntimeError after its items.
+    
+    Runs are admitted through apify_admission: when the tenant's or the
+    process's slots and wait queue are full, admission.SaturatedError
+    (429 / 503 with Retry-After) is raised before anything is started.
+    
+    Args:
+        client: Async Apify client
+        urls: LinkedIn profile URLs to scrape in this run
+        tenant: Key the per-tenant limit applies to (see admission.tenant_key)
+        poll_interval: Seconds to wait for the run to finish between dataset reads
+        timeout: Seconds after which the run is aborted and TimeoutError raised
+    
+    Yields:
+        Scraped profile data, in dataset order
+    """
+    async with apify_admission.slot(tenant):
+        run_started = time.perf_counter()
+        starting = asyncio.ensure_future(client.actor(LINKEDIN_PROFILE_ACTOR_ID).start(
+            run_input=_build_run_input(urls),
+            timeout_secs=timeout
+        ))
+        try:
+            run = await asyncio.shield(starting)
+        except asyncio.CancelledError:
+            # The run may already exist on Apify (e.g. a losing hedge); wait for its id and abort it
+            # rather than leave it billed until timeout_secs
+            try:
+                run = await starting
+                await client.run(run["id"]).abort()
+            except Exception as e:
+                logger.warning("Could not abort Apify run cancelled while starting: %s", e)
+            raise
+        run_client = client.run(run["id"])
+        dataset = client.dataset(run["defaultDatasetId"])
+        deadline = time.monotonic() + timeout
+        finished = False
+        offset = 0
+        
+        try:
+            while True:
+                with timed("apify_dataset_read"):
+                    page = await dataset.list_items(offset=offset, limit=APIFY_DATASET_PAGE_SIZE)
+                for item in page.items:
+                    yield item
+                offset += len(page.items)
+                if len(page.items) == APIFY_DATASET_PAGE_SIZE:
+                    continue
+                
+                if finished:
+                    break
+                
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"Apify run {run['id']} did not finish within {timeout}s")
+                
+                run = await run_client.wait_for_finish(wait_secs=max(1, min(poll_interval, int(remaining)))) or run
+                # One more read after the run finishes picks up its last items
+                finished = run["status"] in APIFY_TERMINAL_STATUSES
+                if finished:
+                    record_duration("apify_run", run_started)
+        finally:
+            if not finished:
+                try:
+                    await run_client.abort()
+                except Exception as e:
+                    logger.warning("Could not abort Apify run %s: %s", run["id"], e)
+        
+        if run["status"] != "SUCCEEDED":
+            raise RuntimeError(f"Apify run {run['id']} ended with status {run['status']} after {offset} items")
+
+
+async def _stream_profiles(client: ApifyClientAsync, urls: List[str], tenant: str) -> AsyncIterator[Tuple[str, dict]]:
+    """
+    Scrape the given URLs through apify_executor, yielding (input URL, item) as they are scraped
+    
+    Retries and hedge runs only cover the URLs no earlier run has delivered.
+    URLs the actor returns nothing for are not yielded.
+    """
+    pending = {normalize_linkedin_url(url): url for url in urls}
+    
+    def start_run() -> Optional[AsyncIterator[dict]]:
+        return stream_actor_items(client, list(pending.values()), tenant) if pending else None
+    
+    async for item in apify_executor.stream(start_run, tenant):
+        url = _match_item_to_url(item, pending)
+        if url is None:
+            logger.warning("Could not map scraped item back to a requested profile URL")
+            continue
+        pending.pop(normalize_linkedin_url(url), None)
+        yield url, item
+
+
+async def scrape_linkedin_profile_async(profile_url: str, apify_api_token: Optional[str] = None):
+    """
+    Scrape LinkedIn profile using Apify without blocking the event loop
+    
+    Uses the async Apify client, so the actor run (which can take a minute
+    because of the scraper's min/max delay) only suspends the awaiting request.
+    At most APIFY_MAX_CONCURRENT_RUNS runs are in flight per process (and
+    APIFY_MAX_CONCURRENT_RUNS_PER_TENANT per token); extra callers wait for a
+    free slot in a bounded queue. Failed or silent runs are retried and
+    slow ones optionally hedged (see scrape_executor.py).
+    
+    Args:
+        profile_url: LinkedIn profile URL to scrape
+        apify_api_token: Apify API token. If not provided, falls back to environment variable.
+    
+    Returns:
+        List of scraped profile data
+    """
+    token = _resolve_token(apify_api_token)
+    client = client_registry.apify_async(token)
+    
+    return [item async for _, item in _stream_profiles(client, [profile_url], tenant_key(token))]
+
+
+def _match_item_to_url(item: dict, pending: dict) -> Optional[str]:
+    """Find which requested URL a dataset item belongs to, given normalized URL -> input URL"""
+    for field in PROFILE_URL_FIELDS:
+        value = item.get(field)
+        if isinstance(value, str) and normalize_linkedin_url(value) in pending:
+            return pending[normalize_linkedin_url(value)]
+    
+    public_identifier = item.get("publicIdentifier")
+    if public_identifier:
+        key = normalize_linkedin_url(f"linkedin.com/in/{public_identifier}")
+        if key in pending:
+            return pending[key]
+    
+    # A single-URL run can only have produced that profile
+    if len(pending) == 1:
+        return next(iter(pending.values()))
+    return None
+
+
+async def _scrape_chunk(client: ApifyClientAsync, urls: List[str], queue: asyncio.Queue, tenant: str,
+                        batch_slots: asyncio.Semaphore):
+    """Scrape a chunk of URLs and push (url, item) pairs onto the queue as they are scraped"""
+    # A batch never queues more runs than its tenant may have in flight, so it cannot overflow its own queue
+    async with batch_slots:
+        async for pair in _stream_profiles(client, urls, tenant):
+            await queue.put(pair)
+
+
+async def scrape_linkedin_profiles(
+    urls: List[str],
+    apify_api_token: Optional[str] = None,
+    chunk_size: int = APIFY_BATCH_CHUNK_SIZE
+) -> AsyncIterator[Tuple[str, dict]]:
+    """
+    Scrape many LinkedIn profiles using one Apify actor run per chunk of URLs
+    
+    Chunks run concurrently (at most APIFY_MAX_CONCURRENT_RUNS_PER_TENANT at a
+    time) and each profile is yielded as soon as its run pushes it to the
+    dataset, so callers can start work on early profiles while the rest are
+    still scraping. If any chunk was rejected by admission control or the
+    circuit breaker, that HTTPException (429/503 with Retry-After) is raised
+    after the profiles scraped by the other chunks.
+    
+    Args:
+        urls: LinkedIn profile URLs to scrape
+        apify_api_token: Apify API token. If not provided, falls back to environment variable.
+        chunk_size: Maximum number of URLs passed to a single actor run
+    
+    Yields:
+        (input URL, scraped profile data) pairs; URLs the actor returned nothing for are not yielded
+    """
+    token = _resolve_token(apify_api_token)
+    client = client_registry.apify_async(token)
+    
+    # Deduplicate on the normalized URL, keeping the first spelling the caller used
+    unique_urls = {}
+    for url in urls:
+        unique_urls.setdefault(normalize_linkedin_url(url), url)
+    unique_urls = list(unique_urls.values())
+    chunks = [unique_urls[i:i + chunk_size] for i in range(0, len(unique_urls), chunk_size)]
+    
+    queue: asyncio.Queue = asyncio.Queue()
+    tenant = tenant_key(token)
+    batch_slots = asyncio.Semaphore(APIFY_MAX_CONCURRENT_RUNS_PER_TENANT)
+    tasks = [asyncio.create_task(_scrape_chunk(client, chunk, queue, tenant, batch_slots)) for chunk in chunks]
+    done = asyncio.gather(*tasks, return_exceptions=True)
+    
+    try:
+        while True:
+            get = asyncio.ensure_future(queue.get())
+            await asyncio.wait([get, done], return_when=asyncio.FIRST_COMPLETED)
+            if get.done():
+                yield get.result()
+                continue
+            
+            get.cancel()
+            while not queue.empty():
+                yield queue.get_nowait()
+            
+            # A failed chunk only loses its own URLs, unless every chunk failed
+            errors = [result for result in done.result() if isinstance(result, Exception)]
+            for error in errors:
+                logger.warning("Apify batch chunk failed: %s", error)
+            # Admission and circuit-breaker rejections mean "retry later", not "not found", so they are raised
+            rejections = [error for error in errors if isinstance(error, HTTPException)]
+            if rejections:
+                raise max(rejections, key=lambda error: int((error.headers or {}).get("Retry-After", 0)))
+            if errors and len(errors) == len(tasks):
+                raise errors[0]
+            break
+    finally:
+        for task in tasks:
+            task.cancel()
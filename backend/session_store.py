@@ -0,0 +1,170 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, List
+
+import dotenv
+from langgraph.checkpoint.memory import MemorySaver
+
+dotenv.load_dotenv()
+SESSION_MAX_SESSIONS = int(os.getenv("SESSION_MAX_SESSIONS", "1000"))
+SESSION_IDLE_TTL_SECONDS = int(os.getenv("SESSION_IDLE_TTL_SECONDS", str(2 * 60 * 60)))
+# Checkpoints kept per conversation thread; older ones are only needed for time travel
+SESSION_CHECKPOINTS_PER_THREAD = int(os.getenv("SESSION_CHECKPOINTS_PER_THREAD", "2"))
+
+
+class SessionStore:
+    """
+    Bounded map of session id -> per-session values with idle TTL and LRU eviction
+
+    Other per-session state (e.g. conversation checkpoints) registers an
+    eviction listener so it is dropped together with the session.
+    """
+
+    def __init__(self, max_sessions: int = SESSION_MAX_SESSIONS, idle_ttl_seconds: int = SESSION_IDLE_TTL_SECONDS):
+        self.max_sessions = max_sessions
+        self.idle_ttl_seconds = idle_ttl_seconds
+        # session id -> {"last_access": float, "values": dict, "bytes": dict}, least recently used first
+        self._sessions: OrderedDict = OrderedDict()
+        self._listeners: List[Callable[[str], None]] = []
+        self._lock = threading.RLock()
+        self.evicted = 0
+        self.expired = 0
+
+    def add_eviction_listener(self, listener: Callable[[str], None]):
+        self._listeners.append(listener)
+
+    def touch(self, session_id: str):
+        """Mark the session as active, creating it if needed, and evict idle or excess sessions"""
+        now = time.time()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = {"last_access": now, "values": {}, "bytes": {}}
+                self._sessions[session_id] = session
+            session["last_access"] = now
+            self._sessions.move_to_end(session_id)
+            self._evict(now)
+
+    def get(self, session_id: str, key: str, default: Any = None) -> Any:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None or self._is_expired(session, time.time()):
+                return default
+            self.touch(session_id)
+            return session["values"].get(key, default)
+
+    def set(self, session_id: str, key: str, value: Any):
+        self.touch(session_id)
+        with self._lock:
+            session = self._sessions[session_id]
+            session["values"][key] = value
+            session["bytes"][key] = len(json.dumps(value, default=str))
+
+    def delete(self, session_id: str) -> bool:
+        """Drop the session and notify listeners; returns False if it did not exist"""
+        with self._lock:
+            existed = self._sessions.pop(session_id, None) is not None
+        for listener in self._listeners:
+            listener(session_id)
+        return existed
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "idle_ttl_seconds": self.idle_ttl_seconds,
+                "evicted": self.evicted,
+                "expired": self.expired,
+                "value_bytes": sum(sum(s["bytes"].values()) for s in self._sessions.values()),
+            }
+
+    def _is_expired(self, session: dict, now: float) -> bool:
+        return bool(self.idle_ttl_seconds) and now - session["last_access"] > self.idle_ttl_seconds
+
+    def _evict(self, now: float):
+        doomed = []
+        # Sessions are ordered by last access, so idle ones are at the front
+        for session_id, session in self._sessions.items():
+            if not self._is_expired(session, now):
+                break
+            doomed.append(session_id)
+        self.expired += len(doomed)
+
+        overflow = len(self._sessions) - len(doomed) - self.max_sessions
+        if self.max_sessions and overflow > 0:
+            candidates = [s for s in self._sessions if s not in doomed]
+            doomed.extend(candidates[:overflow])
+            self.evicted += overflow
+
+        for session_id in doomed:
+            self.delete(session_id)
+
+
+class BoundedMemorySaver(MemorySaver):
+    """
+    MemorySaver whose threads live and die with SessionStore sessions
+
+    Writing a checkpoint touches the session, evicted sessions delete their
+    thread, and only the latest few checkpoints of each thread are kept.
+    """
+
+    def __init__(self, session_store: SessionStore, checkpoints_per_thread: int = SESSION_CHECKPOINTS_PER_THREAD, **kwargs):
+        super().__init__(**kwargs)
+        self.session_store = session_store
+        self.checkpoints_per_thread = checkpoints_per_thread
+        session_store.add_eviction_listener(self.delete_thread)
+
+    def get_tuple(self, config):
+        # Avoid materializing empty defaultdict entries for unknown threads
+        if config["configurable"]["thread_id"] not in self.storage:
+            return None
+        return super().get_tuple(config)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        thread_id = config["configurable"]["thread_id"]
+        self.session_store.touch(thread_id)
+        result = super().put(config, checkpoint, metadata, new_versions)
+        self._prune(thread_id, config["configurable"]["checkpoint_ns"])
+        return result
+
+    def _prune(self, thread_id: str, checkpoint_ns: str):
+        checkpoints = self.storage[thread_id][checkpoint_ns]
+        if not self.checkpoints_per_thread or len(checkpoints) <= self.checkpoints_per_thread:
+            return
+
+        keep = sorted(checkpoints)[-self.checkpoints_per_thread:]
+        for checkpoint_id in [c for c in checkpoints if c not in keep]:
+            del checkpoints[checkpoint_id]
+            self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+
+        live_versions = set()
+        for checkpoint_id in keep:
+            saved = self.serde.loads_typed(checkpoints[checkpoint_id][0])
+            live_versions.update(saved["channel_versions"].items())
+        for key in [k for k in self.blobs if k[0] == thread_id and k[1] == checkpoint_ns]:
+            if (key[2], key[3]) not in live_versions:
+                del self.blobs[key]
+
+    def metrics(self) -> dict:
+        checkpoint_bytes = sum(
+            len(saved[0][1]) + len(saved[1][1])
+            for namespaces in self.storage.values()
+            for checkpoints in namespaces.values()
+            for saved in checkpoints.values()
+        )
+        blob_bytes = sum(len(blob[1]) for blob in self.blobs.values())
+        write_bytes = sum(len(write[2][1]) for writes in self.writes.values() for write in writes.values())
+        return {
+            "threads": len(self.storage),
+            "checkpoint_bytes": checkpoint_bytes + blob_bytes + write_bytes,
+        }
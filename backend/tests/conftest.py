@@ -0,0 +1,35 @@
+import os
+import sys
+import tempfile
+
+import httpx
+import pytest
+
+# Process-local stores and no response cache, so tests never touch the developer's databases or the network
+_scratch = tempfile.mkdtemp(prefix="linkedin-tests-")
+for name, value in {
+    "OPENAI_API_KEY": "sk-test",
+    "APIFY_API_TOKEN": "apify-test",
+    "CHECKPOINTER_BACKEND": "memory",
+    "JOB_STORE_BACKEND": "memory",
+    "LLM_CACHE_BACKEND": "none",
+    "PROFILE_CACHE_PATH": os.path.join(_scratch, "profile_cache.sqlite3"),
+}.items():
+    os.environ.setdefault(name, value)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.join(BACKEND_DIR, "benchmarks"))
+
+from clients import client_registry  # noqa: E402
+from fakes import FakeOpenAI  # noqa: E402
+
+
+@pytest.fixture
+def fake_openai(monkeypatch) -> FakeOpenAI:
+    """Answer every OpenAI call made through the shared client registry locally, with no latency"""
+    fake = FakeOpenAI(latency_ms=0)
+    monkeypatch.setattr(client_registry, "_openai_client", httpx.Client(transport=httpx.MockTransport(fake.handle)))
+    monkeypatch.setattr(client_registry, "_openai_async_client",
+                        httpx.AsyncClient(transport=httpx.MockTransport(fake.handle_async)))
+    return fake
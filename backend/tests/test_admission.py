@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+from admission import AdmissionLimiter, SaturatedError, TenantAdmission
+
+
+async def _hold(slot, release: asyncio.Event, started: asyncio.Event = None):
+    async with slot:
+        if started is not None:
+            started.set()
+        await release.wait()
+
+
+def test_full_queue_is_rejected_at_once_with_retry_after():
+    async def run():
+        limiter = AdmissionLimiter("test_queue_full", max_concurrent=1, max_queued=1, queue_timeout_seconds=5,
+                                   status_code=429)
+        release = asyncio.Event()
+        holders = [asyncio.create_task(_hold(limiter.slot(), release)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        assert (limiter.in_flight, limiter.queued) == (1, 1)
+
+        with pytest.raises(SaturatedError) as error:
+            async with limiter.slot():
+                pass
+        release.set()
+        await asyncio.gather(*holders)
+        return limiter, error.value
+
+    limiter, error = asyncio.run(run())
+    assert error.status_code == 429
+    assert int(error.headers["Retry-After"]) >= 1
+    assert (limiter.admitted, limiter.rejected) == (2, 1)
+
+
+def test_wait_longer_than_the_queue_timeout_is_rejected():
+    async def run():
+        limiter = AdmissionLimiter("test_timeout", max_concurrent=1, max_queued=5, queue_timeout_seconds=0.05)
+        release = asyncio.Event()
+        holder = asyncio.create_task(_hold(limiter.slot(), release))
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(SaturatedError) as error:
+            async with limiter.slot():
+                pass
+        release.set()
+        await holder
+        return limiter, error.value
+
+    limiter, error = asyncio.run(run())
+    assert error.status_code == 503
+    assert (limiter.timed_out, limiter.queued) == (1, 0)
+
+
+def test_tenant_over_its_limit_gets_429_and_full_service_gets_503():
+    async def run():
+        admission = TenantAdmission("test_tenant", AdmissionLimiter("test_global", 2, 0, 1), 1, 0, 1)
+        release = asyncio.Event()
+        holders = [asyncio.create_task(_hold(admission.slot("a"), release))]
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(SaturatedError) as tenant_error:
+            async with admission.slot("a"):
+                pass
+        # Tenant "b" still has room, so it takes the last global slot
+        holders.append(asyncio.create_task(_hold(admission.slot("b"), release)))
+        await asyncio.sleep(0.01)
+        with pytest.raises(SaturatedError) as global_error:
+            async with admission.slot("c"):
+                pass
+        release.set()
+        await asyncio.gather(*holders)
+        return tenant_error.value, global_error.value
+
+    tenant_error, global_error = asyncio.run(run())
+    assert (tenant_error.status_code, tenant_error.limiter) == (429, "test_tenant")
+    assert (global_error.status_code, global_error.limiter) == (503, "test_global")
+
+
+def test_idle_tenant_limiters_are_dropped():
+    async def run():
+        admission = TenantAdmission("test_idle", AdmissionLimiter("test_idle_global", 10, 10, 1), 1, 1, 1)
+        release, started = asyncio.Event(), asyncio.Event()
+        holder = asyncio.create_task(_hold(admission.slot("a"), release, started))
+        await started.wait()
+        assert set(admission._tenants) == {"a"}
+
+        async with admission.slot("b"):
+            pass
+        assert set(admission._tenants) == {"a"}
+        release.set()
+        await holder
+        return admission
+
+    admission = asyncio.run(run())
+    assert admission._tenants == {}
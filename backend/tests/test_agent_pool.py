@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+import agent_pool
+from agent_pool import AgentSystemPool
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(agent_pool.time, "time", lambda: now[0])
+    return now
+
+
+def _pool(**kwargs) -> AgentSystemPool:
+    return AgentSystemPool(lambda api_key, limiter: {"key": api_key, "limiter": limiter}, **kwargs)
+
+
+def test_reuses_the_system_for_a_key():
+    pool = _pool(max_entries=10, idle_ttl_seconds=60)
+
+    assert pool.get("key-a") is pool.get("key-a")
+    assert pool.get("key-a") is not pool.get("key-b")
+    assert pool.created == 2
+
+
+def test_evicts_least_recently_used_at_capacity():
+    pool = _pool(max_entries=2, idle_ttl_seconds=0)
+    first = pool.get("key-a")
+    pool.get("key-b")
+    pool.get("key-a")
+    pool.get("key-c")
+
+    assert len(pool) == 2
+    assert pool.evicted == 1
+    assert pool.get("key-a") is first
+    assert pool.created == 3
+
+
+def test_expires_idle_systems(clock):
+    pool = _pool(max_entries=10, idle_ttl_seconds=60)
+    first = pool.get("key-a")
+    clock[0] += 61
+
+    assert pool.get("key-a") is not first
+    assert pool.expired == 1
+
+
+def test_recreated_system_keeps_the_busy_limiter_of_its_key():
+    pool = _pool(max_entries=1, idle_ttl_seconds=0)
+
+    async def run():
+        limiter = pool.get("key-a")["limiter"]
+        release = asyncio.Event()
+        busy = asyncio.create_task(limiter.call(release.wait))
+        await asyncio.sleep(0.01)
+
+        pool.get("key-b")  # evicts key-a while its call is in flight
+        recreated = pool.get("key-a")["limiter"]
+        release.set()
+        await busy
+        return limiter, recreated
+
+    limiter, recreated = asyncio.run(run())
+    assert recreated is limiter
+    assert pool.evicted == 2
+
+
+def test_idle_limiters_of_evicted_keys_are_dropped():
+    pool = _pool(max_entries=1, idle_ttl_seconds=0)
+    limiter = pool.get("key-a")["limiter"]
+    pool.get("key-b")
+
+    assert pool.metrics()["llm_limiters"] == 1
+    assert pool.get("key-a")["limiter"] is not limiter
@@ -0,0 +1,105 @@
+import asyncio
+
+from langchain_core.messages import HumanMessage
+
+import agents
+from agents import LinkedInAgentSystem
+from fakes import FAKE_REPLY
+from schemas import STRUCTURED_OUTPUT_MAX_REPAIRS, StructuredOutputStats
+
+PROFILE = {"fullName": "Alex Rivera", "headline": "Backend Engineer", "skills": [{"title": "Python"}]}
+
+
+def _requests_for(fake_openai, schema_name: str) -> list:
+    return [
+        body for body in fake_openai.requests
+        if (body.get("response_format") or {}).get("json_schema", {}).get("name") == schema_name
+    ]
+
+
+def _prompt(body: dict) -> str:
+    return "\n".join(message["content"] for message in body["messages"])
+
+
+def test_full_report_counselor_uses_the_reports_skill_gaps(fake_openai):
+    system = LinkedInAgentSystem("sk-test")
+
+    report = asyncio.run(system.afull_report("Full report please", profile_data=PROFILE, session_id="s1",
+                                             target_role="Data Engineer", response_mode="structured"))
+    assert set(report["report"]) == {"profile_analysis", "job_match", "content_enhancement", "career_guidance"}
+    # The fake job match reports "Example text" as its only missing skill and experience
+    counselor_prompt = _prompt(_requests_for(fake_openai, "CareerGuidance")[0])
+    assert 'Skill Gaps: ["Example text","Example text"]' in counselor_prompt
+
+    # The stored guidance still matches its inputs, so asking for it again makes no call
+    calls = fake_openai.calls
+    asyncio.run(system.achat("Career guidance please", session_id="s1", response_mode="structured",
+                             intent="career_counselor"))
+    assert fake_openai.calls == calls
+
+
+def test_default_role_job_match_is_reused_for_that_role_named_explicitly(fake_openai):
+    system = LinkedInAgentSystem("sk-test")
+
+    asyncio.run(system.achat("How well do I fit?", profile_data=PROFILE, session_id="s1",
+                             response_mode="structured", intent="job_matcher"))
+    asyncio.run(system.achat("How well do I fit?", session_id="s1", target_role="Software Engineer",
+                             response_mode="structured", intent="job_matcher"))
+
+    requests = _requests_for(fake_openai, "JobMatch")
+    assert len(requests) == 1
+    assert "Target Role: Software Engineer" in _prompt(requests[0])
+
+
+def test_stream_falls_back_to_the_stored_response(fake_openai):
+    system = LinkedInAgentSystem("sk-test")
+
+    async def stream():
+        return [event async for event in system.chat_stream("Analyze my profile", profile_data=PROFILE,
+                                                            session_id="s1", response_mode="structured",
+                                                            intent="profile_analyzer")]
+
+    events = asyncio.run(stream())
+    assert events[-1][0] == "done"
+    assert events[-1][1]["response"] == system.get_conversation_history("s1")[-1]["content"]
+
+
+def test_invalid_response_is_repaired(fake_openai, monkeypatch):
+    monkeypatch.setattr(agents, "structured_output_stats", StructuredOutputStats())
+    fake_openai.replies = ['{"overall_score": "high"}']
+    system = LinkedInAgentSystem("sk-test")
+
+    result, _ = asyncio.run(system._invoke_specialist("profile_analyzer", [HumanMessage(content="Analyze")]))
+
+    assert result is not None
+    repair = fake_openai.requests[1]["messages"]
+    assert repair[-2] == {"role": "assistant", "content": '{"overall_score": "high"}'}
+    assert "does not match the required JSON schema" in repair[-1]["content"]
+    assert agents.structured_output_stats.summary()["profile_analyzer"]["repairs"] == 1
+
+
+def test_gives_up_after_max_repairs_and_falls_back_to_raw_text(fake_openai, monkeypatch):
+    monkeypatch.setattr(agents, "structured_output_stats", StructuredOutputStats())
+    fake_openai.replies = ["Not JSON at all"] * (STRUCTURED_OUTPUT_MAX_REPAIRS + 1)
+    system = LinkedInAgentSystem("sk-test")
+
+    result, content = asyncio.run(system._invoke_specialist("profile_analyzer", [HumanMessage(content="Analyze")]))
+
+    assert (result, content) == (None, "Not JSON at all")
+    assert fake_openai.calls == STRUCTURED_OUTPUT_MAX_REPAIRS + 1
+    assert agents.structured_output_stats.summary()["profile_analyzer"]["failures"] == 1
+
+
+def test_raw_fallback_is_answered_but_not_reused(fake_openai):
+    fake_openai.replies = ["Not JSON at all"] * (STRUCTURED_OUTPUT_MAX_REPAIRS + 1)
+    system = LinkedInAgentSystem("sk-test")
+
+    response = asyncio.run(system.achat("Analyze my profile", profile_data=PROFILE, session_id="s1",
+                                        response_mode="structured", intent="profile_analyzer"))
+    # No template applies to raw text, so the responder presents it
+    assert response == FAKE_REPLY
+
+    calls = fake_openai.calls
+    asyncio.run(system.achat("Analyze my profile", session_id="s1", response_mode="structured",
+                             intent="profile_analyzer"))
+    assert _requests_for(fake_openai, "ProfileAnalysis")[-1] is fake_openai.requests[calls]
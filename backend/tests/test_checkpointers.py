@@ -0,0 +1,176 @@
+import asyncio
+import functools
+
+import fakeredis
+import pytest
+from langgraph.checkpoint.base import empty_checkpoint
+
+import checkpointers
+from agents import LinkedInAgentSystem
+from checkpointers import PersistentCheckpointSaver, RedisCheckpointSaver, SQLiteCheckpointSaver
+from session_store import SessionStore
+
+PROFILE = {"fullName": "Alex Rivera", "headline": "Backend Engineer", "skills": [{"title": "Python"}]}
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def make_saver(request, tmp_path):
+    """Factory of savers that all share one store, like uvicorn workers do"""
+    if request.param == "sqlite":
+        path = str(tmp_path / "checkpoints.sqlite3")
+        return lambda **kwargs: SQLiteCheckpointSaver(path, **kwargs)
+    server = fakeredis.FakeServer()
+    return lambda **kwargs: RedisCheckpointSaver(client=fakeredis.FakeRedis(server=server), **kwargs)
+
+
+def _config(thread_id: str, checkpoint_id=None) -> dict:
+    configurable = {"thread_id": thread_id, "checkpoint_ns": ""}
+    if checkpoint_id:
+        configurable["checkpoint_id"] = checkpoint_id
+    return {"configurable": configurable}
+
+
+def _put(saver, thread_id: str, parent=None, step: int = 0) -> dict:
+    checkpoint = empty_checkpoint()
+    return saver.put(_config(thread_id, parent), checkpoint, {"source": "loop", "step": step}, {})
+
+
+def test_conversation_continues_on_another_agent_system(make_saver, fake_openai):
+    first = LinkedInAgentSystem("sk-test", checkpointer=make_saver())
+    second = LinkedInAgentSystem("sk-test", checkpointer=make_saver())
+
+    asyncio.run(first.achat("Analyze my profile", profile_data=PROFILE, session_id="s1",
+                            response_mode="structured", intent="profile_analyzer"))
+    asyncio.run(second.achat("Thanks, what else?", session_id="s1"))
+
+    history = first.get_conversation_history("s1")
+    assert [m["role"] for m in history] == ["user", "assistant", "user", "assistant"]
+    assert history[2]["content"] == "Thanks, what else?"
+    assert second.get_conversation_history("s1") == history
+
+    second.clear_session("s1")
+    assert first.get_conversation_history("s1") == []
+
+
+def test_put_get_and_parent_config(make_saver):
+    writer, reader = make_saver(), make_saver()
+    first = _put(writer, "t1")
+    second = _put(writer, "t1", parent=first["configurable"]["checkpoint_id"], step=1)
+
+    latest = reader.get_tuple(_config("t1"))
+    assert latest.config["configurable"]["checkpoint_id"] == second["configurable"]["checkpoint_id"]
+    assert latest.parent_config["configurable"]["checkpoint_id"] == first["configurable"]["checkpoint_id"]
+    assert latest.metadata["step"] == 1
+
+    earlier = reader.get_tuple(_config("t1", first["configurable"]["checkpoint_id"]))
+    assert earlier.parent_config is None
+    assert reader.get_tuple(_config("missing")) is None
+
+
+def test_put_writes_keeps_regular_writes_and_replaces_special_ones(make_saver):
+    saver = make_saver()
+    config = _put(saver, "t1")
+
+    saver.put_writes(config, [("messages", "first"), ("__error__", "boom")], task_id="task")
+    saver.put_writes(config, [("messages", "second"), ("__error__", "retried")], task_id="task")
+
+    pending = make_saver().get_tuple(config).pending_writes
+    assert ("task", "messages", "first") in pending
+    assert ("task", "__error__", "retried") in pending
+    assert len(pending) == 2
+
+
+def test_list_filters_before_and_limit(make_saver):
+    saver = make_saver(checkpoints_per_thread=10)
+    ids = []
+    for step in range(3):
+        ids.append(_put(saver, "t1", parent=ids[-1] if ids else None, step=step)["configurable"]["checkpoint_id"])
+    _put(saver, "t2")
+
+    listed = [c.config["configurable"]["checkpoint_id"] for c in saver.list(_config("t1"))]
+    assert listed == ids[::-1]
+    assert [c.metadata["step"] for c in saver.list(_config("t1"), filter={"step": 1})] == [1]
+    assert [c.config["configurable"]["checkpoint_id"] for c in saver.list(_config("t1"), before=_config("t1", ids[2]))] == ids[1::-1]
+    assert len(list(saver.list(_config("t1"), limit=2))) == 2
+    assert {c.config["configurable"]["thread_id"] for c in saver.list(None)} == {"t1", "t2"}
+
+
+def test_put_prunes_to_checkpoints_per_thread(make_saver):
+    saver = make_saver(checkpoints_per_thread=2)
+    ids = []
+    for step in range(4):
+        config = _put(saver, "t1", parent=ids[-1] if ids else None, step=step)
+        saver.put_writes(config, [("messages", step)], task_id="task")
+        ids.append(config["configurable"]["checkpoint_id"])
+
+    assert [c.config["configurable"]["checkpoint_id"] for c in saver.list(_config("t1"))] == ids[:1:-1]
+    assert saver.get_tuple(_config("t1", ids[0])) is None
+    assert saver._load_writes("t1", "", ids[0]) == []
+
+
+def test_delete_thread_removes_only_that_thread(make_saver):
+    saver = make_saver()
+    config = _put(saver, "t1")
+    saver.put_writes(config, [("messages", "hi")], task_id="task")
+    _put(saver, "t2")
+
+    make_saver().delete_thread("t1")
+
+    assert saver.get_tuple(_config("t1")) is None
+    assert saver.get_tuple(_config("t2")) is not None
+
+
+def test_evicted_session_drops_its_thread(make_saver):
+    sessions = SessionStore(max_sessions=1)
+    saver = make_saver(session_store=sessions)
+    _put(saver, "t1")
+    _put(saver, "t2")
+
+    assert "t1" not in sessions
+    assert saver.get_tuple(_config("t1")) is None
+    assert saver.get_tuple(_config("t2")) is not None
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "redis", "memory"])
+def test_create_checkpointer_binds_every_backend_to_the_session_store(backend, tmp_path, monkeypatch):
+    monkeypatch.setattr(checkpointers, "SQLiteCheckpointSaver",
+                        functools.partial(SQLiteCheckpointSaver, str(tmp_path / "checkpoints.sqlite3")))
+    monkeypatch.setattr(checkpointers, "RedisCheckpointSaver",
+                        functools.partial(RedisCheckpointSaver, client=fakeredis.FakeRedis()))
+    sessions = SessionStore()
+    saver = checkpointers.create_checkpointer(backend, session_store=sessions)
+    _put(saver, "t1")
+
+    sessions.delete("t1")
+    assert saver.get_tuple(_config("t1")) is None
+
+
+def test_incomplete_backend_fails_when_created():
+    class NoStorage(PersistentCheckpointSaver):
+        pass
+
+    with pytest.raises(TypeError):
+        NoStorage()
+
+
+def test_sqlite_expires_idle_threads(tmp_path, monkeypatch):
+    saver = SQLiteCheckpointSaver(str(tmp_path / "checkpoints.sqlite3"), idle_ttl_seconds=60)
+    _put(saver, "idle")
+
+    now = checkpointers.time.time()
+    monkeypatch.setattr(checkpointers.time, "time", lambda: now + 120)
+    _put(saver, "active")
+
+    assert saver.get_tuple(_config("idle")) is None
+    assert saver.get_tuple(_config("active")) is not None
+
+
+def test_redis_refreshes_ttl_on_every_key_of_a_thread():
+    client = fakeredis.FakeRedis()
+    saver = RedisCheckpointSaver(client=client, idle_ttl_seconds=60)
+    config = _put(saver, "t1")
+    saver.put_writes(config, [("messages", "hi")], task_id="task")
+
+    keys = [saver._thread_key("t1")] + saver._members(saver._thread_key("t1"))
+    assert len(keys) == 3
+    assert all(0 < client.ttl(key) <= 60 for key in keys)
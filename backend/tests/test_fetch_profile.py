@@ -0,0 +1,36 @@
+import asyncio
+
+import pytest
+
+import main
+from clients import client_registry
+from test_scrape_executor import ScriptedApify
+
+
+@pytest.fixture
+def apify_by_token(monkeypatch):
+    """A separate fake Apify account per token"""
+    clients = {}
+    monkeypatch.setattr(client_registry, "apify_async",
+                        lambda token: clients.setdefault(token, ScriptedApify([], run_latency_ms=50)))
+    return clients
+
+
+def _fetch_concurrently(url, tokens):
+    async def fetch():
+        return await asyncio.gather(*(main.fetch_profile(url, token) for token in tokens))
+    return asyncio.run(fetch())
+
+
+def test_concurrent_fetches_with_one_token_share_a_run(apify_by_token):
+    profiles = _fetch_concurrently("https://www.linkedin.com/in/shared-run", ["token-a", "token-a"])
+
+    assert profiles[0] == profiles[1]
+    assert apify_by_token["token-a"].started == 1
+
+
+def test_concurrent_fetches_with_different_tokens_do_not_share_a_run(apify_by_token):
+    _fetch_concurrently("https://www.linkedin.com/in/separate-runs", ["token-a", "token-b"])
+
+    assert apify_by_token["token-a"].started == 1
+    assert apify_by_token["token-b"].started == 1
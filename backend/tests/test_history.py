@@ -0,0 +1,52 @@
+from langchain_core.messages import AIMessage, HumanMessage
+
+from history import HistoryPolicy
+from profile_projection import count_tokens
+
+
+def _conversation(count: int, words: int = 1) -> list:
+    """count alternating user/assistant messages, starting and (for odd counts) ending with the user"""
+    return [
+        (HumanMessage if i % 2 == 0 else AIMessage)(content=" ".join([f"message{i}"] * words))
+        for i in range(count)
+    ]
+
+
+def test_keeps_everything_within_the_window_plus_one_batch():
+    messages = _conversation(6)
+    older, recent = HistoryPolicy(max_turns=2, max_tokens=0, summary_batch_turns=1).split(messages)
+
+    assert (older, recent) == ([], messages)
+
+
+def test_trims_to_the_turn_window_once_a_batch_has_built_up():
+    messages = _conversation(7)
+    older, recent = HistoryPolicy(max_turns=2, max_tokens=0, summary_batch_turns=1).split(messages)
+
+    # The last 4 messages start on an assistant reply, so the window starts at the next user message
+    assert older == messages[:4]
+    assert recent == messages[4:]
+    assert isinstance(recent[0], HumanMessage)
+
+
+def test_trims_to_half_the_token_budget_when_over_it():
+    messages = _conversation(5, words=100)
+    # Half the budget fits exactly one message
+    policy = HistoryPolicy(max_turns=0, max_tokens=2 * count_tokens(messages[-1].content) + 1, summary_batch_turns=0)
+    older, recent = policy.split(messages)
+
+    assert recent == messages[-1:]
+    assert older == messages[:-1]
+
+
+def test_always_keeps_the_newest_message():
+    messages = _conversation(1, words=1000)
+    older, recent = HistoryPolicy(max_turns=1, max_tokens=10, summary_batch_turns=0).split(messages)
+
+    assert (older, recent) == ([], messages)
+
+
+def test_unlimited_policy_never_trims():
+    messages = _conversation(101, words=50)
+
+    assert HistoryPolicy(max_turns=0, max_tokens=0).split(messages) == ([], messages)
@@ -0,0 +1,43 @@
+import json
+import os
+
+import pytest
+
+from conftest import BACKEND_DIR
+from intent_router import IntentRouter
+
+with open(os.path.join(BACKEND_DIR, "benchmarks", "routing_samples.json")) as f:
+    SAMPLES = json.load(f)
+
+# Currently 38 of the 40 samples route correctly
+ACCURACY_FLOOR = 0.9
+
+
+@pytest.fixture(scope="module")
+def router() -> IntentRouter:
+    return IntentRouter()
+
+
+def test_routing_samples_accuracy(router):
+    correct = sum(router.route(sample["message"])[0] == sample["intent"] for sample in SAMPLES)
+    assert correct / len(SAMPLES) >= ACCURACY_FLOOR
+
+
+@pytest.mark.parametrize("sample", [s for s in SAMPLES if s.get("endpoint")], ids=lambda s: s["intent"])
+def test_endpoint_prompts_route_to_their_specialist(router, sample):
+    assert router.route(sample["message"])[0] == sample["intent"]
+
+
+def test_low_confidence_falls_back_to_respond(router):
+    intent, score = router.route("zxqv blorp")
+    assert intent == "respond"
+    assert score < router.threshold
+
+
+def test_threshold_decides_between_specialist_and_fallback():
+    message = "Rewrite my about section"
+    intent, score = IntentRouter().route(message)
+    assert intent == "content_generator"
+
+    assert IntentRouter(threshold=score + 0.01).route(message) == ("respond", score)
+    assert IntentRouter(threshold=score + 0.01, fallback="career_counselor").route(message)[0] == "career_counselor"
@@ -0,0 +1,106 @@
+import asyncio
+
+import httpx
+import pytest
+
+import jobs
+import main
+from jobs import InvalidWebhookError, validate_webhook_url
+
+
+@pytest.mark.parametrize("url", [
+    "ftp://93.184.215.14/hook",
+    "/relative/hook",
+    "http://127.0.0.1:8000/hook",
+    "http://localhost/hook",
+    "http://169.254.169.254/latest/meta-data/",
+    "http://10.0.0.5/hook",
+    "http://192.168.1.10/hook",
+    "http://[::1]/hook",
+    "http://[::ffff:127.0.0.1]/hook",
+    "http://0.0.0.0/hook",
+    "http://does-not-exist.invalid/hook",
+])
+def test_rejects_unsafe_webhook_urls(url):
+    with pytest.raises(InvalidWebhookError):
+        validate_webhook_url(url)
+
+
+def test_accepts_public_addresses():
+    assert validate_webhook_url("https://93.184.215.14/hook") == "https://93.184.215.14/hook"
+
+
+def test_allowlist_replaces_the_address_check():
+    assert validate_webhook_url("http://localhost:9000/hook", allowed_hosts={"localhost"})
+    with pytest.raises(InvalidWebhookError):
+        validate_webhook_url("https://93.184.215.14/hook", allowed_hosts={"hooks.example.com"})
+
+
+def test_submit_rejects_internal_webhook_with_400():
+    async def submit():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/jobs", json={
+                "kind": "analyze-profile",
+                "profile_url": "https://www.linkedin.com/in/someone",
+                "webhook_url": "http://169.254.169.254/latest/meta-data/",
+            })
+
+    response = asyncio.run(submit())
+    assert response.status_code == 400
+    assert "non-public" in response.json()["detail"]
+
+
+def test_delivery_is_blocked_if_the_host_turned_internal():
+    queue = jobs.JobQueue(jobs.InMemoryJobStore(), handler=None)
+    job = {"id": "job-1", "webhook_url": "http://127.0.0.1:9/hook"}
+
+    assert asyncio.run(queue._notify(job)) == "blocked"
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return jobs.InMemoryJobStore()
+    return jobs.SQLiteJobStore(str(tmp_path / "jobs.sqlite3"))
+
+
+def test_purge_drops_jobs_lost_in_a_restart(store, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(jobs.time, "time", lambda: now[0])
+    lost = store.create("analyze-profile", {})
+    finished = store.create("analyze-profile", {})
+    store.update(finished["id"], status="succeeded", finished_at=now[0])
+    now[0] += 10
+    fresh = store.create("analyze-profile", {})
+
+    store.purge(now[0] - 5)
+
+    assert store.get(lost["id"]) is None
+    assert store.get(finished["id"]) is None
+    assert store.get(fresh["id"])["status"] == "queued"
+
+
+def test_failed_job_reports_failed_stage():
+    async def fail(job, secrets, set_stage):
+        set_stage("analyzing")
+        raise RuntimeError("model unavailable")
+
+    async def run():
+        queue = jobs.JobQueue(jobs.InMemoryJobStore(), fail, workers=1)
+        await queue.start()
+        job = queue.submit("analyze-profile", {})
+        await queue._queue.join()
+        await queue.stop()
+        return queue.store.get(job["id"])
+
+    job = asyncio.run(run())
+    assert (job["status"], job["stage"], job["error"]) == ("failed", "failed", "model unavailable")
+
+
+def test_incomplete_store_fails_when_created():
+    class NoStorage(jobs.JobStore):
+        pass
+
+    with pytest.raises(TypeError):
+        NoStorage()
@@ -0,0 +1,34 @@
+import pytest
+
+from llm_cache import InMemoryLLMCache, LLMCache, SQLiteLLMCache
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_cache(request, tmp_path):
+    if request.param == "memory":
+        return lambda max_entries: InMemoryLLMCache(max_entries)
+    return lambda max_entries: SQLiteLLMCache(str(tmp_path / "llm_cache.sqlite3"), max_entries)
+
+
+def test_evicts_least_recently_used(make_cache, monkeypatch):
+    # SQLite orders by last access time, so make every access a distinct instant
+    clock = iter(range(1000, 2000))
+    monkeypatch.setattr("llm_cache.time.time", lambda: next(clock))
+    cache = make_cache(2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"
+    cache.set("c", "3")
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == ("1", "3")
+    assert len(cache) == 2
+    assert cache.stats()["hits"] == 3
+
+
+def test_incomplete_cache_fails_when_created():
+    class NoStorage(LLMCache):
+        pass
+
+    with pytest.raises(TypeError):
+        NoStorage()
@@ -0,0 +1,68 @@
+import pytest
+
+import profile_cache
+from profile_cache import ProfileCache, normalize_linkedin_url
+
+CANONICAL = "https://www.linkedin.com/in/jane-doe"
+
+
+@pytest.mark.parametrize("url", [
+    "https://www.linkedin.com/in/jane-doe",
+    "https://www.linkedin.com/in/jane-doe/",
+    "http://linkedin.com/in/jane-doe",
+    "www.linkedin.com/in/jane-doe",
+    "  linkedin.com/in/Jane-Doe  ",
+    "https://uk.linkedin.com/in/jane-doe",
+    "https://www.linkedin.com/in/jane-doe?trk=public_profile#about",
+    "https://www.linkedin.com/in/jane-doe/en",
+    "https://www.linkedin.com/in/jane-doe/details/experience/",
+    "https://www.linkedin.com:443/in/jane-doe",
+])
+def test_equivalent_profile_urls_normalize_to_one_key(url):
+    assert normalize_linkedin_url(url) == CANONICAL
+
+
+def test_legacy_public_urls_drop_only_the_locale():
+    assert normalize_linkedin_url("https://www.linkedin.com/pub/jane-doe/1/2b/3c4/pt-br") == \
+        "https://www.linkedin.com/pub/jane-doe/1/2b/3c4"
+
+
+@pytest.mark.parametrize("url", [
+    "https://notlinkedin.com/in/jane-doe/en",
+    "https://linkedin.com.evil.example/in/jane-doe/en",
+])
+def test_other_hosts_are_left_alone(url):
+    assert normalize_linkedin_url(url) == url
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(profile_cache.time, "time", lambda: now[0])
+    return now
+
+
+def test_entries_expire_after_the_ttl(tmp_path, clock):
+    cache = ProfileCache(str(tmp_path / "profiles.sqlite3"), ttl_seconds=60, max_entries=10)
+    cache.set("linkedin.com/in/jane-doe", {"fullName": "Jane Doe"})
+
+    clock[0] += 60
+    assert cache.get("https://www.linkedin.com/in/jane-doe/") == {"fullName": "Jane Doe"}
+    clock[0] += 1
+    assert cache.get(CANONICAL) is None
+    assert len(cache) == 0
+
+
+def test_evicts_least_recently_used_over_the_size_limit(tmp_path, clock):
+    cache = ProfileCache(str(tmp_path / "profiles.sqlite3"), ttl_seconds=0, max_entries=2)
+    for slug in ("a", "b"):
+        clock[0] += 1
+        cache.set(f"linkedin.com/in/{slug}", {"slug": slug})
+    clock[0] += 1
+    assert cache.get("linkedin.com/in/a") == {"slug": "a"}
+    clock[0] += 1
+    cache.set("linkedin.com/in/c", {"slug": "c"})
+
+    assert cache.get("linkedin.com/in/b") is None
+    assert cache.get("linkedin.com/in/a") == {"slug": "a"}
+    assert len(cache) == 2
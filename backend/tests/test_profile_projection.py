@@ -0,0 +1,29 @@
+import json
+
+import profile_projection
+from profile_projection import ProjectionStats
+
+PROFILE = {"fullName": "Alex Rivera", "headline": "Backend Engineer", "profileUrl": "https://linkedin.com/in/alex"}
+
+
+def test_raw_profile_is_tokenized_once_per_profile_hash(monkeypatch):
+    counted = []
+    real_count = profile_projection.count_tokens
+    monkeypatch.setattr(profile_projection, "count_tokens", lambda text: counted.append(text) or real_count(text))
+    stats = ProjectionStats()
+    raw = json.dumps(PROFILE, indent=2)
+
+    for agent in ("profile_analyzer", "job_matcher", "career_counselor"):
+        stats.record(agent, PROFILE, "{}", profile_hash="hash-1")
+
+    assert counted.count(raw) == 1
+    summary = stats.summary()
+    assert summary["job_matcher"]["raw_tokens"] == summary["profile_analyzer"]["raw_tokens"] == real_count(raw)
+
+
+def test_raw_token_counts_are_bounded():
+    stats = ProjectionStats(max_profiles=2)
+    for i in range(3):
+        stats.record("job_matcher", PROFILE, "{}", profile_hash=f"hash-{i}")
+
+    assert list(stats._raw_tokens) == ["hash-1", "hash-2"]
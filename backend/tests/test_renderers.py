@@ -0,0 +1,71 @@
+import pytest
+
+from fakes import fake_instance
+from renderers import RENDERERS, render_report, render_structured
+from schemas import AGENT_SCHEMAS
+
+HEADINGS = {
+    "profile_analyzer": "## Profile Analysis",
+    "job_matcher": "## Job Fit",
+    "content_generator": "## Enhanced Profile Content",
+    "career_counselor": "## Career Guidance",
+}
+
+
+def _result(agent: str) -> dict:
+    return fake_instance(AGENT_SCHEMAS[agent].model_json_schema())
+
+
+@pytest.mark.parametrize("agent", list(RENDERERS))
+def test_renders_every_specialist_result(agent):
+    rendered = render_structured(agent, _result(agent))
+
+    assert rendered.startswith(HEADINGS[agent])
+    assert "Example text" in rendered
+    # Every section heading has content under it
+    lines = rendered.splitlines()
+    for i, line in enumerate(lines):
+        if line.startswith("### "):
+            assert i + 1 < len(lines) and lines[i + 1].strip()
+
+
+def test_renders_the_job_match_details():
+    result = _result("job_matcher")
+    result["job_description"]["title"] = "Data Engineer"
+    result["match_score"] = 72
+    rendered = render_structured("job_matcher", result)
+
+    assert rendered.startswith("## Job Fit: Data Engineer")
+    assert "**Match score:** 72/100" in rendered
+    assert "### Gaps" in rendered
+
+
+def test_skips_empty_sections():
+    rendered = render_structured("profile_analyzer", {"overall_score": 6, "recommendations": []})
+
+    assert rendered == "## Profile Analysis\n\n**Overall score:** 6/10"
+
+
+@pytest.mark.parametrize("agent,result", [
+    ("profile_analyzer", {"error": "No profile data available"}),
+    ("profile_analyzer", {"analysis": "Plain text", "raw_analysis": True}),
+    ("content_generator", {"suggestions": "Plain text", "raw_content": True}),
+    ("career_counselor", {"guidance": "Plain text", "raw_guidance": True}),
+    ("profile_analyzer", {}),
+    ("profile_analyzer", None),
+    ("respond", {"summary": "No template for this agent"}),
+])
+def test_leaves_errors_and_raw_text_to_the_responder(agent, result):
+    assert render_structured(agent, result) is None
+
+
+def test_report_renders_every_section_or_nothing():
+    sections = {"profile_analysis": "profile_analyzer", "job_match": "job_matcher"}
+    report = {"profile_analysis": _result("profile_analyzer"), "job_match": _result("job_matcher")}
+
+    rendered = render_report(report, sections)
+    assert rendered.index("## Profile Analysis") < rendered.index("## Job Fit")
+
+    report["job_match"] = {"analysis": "Plain text", "raw_analysis": True}
+    assert render_report(report, sections) is None
+    assert render_report({}, sections) is None
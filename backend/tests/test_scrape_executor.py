@@ -0,0 +1,212 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+import scrape_executor
+import scraper
+from conftest import BACKEND_DIR
+from fakes import FakeApifyClientAsync, _FakeActor
+from scrape_executor import CircuitBreaker, CircuitOpenError, ScrapeExecutor, TenantCircuitBreakers
+
+with open(os.path.join(BACKEND_DIR, "benchmarks", "fixture_profiles.json")) as f:
+    PROFILES = json.load(f)
+
+URLS = ["https://www.linkedin.com/in/first", "https://www.linkedin.com/in/second"]
+
+
+class ScriptedApify(FakeApifyClientAsync):
+    """
+    Fake Apify whose runs follow a script, one step per started run:
+    ok, empty, fail_start, slow (no item for 5s), partial (first URL only, then FAILED)
+    """
+
+    def __init__(self, script, run_latency_ms: float = 20, start_latency_ms: float = 0):
+        super().__init__(PROFILES, run_latency_ms)
+        self.script = list(script)
+        self.start_latency_ms = start_latency_ms
+        self.inputs = []
+
+    def actor(self, actor_id: str):
+        return _ScriptedActor(self, self.script.pop(0) if self.script else "ok")
+
+
+class _ScriptedActor(_FakeActor):
+    def __init__(self, client: ScriptedApify, step: str):
+        super().__init__(client)
+        self.step = step
+
+    async def start(self, run_input: dict, **kwargs) -> dict:
+        client = self.client
+        if self.step == "fail_start":
+            raise RuntimeError("actor failed to start")
+        client.inputs.append(list(run_input["urls"]))
+        run = await super().start(run_input, **kwargs)
+        record = client.runs[run["id"]]
+        if self.step == "empty":
+            record["items"] = []
+        elif self.step == "slow":
+            record["duration"] = 5
+        elif self.step == "partial":
+            record["items"] = record["items"][:1]
+            record["final_status"] = "FAILED"
+        # The run exists on Apify before the start request returns
+        await asyncio.sleep(client.start_latency_ms / 1000)
+        return run
+
+
+@pytest.fixture
+def executor(monkeypatch) -> ScrapeExecutor:
+    executor = ScrapeExecutor(TenantCircuitBreakers("test", failure_threshold=3, reset_timeout_seconds=60),
+                              max_retries=2, backoff_base_seconds=0.001, backoff_max_seconds=0.001,
+                              first_item_timeout_seconds=2, hedge_after_seconds=0)
+    monkeypatch.setattr(scraper, "apify_executor", executor)
+    return executor
+
+
+async def _scrape(client, urls=URLS, tenant="tenant"):
+    return [url async for url, _ in scraper._stream_profiles(client, urls, tenant)]
+
+
+def test_retries_only_the_urls_still_pending(executor):
+    client = ScriptedApify(["partial", "ok"])
+
+    assert asyncio.run(_scrape(client)) == URLS
+    assert client.inputs == [URLS, URLS[1:]]
+    assert executor.retries == 1
+    assert executor.breakers.metrics()["open"] == 0
+
+
+def test_retries_failed_starts(executor):
+    client = ScriptedApify(["fail_start", "fail_start", "ok"])
+
+    assert asyncio.run(_scrape(client, URLS[:1])) == URLS[:1]
+    assert executor.attempts == 3
+
+
+def test_empty_run_is_final(executor):
+    client = ScriptedApify(["empty", "ok"])
+
+    assert asyncio.run(_scrape(client, URLS[:1])) == []
+    assert client.started == 1
+
+
+def test_empty_run_is_retried_at_most_once_when_enabled(executor):
+    executor.retry_empty_runs = True
+    client = ScriptedApify(["empty", "empty", "ok"])
+
+    assert asyncio.run(_scrape(client, URLS[:1])) == []
+    assert client.started == 2
+
+
+def test_repeated_empty_runs_leave_the_circuit_closed(executor):
+    client = ScriptedApify(["empty"] * 10)
+
+    for i in range(10):
+        assert asyncio.run(_scrape(client, [f"https://www.linkedin.com/in/private-{i}"])) == []
+    assert executor.breakers.metrics() == {"tracked": 0, "open": 0, "opened": 0, "rejected": 0}
+
+
+def test_circuit_is_opened_per_tenant(executor):
+    failing = ScriptedApify(["fail_start"] * 10)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(_scrape(failing, URLS[:1], tenant="failing"))
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(_scrape(failing, URLS[:1], tenant="failing"))
+    # Another tenant's scrapes still go through
+    assert asyncio.run(_scrape(ScriptedApify(["ok"]), URLS[:1], tenant="healthy")) == URLS[:1]
+    assert executor.breakers.metrics()["open"] == 1
+
+
+def test_first_item_timeout_aborts_and_retries(executor):
+    executor.first_item_timeout_seconds = 0.1
+    client = ScriptedApify(["slow", "ok"])
+
+    assert asyncio.run(_scrape(client, URLS[:1])) == URLS[:1]
+    assert [run["status"] for run in client.runs.values()] == ["ABORTED", "SUCCEEDED"]
+
+
+def test_hedge_wins_and_slow_primary_is_aborted(executor):
+    executor.hedge_after_seconds = 0.05
+    client = ScriptedApify(["slow", "ok"])
+
+    assert asyncio.run(_scrape(client, URLS[:1])) == URLS[:1]
+    assert [run["status"] for run in client.runs.values()] == ["ABORTED", "SUCCEEDED"]
+    assert (executor.hedges, executor.hedge_wins, executor.attempts) == (1, 1, 1)
+
+
+def test_hedge_loses_and_is_aborted(executor):
+    executor.hedge_after_seconds = 0.05
+    client = ScriptedApify(["ok", "slow"], run_latency_ms=150)
+
+    assert asyncio.run(_scrape(client, URLS[:1])) == URLS[:1]
+    assert [run["status"] for run in client.runs.values()] == ["SUCCEEDED", "ABORTED"]
+    assert (executor.hedges, executor.hedge_wins) == (1, 0)
+
+
+def test_run_cancelled_while_starting_is_aborted(executor):
+    client = ScriptedApify(["ok"], run_latency_ms=1000, start_latency_ms=100)
+
+    async def cancel_during_start():
+        task = asyncio.create_task(_scrape(client, URLS[:1]))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_during_start())
+    assert [run["status"] for run in client.runs.values()] == ["ABORTED"]
+
+
+def test_breaker_opens_then_half_opens_then_closes(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(scrape_executor.time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout_seconds=30)
+
+    breaker.record_failure()
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError) as error:
+        breaker.before_call()
+    assert error.value.status_code == 503
+    assert error.value.headers["Retry-After"] == "30"
+
+    now[0] += 30
+    assert breaker.state == "half_open"
+    breaker.before_call()
+    # Only the trial call goes through until it reports back
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    breaker.before_call()
+
+
+def test_breaker_reopens_when_the_trial_fails(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(scrape_executor.time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout_seconds=30)
+
+    breaker.record_failure()
+    now[0] += 30
+    breaker.before_call()
+    breaker.record_failure()
+
+    assert breaker.state == "open"
+    assert breaker.opened == 1
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_open_circuit_fails_scrapes_fast(executor):
+    client = ScriptedApify(["fail_start"] * 10)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(_scrape(client, URLS[:1]))
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(_scrape(client, URLS[:1]))
+    assert executor.attempts == 3
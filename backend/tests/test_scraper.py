@@ -0,0 +1,30 @@
+import asyncio
+
+import pytest
+
+import scraper
+from admission import AdmissionLimiter, SaturatedError, TenantAdmission
+from clients import client_registry
+from test_scrape_executor import ScriptedApify
+
+
+def test_batch_raises_admission_rejections_instead_of_reporting_missing(monkeypatch):
+    # One run per tenant and no wait queue: the second chunk is rejected with 429
+    monkeypatch.setattr(scraper, "apify_admission", TenantAdmission(
+        "apify_per_tenant", AdmissionLimiter("apify", 10, 10, 1), 1, 0, 1
+    ))
+    client = ScriptedApify([], run_latency_ms=50)
+    monkeypatch.setattr(client_registry, "apify_async", lambda token: client)
+    urls = [f"https://www.linkedin.com/in/user-{i}" for i in range(4)]
+    scraped = []
+
+    async def scrape():
+        async for url, _ in scraper.scrape_linkedin_profiles(urls, "token", chunk_size=2):
+            scraped.append(url)
+
+    with pytest.raises(SaturatedError) as error:
+        asyncio.run(scrape())
+    assert error.value.status_code == 429
+    assert "Retry-After" in error.value.headers
+    # The admitted chunk's profiles still arrive before the rejection
+    assert len(scraped) == 2
@@ -0,0 +1,82 @@
+import pytest
+from langgraph.checkpoint.base import empty_checkpoint
+
+import session_store
+from session_store import BoundedMemorySaver, SessionStore
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(session_store.time, "time", lambda: now[0])
+    return now
+
+
+def _put(saver, thread_id: str, parent=None) -> dict:
+    configurable = {"thread_id": thread_id, "checkpoint_ns": ""}
+    if parent:
+        configurable["checkpoint_id"] = parent
+    return saver.put({"configurable": configurable}, empty_checkpoint(), {"source": "loop", "step": 0}, {})
+
+
+def test_evicts_least_recently_used_session_at_capacity():
+    store = SessionStore(max_sessions=2, idle_ttl_seconds=0)
+    store.set("a", "profile", {"name": "A"})
+    store.set("b", "profile", {"name": "B"})
+    # Reading "a" makes "b" the least recently used
+    assert store.get("a", "profile") == {"name": "A"}
+    store.set("c", "profile", {"name": "C"})
+
+    assert "b" not in store
+    assert store.get("a", "profile") == {"name": "A"}
+    assert len(store) == 2
+    assert store.metrics()["evicted"] == 1
+
+
+def test_expires_idle_sessions(clock):
+    store = SessionStore(max_sessions=10, idle_ttl_seconds=60)
+    store.set("idle", "profile", {"name": "Idle"})
+    clock[0] += 30
+    store.set("active", "profile", {"name": "Active"})
+
+    clock[0] += 31
+    assert store.get("idle", "profile") is None
+    store.touch("active")
+    assert "idle" not in store
+    assert store.get("active", "profile") == {"name": "Active"}
+    assert store.metrics()["expired"] == 1
+
+
+def test_notifies_listeners_of_evicted_and_deleted_sessions():
+    store = SessionStore(max_sessions=1, idle_ttl_seconds=0)
+    dropped = []
+    store.add_eviction_listener(dropped.append)
+
+    store.touch("a")
+    store.touch("b")
+    assert store.delete("b")
+    assert not store.delete("missing")
+
+    assert dropped == ["a", "b", "missing"]
+
+
+def test_bounded_memory_saver_keeps_the_latest_checkpoints():
+    saver = BoundedMemorySaver(SessionStore(), checkpoints_per_thread=2)
+    config = _put(saver, "t1")
+    for _ in range(3):
+        config = _put(saver, "t1", parent=config["configurable"]["checkpoint_id"])
+
+    checkpoints = list(saver.list({"configurable": {"thread_id": "t1"}}))
+    assert len(checkpoints) == 2
+    assert checkpoints[0].config["configurable"]["checkpoint_id"] == config["configurable"]["checkpoint_id"]
+
+
+def test_bounded_memory_saver_drops_evicted_threads():
+    store = SessionStore(max_sessions=1, idle_ttl_seconds=0)
+    saver = BoundedMemorySaver(store)
+    _put(saver, "t1")
+    _put(saver, "t2")
+
+    assert saver.get_tuple({"configurable": {"thread_id": "t1", "checkpoint_ns": ""}}) is None
+    assert saver.get_tuple({"configurable": {"thread_id": "t2", "checkpoint_ns": ""}}) is not None
+    assert saver.metrics()["threads"] == 1